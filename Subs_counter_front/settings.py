@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # 304 Not Modified по ETag и Last-Modified
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'subs_manager.middleware.metrics_middleware',  # время представлений для /metrics (последним: только представление)
 ]
 
 ROOT_URLCONF = 'Subs_counter_front.urls'
@@ -80,6 +82,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Транзакция сразу берет блокировку записи: параллельные синхронизации
+            # ждут друг друга (до timeout секунд), а не падают с "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -160,13 +168,79 @@ LOGGING = {
 }
 
 # Настройки кэширования
+# Кэш в файле SQLite (см. subs_manager/cache_backends.py) общий для всех
+# процессов на сервере, поэтому воркеры не прогревают каждый свою копию
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
+        'BACKEND': 'subs_manager.cache_backends.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache' / 'default.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,  # при превышении удаляются давно не использованные записи
+            'MAX_SIZE': 64 * 1024 * 1024,  # 64 МБ на все значения
+            'CULL_FREQUENCY': 4,  # при превышении MAX_ENTRIES удаляется четверть записей
+        },
+    },
+    # Прогнозы: сохраняются при перезапуске
+    'forecasts': {
+        'BACKEND': 'subs_manager.cache_backends.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache' / 'forecasts.sqlite3',
+        'TIMEOUT': 60 * 60 * 24 * 7,  # 7 дней
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
 }
 
 # Время жизни кэша по умолчанию (в секундах)
 CACHE_MIDDLEWARE_SECONDS = 60 * 15  # 15 минут
 
+# Настройки пула HTTP-соединений к API
+API_POOL_CONNECTIONS = 10  # количество пулов (по одному на хост)
+API_POOL_MAXSIZE = 20  # максимальное количество соединений на хост
+API_POOL_BLOCK = False  # не ждать свободное соединение, а открывать новое
+
+# Автоматический выключатель запросов к API (см. subs_manager/circuit.py)
+CIRCUIT_FAILURE_THRESHOLD = 5  # ошибок подряд, после которых запросы к конечной точке временно отклоняются
+CIRCUIT_BASE_BACKOFF = 5  # первая пауза перед пробным запросом, в секундах
+CIRCUIT_MAX_BACKOFF = 60 * 5  # максимальная пауза перед пробным запросом, в секундах
+CIRCUIT_PROBE_TIMEOUT = 30  # сколько другие процессы ждут результат пробного запроса, в секундах
+
+# Фоновый опрос API (см. subs_manager/ingestion.py)
+INGESTION_INTERVAL = 60 * 5  # интервал опроса в секундах; столько же (плюс минута) доверяют его данным в общем сегменте памяти
+INGESTION_IN_PROCESS = False  # True - запускать опрос в процессе веб-сервера вместо manage.py poll_upstream
+DAILY_SYNC_OVERLAP_DAYS = 2  # сколько последних дней перезагружать при инкрементальной синхронизации
+# Параметр /daily-stats для фильтрации по дате, если API его поддерживает (например, 'since').
+# При None API каждый раз отдает всю историю: инкрементальная синхронизация
+# сокращает только разбор и запись в базу, но не объем загружаемых данных
+DAILY_STATS_SINCE_PARAM = None
+INGESTION_CONCURRENCY = 32  # максимальное количество одновременных запросов к API при опросе всех профилей
+LATEST_SNAPSHOT_RETENTION_DAYS = 7  # сколько дней хранить старые снимки последних данных
+INGESTION_LOCK_PATH = BASE_DIR / 'cache' / 'ingestion.lock'  # опрос в процессе выполняет только владелец блокировки
+
+# Реестр отслеживаемых профилей (таблица TrackedProfile, см. subs_manager/profiles.py)
+PROFILE_REGISTRY_TTL = 60  # как долго список профилей хранится в памяти процесса, в секундах
+
+# Поток обновлений Server-Sent Events (см. subs_manager/broadcast.py)
+STREAM_POLL_INTERVAL = 30  # интервал общего опроса данных для всех подключенных клиентов
+STREAM_HEARTBEAT_INTERVAL = 15  # интервал keep-alive комментариев
+
+# Асинхронные представления (только при запуске через ASGI: Subs_counter_front/asgi.py)
+ASYNC_VIEWS = False
+
+# Прогнозы (см. subs_manager/forecasting.py)
+FORECAST_CACHE_ALIAS = 'forecasts'  # алиас кэша в CACHES
+FORECAST_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # время жизни прогноза в секундах
+FORECAST_DAYS_AHEAD = 2  # горизонт онлайн-прогноза, обновляемого при синхронизации
+
+# Последние данные в разделяемой памяти (см. subs_manager/shared_snapshot.py)
+# На Linux можно указать файл в /dev/shm, чтобы данные не записывались на диск
+SHARED_SNAPSHOT_PATH = BASE_DIR / 'cache' / 'latest.snapshot'
+SHARED_SNAPSHOT_SIZE = 64 * 1024  # размер сегмента в байтах
+
+# Доступ к служебным endpoint'ам /metrics, /pool-stats/ и /circuit-status/ (остальным - 403)
+OPS_ALLOWED_IPS = ['127.0.0.1', '::1']  # адреса, которым доступ открыт (REMOTE_ADDR; за прокси - адрес прокси)
+OPS_TOKEN = None  # токен для заголовка Authorization: Bearer <токен>; сотрудникам (is_staff) доступ открыт всегда
+
+# Прогрев кэша страниц (manage.py warm_cache, см. subs_manager/warmup.py)
+WARM_CACHE_ORIGINS = ['http://localhost:8000']  # адреса сайта: ключ кэша страницы включает схему, хост и порт
+WARM_CACHE_MARGIN = 60  # за сколько секунд до истечения кэша повторять прогрев (--repeat)
@@ -1,13 +1,34 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from subs_manager import views
 
+# Под ASGI можно включить асинхронные представления (ASYNC_VIEWS в settings.py)
+if settings.ASYNC_VIEWS:
+    real_time_view = views.aget_real_time_statistics
+    daily_view = views.aget_daily_statistics
+    daily_series_view = views.aget_daily_series
+    analytics_view = views.aget_analytics
+    update_view = views.aupdate_statistics
+else:
+    real_time_view = views.get_real_time_statistics
+    daily_view = views.get_daily_statistics
+    daily_series_view = views.get_daily_series
+    analytics_view = views.get_analytics
+    update_view = views.update_statistics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('i18n/', include('django.conf.urls.i18n')),  # Добавляем URL для переключения языков
-    path('real-time-statistics/', views.get_real_time_statistics, name='get_real_time_statistics'),
-    path('', views.get_real_time_statistics, name='home'),
-    path('statistics/daily/<str:platform>/', views.get_daily_statistics, name='get_daily_statistics'),  # Новый путь для статистики
-    path('analytics/', views.get_analytics, name='get_analytics'),  # Новый путь для аналитики
-    path('update-statistics/', views.update_statistics, name='update_statistics'),  # Новый маршрут для обновления данных
+    path('real-time-statistics/', real_time_view, name='get_real_time_statistics'),
+    path('', real_time_view, name='home'),
+    path('statistics/daily/<str:platform>/', daily_view, name='get_daily_statistics'),  # Новый путь для статистики
+    path('statistics/daily/<str:platform>/series/', daily_series_view, name='get_daily_series'),  # Данные графика (JSON)
+    path('statistics/export/', views.export_statistics, name='export_statistics'),  # Выгрузка истории (CSV, NDJSON)
+    path('analytics/', analytics_view, name='get_analytics'),  # Новый путь для аналитики
+    path('update-statistics/', update_view, name='update_statistics'),  # Новый маршрут для обновления данных
+    path('stream-statistics/', views.stream_statistics, name='stream_statistics'),  # Поток обновлений (SSE)
+    path('pool-stats/', views.http_pool_stats, name='http_pool_stats'),  # Статистика пула HTTP-соединений
+    path('circuit-status/', views.circuit_status, name='circuit_status'),  # Состояние выключателей API
+    path('metrics', views.metrics, name='metrics'),  # Метрики в формате Prometheus
 ]
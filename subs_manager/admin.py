@@ -1,3 +1,50 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import LatestSnapshot, DailyStat, StatRollup, SyncState, ForecastState, TrackedProfile
+from .profiles import reset_profiles_cache
+
+
+@admin.register(LatestSnapshot)
+class LatestSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'count', 'upstream_timestamp', 'fetched_at')
+    list_filter = ('platform',)
+
+
+@admin.register(DailyStat)
+class DailyStatAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'date', 'count')
+    list_filter = ('platform',)
+    date_hierarchy = 'date'
+
+
+@admin.register(StatRollup)
+class StatRollupAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'granularity', 'period_start', 'date', 'count')
+    list_filter = ('platform', 'granularity')
+    date_hierarchy = 'period_start'
+
+
+@admin.register(SyncState)
+class SyncStateAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'last_date', 'daily_synced_at')
+
+
+@admin.register(ForecastState)
+class ForecastStateAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'last_date', 'predictions', 'updated_at')
+
+
+@admin.register(TrackedProfile)
+class TrackedProfileAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'profile_id', 'query_param', 'count_field', 'is_active', 'is_primary')
+    list_filter = ('platform', 'is_active', 'is_primary')
+    search_fields = ('profile_id',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Изменения реестра сразу видны в этом процессе, в остальных - через PROFILE_REGISTRY_TTL
+        reset_profiles_cache()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        reset_profiles_cache()
@@ -1,6 +1,32 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def is_server_process() -> bool:
+    """
+    Проверяет, что процесс обслуживает запросы, а не выполняет команду
+    manage.py (migrate, warm_cache, ...).
+
+    Под runserver с автоперезагрузкой запросы обслуживает дочерний процесс
+    (RUN_MAIN), а родительский только следит за файлами.
+    """
+    if os.path.basename(sys.argv[0]) != 'manage.py':
+        return True  # gunicorn, uvicorn и другие серверы
+    if sys.argv[1:2] != ['runserver']:
+        return False
+    return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
 
 
 class SubsManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subs_manager'
+
+    def ready(self):
+        # Встроенный планировщик фонового опроса API (альтернатива manage.py poll_upstream).
+        # Из воркеров сервера опрос выполняет только один (см. _acquire_scheduler_lock)
+        if getattr(settings, 'INGESTION_IN_PROCESS', False) and is_server_process():
+            from .ingestion import start_scheduler
+            start_scheduler()
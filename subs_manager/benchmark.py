@@ -0,0 +1,472 @@
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import django
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, get_resolver, reverse
+
+from . import profiles, views
+from .forecasting import forecast_series_batch
+from .models import LatestSnapshot, DailyStat, StatRollup, SyncState, ForecastState
+from .profiles import get_primary_profiles, reset_profiles_cache
+from .series import parse_daily_stats
+from .shared_snapshot import SHARED_SNAPSHOT_SIZE, SharedSnapshot
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+BENCHMARK_REQUESTS = 50  # запросов к маршруту в теплом и параллельном режимах
+BENCHMARK_COLD_REQUESTS = 10  # запросов к маршруту в холодном режиме (каждый со сбросом состояния)
+BENCHMARK_CONCURRENCY = 8  # одновременных клиентов в параллельном режиме
+BENCHMARK_MICRO_REPEAT = 200  # вызовов функции в микробенчмарке
+BENCHMARK_TOLERANCE = 0.2  # допустимое ухудшение относительно базовых результатов (20%)
+
+FAKE_UPSTREAM_LATENCY = 0.05  # задержка ответа локального API в секундах
+FAKE_UPSTREAM_DAYS = 365  # сколько дней в ответе /daily-stats
+
+# Режимы нагрузки на маршруты
+MODE_COLD = 'cold'  # пустые кэши и хранилище: каждый запрос идет в API
+MODE_WARM = 'warm'  # последовательные запросы после прогрева
+MODE_CONCURRENT = 'concurrent'  # BENCHMARK_CONCURRENCY клиентов одновременно после прогрева
+MODES = (MODE_COLD, MODE_WARM, MODE_CONCURRENT)
+
+# Метрики, по которым сравниваются результаты с базовыми
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+THROUGHPUT_METRIC = 'throughput_rps'
+
+
+def make_daily_stats(days: int, start: date = date(2020, 1, 1)) -> List[Dict[str, Any]]:
+    """
+    Создает записи /daily-stats за days дней с растущим количеством подписчиков.
+
+    Args:
+        days (int): Количество дней
+        start (date): Первый день
+
+    Returns:
+        List[Dict[str, Any]]: Записи вида
+            {'date': '2020-01-01', 'followers_count': 1000, 'subscribers_count': 1000}
+    """
+    return [
+        {
+            'date': (start + timedelta(days=day)).isoformat(),
+            'followers_count': 1000 + day * 3 + day % 7,
+            'subscribers_count': 1000 + day * 3 + day % 7,
+        }
+        for day in range(days)
+    ]
+
+
+class FakeUpstream:
+    """
+    Локальная замена API (API_BASE_URL) для бенчмарков.
+
+    Отвечает на /<платформа>/latest и /<платформа>/daily-stats с заданной
+    задержкой, долей ошибок и размером ответа. Пока сервер запущен,
+    профили запрашивают данные у него.
+
+    Example:
+        with FakeUpstream(latency=0.1, error_rate=0.05, days=3650) as upstream:
+            fetch_api_data(profile.daily_stats_url)
+            upstream.requests  # сколько запросов получил сервер
+    """
+
+    def __init__(self, latency: float = FAKE_UPSTREAM_LATENCY, error_rate: float = 0.0,
+                 days: int = FAKE_UPSTREAM_DAYS, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._previous_base_url: Optional[str] = None
+        # Ответы одинаковые для всех профилей, поэтому сериализуются один раз
+        self._daily_body = json.dumps({'daily_stats': make_daily_stats(days)}).encode('utf-8')
+        self._latest_body = json.dumps({
+            'latest_data': {'count': '1,234', 'timestamp': datetime.now().replace(microsecond=0).isoformat()},
+        }).encode('utf-8')
+
+    @property
+    def url(self) -> str:
+        """Адрес запущенного сервера."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _respond(self, path: str) -> Tuple[int, bytes]:
+        """
+        Выбирает ответ на запрос: ошибку с вероятностью error_rate или данные.
+        """
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            return 503, b'{"error": "unavailable"}'
+        if '/daily-stats' in path:
+            return 200, self._daily_body
+        if '/latest' in path:
+            return 200, self._latest_body
+        return 404, b'{"error": "not found"}'
+
+    def __enter__(self) -> 'FakeUpstream':
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # соединения переиспользуются, как с настоящим API
+
+            def do_GET(self):
+                status, body = upstream._respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._previous_base_url = profiles.API_BASE_URL
+        profiles.API_BASE_URL = self.url
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        profiles.API_BASE_URL = self._previous_base_url
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class BenchmarkEnvironment:
+    """
+    Отдельные база, кэши и общий сегмент памяти во временном каталоге.
+
+    Бенчмарк сбрасывает кэши и локальное хранилище, поэтому рабочие данные
+    не используются: база создается и заполняется миграциями (в том числе
+    профилями из 0004_trackedprofile), как при запуске тестов Django, а
+    данные локального API не попадают в общий сегмент рабочих процессов.
+    """
+
+    def __init__(self):
+        self._directory: Optional[str] = None
+        self._old_database_name: Optional[str] = None
+        self._settings: Optional[override_settings] = None
+        self._shared_latest: Optional[SharedSnapshot] = None
+
+    def __enter__(self) -> 'BenchmarkEnvironment':
+        self._directory = tempfile.mkdtemp(prefix='subs-benchmark-')
+        setup_test_environment()
+        self._settings = override_settings(
+            CACHES={
+                alias: {**config, 'LOCATION': os.path.join(self._directory, f'{alias}.sqlite3')}
+                for alias, config in settings.CACHES.items()
+            },
+        )
+        self._settings.enable()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(self._directory, 'db.sqlite3')
+        self._old_database_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        self._shared_latest = views.shared_latest
+        views.shared_latest = SharedSnapshot(os.path.join(self._directory, 'latest.snapshot'), SHARED_SNAPSHOT_SIZE)
+        reset_profiles_cache()
+        self.reset()
+        return self
+
+    def reset(self) -> None:
+        """
+        Возвращает приложение в холодное состояние: пустые кэши, локальное
+        хранилище и общий сегмент памяти. Профили остаются.
+        """
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        for model in (LatestSnapshot, DailyStat, StatRollup, SyncState, ForecastState):
+            model.objects.all().delete()
+        views.shared_latest.clear()
+
+    def __exit__(self, *exc_info) -> None:
+        views.shared_latest = self._shared_latest
+        connections.close_all()
+        connection.creation.destroy_test_db(self._old_database_name, verbosity=0)
+        self._settings.disable()
+        teardown_test_environment()
+        reset_profiles_cache()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def get_benchmark_routes() -> Dict[str, str]:
+    """
+    Возвращает пути всех маршрутов приложения из Subs_counter_front/urls.py.
+
+    Маршруты admin и i18n не измеряются; вместо <platform> подставляется
+    платформа первого основного профиля.
+
+    Returns:
+        Dict[str, str]: Словарь вида {имя маршрута: путь}
+    """
+    platform_name = next(iter(get_primary_profiles()), 'linkedin')
+    routes = {}
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        kwargs = {'platform': platform_name} if 'platform' in pattern.pattern.converters else {}
+        routes[pattern.name] = reverse(pattern.name, kwargs=kwargs)
+    return routes
+
+
+def summarize(latencies: List[float], errors: int = 0, elapsed: Optional[float] = None,
+              sizes: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Сводит измерения в перцентили задержки и пропускную способность.
+
+    Args:
+        latencies (List[float]): Время каждого запроса или вызова в секундах
+        errors (int): Количество ошибочных ответов
+        elapsed (float, optional): Общее время выполнения; по умолчанию сумма latencies
+        sizes (List[int], optional): Размеры ответов в байтах
+
+    Returns:
+        Dict[str, Any]: Сводка вида
+            {'requests': 50, 'errors': 0, 'p50_ms': 1.2, 'p95_ms': 2.5, 'p99_ms': 3.1,
+             'mean_ms': 1.4, 'throughput_rps': 714.3, 'bytes': 2048}
+    """
+    timings = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) if len(timings) else (0.0, 0.0, 0.0)
+    elapsed = elapsed if elapsed is not None else float(np.sum(latencies))
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(timings.mean()), 3) if len(timings) else 0.0,
+        THROUGHPUT_METRIC: round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if sizes:
+        summary['bytes'] = int(np.median(sizes))
+    return summary
+
+
+def _timed_get(path: str) -> Tuple[float, int, int]:
+    """
+    Выполняет GET через тестовый клиент Django (весь стек middleware) и
+    читает ответ целиком, включая потоковые.
+
+    Returns:
+        Tuple[float, int, int]: (время в секундах, код ответа, размер тела в байтах)
+    """
+    client = Client(HTTP_ACCEPT_ENCODING='gzip')
+    started = time.perf_counter()
+    response = client.get(path)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return time.perf_counter() - started, response.status_code, len(body)
+
+
+def _concurrent_get(path: str) -> Tuple[float, int, int]:
+    """
+    _timed_get для потоков пула: соединения с базой закрываются после запроса.
+    """
+    try:
+        return _timed_get(path)
+    finally:
+        connections.close_all()
+
+
+def benchmark_route(environment: BenchmarkEnvironment, upstream: FakeUpstream, path: str, mode: str,
+                    requests: int, concurrency: int = BENCHMARK_CONCURRENCY) -> Dict[str, Any]:
+    """
+    Измеряет маршрут в одном режиме нагрузки.
+
+    В холодном режиме состояние сбрасывается перед каждым запросом (сброс
+    в замер не входит), в теплом и параллельном маршрут сначала
+    прогревается одним запросом.
+
+    Args:
+        environment (BenchmarkEnvironment): Окружение бенчмарка
+        upstream (FakeUpstream): Локальный API
+        path (str): Путь маршрута
+        mode (str): MODE_COLD, MODE_WARM или MODE_CONCURRENT
+        requests (int): Количество запросов
+        concurrency (int): Одновременных клиентов в параллельном режиме
+
+    Returns:
+        Dict[str, Any]: Сводка summarize и количество запросов к API (upstream_requests)
+    """
+    if mode != MODE_COLD:
+        _timed_get(path)
+    upstream_before = upstream.requests
+
+    if mode == MODE_CONCURRENT:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_concurrent_get, [path] * requests))
+        elapsed = time.perf_counter() - started
+    else:
+        results = []
+        for _ in range(requests):
+            if mode == MODE_COLD:
+                environment.reset()
+            results.append(_timed_get(path))
+        elapsed = None
+
+    summary = summarize(
+        [latency for latency, _, _ in results],
+        errors=sum(status >= 400 for _, status, _ in results),
+        elapsed=elapsed,
+        sizes=[size for _, _, size in results],
+    )
+    summary['upstream_requests'] = upstream.requests - upstream_before
+    return summary
+
+
+def run_route_benchmarks(environment: BenchmarkEnvironment, upstream: FakeUpstream,
+                         routes: Optional[List[str]] = None, requests: int = BENCHMARK_REQUESTS,
+                         cold_requests: int = BENCHMARK_COLD_REQUESTS,
+                         concurrency: int = BENCHMARK_CONCURRENCY,
+                         progress: Optional[Callable[[str, str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Измеряет маршруты во всех режимах нагрузки (MODES).
+
+    Args:
+        environment (BenchmarkEnvironment): Окружение бенчмарка
+        upstream (FakeUpstream): Локальный API
+        routes (List[str], optional): Имена маршрутов (по умолчанию все)
+        requests (int): Запросов в теплом и параллельном режимах
+        cold_requests (int): Запросов в холодном режиме
+        concurrency (int): Одновременных клиентов в параллельном режиме
+        progress (Callable, optional): Вызывается после каждого замера с
+            (имя маршрута, режим, сводка)
+
+    Returns:
+        Dict[str, Any]: Результаты вида {имя маршрута: {'path': ..., режим: сводка}}
+    """
+    results = {}
+    for name, path in get_benchmark_routes().items():
+        if routes and name not in routes:
+            continue
+        results[name] = {'path': path}
+        for mode in MODES:
+            count = cold_requests if mode == MODE_COLD else requests
+            summary = benchmark_route(environment, upstream, path, mode, count, concurrency)
+            results[name][mode] = summary
+            if progress is not None:
+                progress(name, mode, summary)
+    return results
+
+
+def _time_calls(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Вызывает func repeat раз и сводит время вызовов (см. summarize).
+    """
+    func()  # первый вызов не измеряется: импорты, прогрев кэшей
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def run_micro_benchmarks(days: int = FAKE_UPSTREAM_DAYS, repeat: int = BENCHMARK_MICRO_REPEAT) -> Dict[str, Any]:
+    """
+    Микробенчмарки прогноза и разбора ежедневной статистики.
+
+    Измеряются:
+        calculate_trend_prediction: прогноз, как его вызывают представления (с кэшем прогнозов)
+        forecast_series_batch: расчет прогноза без кэша
+        parse_daily_stats: разбор ответа /daily-stats с числовыми количествами
+        parse_daily_stats_strings: разбор ответа с количествами-строками вида "1,234"
+
+    Args:
+        days (int): Сколько дней в статистике
+        repeat (int): Сколько раз вызывать каждую функцию
+
+    Returns:
+        Dict[str, Any]: Результаты вида {имя: сводка summarize}
+    """
+    daily_stats = make_daily_stats(days)
+    string_stats = [{**stat, 'followers_count': f"{stat['followers_count']:,}"} for stat in daily_stats]
+    series = parse_daily_stats(daily_stats)
+    return {
+        'calculate_trend_prediction': _time_calls(lambda: views.calculate_trend_prediction(daily_stats), repeat),
+        'forecast_series_batch': _time_calls(lambda: forecast_series_batch([series]), repeat),
+        'parse_daily_stats': _time_calls(lambda: parse_daily_stats(daily_stats), repeat),
+        'parse_daily_stats_strings': _time_calls(lambda: parse_daily_stats(string_stats), repeat),
+    }
+
+
+def benchmark_metadata(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Описание запуска: время, версии и параметры (сохраняется вместе с результатами).
+    """
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'config': config,
+    }
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = BENCHMARK_TOLERANCE) -> List[str]:
+    """
+    Сравнивает результаты с базовыми и возвращает найденные регрессии.
+
+    Регрессия - перцентиль задержки больше базового или пропускная
+    способность меньше базовой более чем на tolerance. Замеры, которых нет
+    в базовых результатах, пропускаются.
+
+    Args:
+        results (Dict[str, Any]): Текущие результаты
+        baseline (Dict[str, Any]): Базовые результаты (сохраненный JSON)
+        tolerance (float): Допустимое отклонение, например 0.2 (20%)
+
+    Returns:
+        List[str]: Описания регрессий; пустой список, если их нет
+
+    Example:
+        ['routes.update_statistics.warm.p95_ms: 1.20 -> 2.40 (+100%)']
+    """
+    regressions = []
+
+    def check(name: str, current: Dict[str, Any], base: Dict[str, Any]) -> None:
+        for metric in LATENCY_METRICS:
+            if base.get(metric) and metric in current and current[metric] > base[metric] * (1 + tolerance):
+                change = current[metric] / base[metric] - 1
+                regressions.append(f"{name}.{metric}: {base[metric]:.2f} -> {current[metric]:.2f} (+{change:.0%})")
+        if base.get(THROUGHPUT_METRIC) and current.get(THROUGHPUT_METRIC, 0) < base[THROUGHPUT_METRIC] * (1 - tolerance):
+            change = current.get(THROUGHPUT_METRIC, 0) / base[THROUGHPUT_METRIC] - 1
+            regressions.append(
+                f"{name}.{THROUGHPUT_METRIC}: {base[THROUGHPUT_METRIC]:.1f} -> "
+                f"{current.get(THROUGHPUT_METRIC, 0):.1f} ({change:.0%})"
+            )
+
+    for route, modes in results.get('routes', {}).items():
+        for mode in MODES:
+            base = baseline.get('routes', {}).get(route, {}).get(mode)
+            if base and mode in modes:
+                check(f"routes.{route}.{mode}", modes[mode], base)
+    for name, current in results.get('micro', {}).items():
+        base = baseline.get('micro', {}).get(name)
+        if base:
+            check(f"micro.{name}", current, base)
+    return regressions
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from django.conf import settings
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Константы рассылки (можно переопределить в settings.py)
+STREAM_POLL_INTERVAL = getattr(settings, 'STREAM_POLL_INTERVAL', 30)  # интервал общего опроса данных
+STREAM_HEARTBEAT_INTERVAL = getattr(settings, 'STREAM_HEARTBEAT_INTERVAL', 15)  # интервал keep-alive комментариев
+
+
+class Broadcaster:
+    """
+    Рассылает изменения данных всем подключенным клиентам из одного опроса.
+
+    Пока есть хотя бы один подписчик, в цикле событий процесса работает одна
+    задача, которая раз в interval секунд вызывает load(). Если данные
+    изменились, увеличивается версия и все подписчики получают новое значение.
+    Количество запросов к API не зависит от числа открытых страниц.
+    """
+
+    def __init__(self, load: Callable[[], Any], interval: float = STREAM_POLL_INTERVAL):
+        self._load = load
+        self._interval = interval
+        self._data: Optional[Dict[str, Any]] = None
+        self._version = 0
+        self._subscribers = 0
+        self._changed: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    def _ensure_running(self) -> None:
+        """
+        Запускает задачу опроса в текущем цикле событий, если она не запущена.
+        """
+        if self._task is None or self._task.done():
+            self._changed = asyncio.Condition()
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self) -> None:
+        """
+        Общий цикл опроса: работает, пока есть подписчики.
+        """
+        while self._subscribers > 0:
+            try:
+                data = await self._load()
+                if data != self._data:
+                    async with self._changed:
+                        self._data = data
+                        self._version += 1
+                        self._changed.notify_all()
+            except Exception as e:
+                logger.error(f"Ошибка при общем опросе данных для рассылки: {str(e)}")
+            await asyncio.sleep(self._interval)
+        self._task = None
+
+    async def subscribe(self, heartbeat: float = STREAM_HEARTBEAT_INTERVAL) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Асинхронный генератор новых значений для одного клиента.
+
+        Сразу отдает текущее значение (если оно уже есть), затем каждое
+        изменение. Если изменений нет дольше heartbeat секунд, отдает None,
+        чтобы вызывающий код мог отправить keep-alive.
+
+        Args:
+            heartbeat (float): Максимальное время ожидания изменения в секундах
+
+        Yields:
+            Optional[Dict[str, Any]]: Новые данные или None для keep-alive
+        """
+        self._subscribers += 1
+        self._ensure_running()
+        seen = 0
+        try:
+            while True:
+                async with self._changed:
+                    try:
+                        await asyncio.wait_for(
+                            self._changed.wait_for(lambda: self._version != seen), heartbeat
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    if self._version == seen:
+                        data = None
+                    else:
+                        seen, data = self._version, self._data
+                yield data
+        finally:
+            self._subscribers -= 1
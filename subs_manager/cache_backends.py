@@ -0,0 +1,310 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Как часто (раз в сколько записей в процессе) проверять ограничения кэша
+CULL_CHECK_EVERY = 50
+# Время последнего обращения обновляется не чаще раза в столько секунд:
+# для LRU достаточно примерного порядка, а каждое обновление - это запись
+ACCESS_RESOLUTION = 30
+
+# Соединения открываются по одному на поток и файл: Django создает экземпляр
+# бэкенда на каждый поток (и контекст async-запроса), а соединение с SQLite
+# переиспользуется между ними
+_local = threading.local()
+_ready_paths = set()
+_ready_lock = threading.Lock()
+_write_counts: Dict[str, int] = {}
+_write_counts_lock = threading.Lock()
+
+
+class SQLiteCache(BaseCache):
+    """
+    Бэкенд кэша Django в файле SQLite, общий для всех процессов на сервере.
+
+    В отличие от LocMemCache, все воркеры gunicorn/uvicorn используют одну
+    копию кэша, поэтому cache_page, ответы API и блокировки single_flight и
+    выключателя видны всем процессам. Внешний сервис (Redis, memcached) не
+    нужен. Файл открывается в режиме WAL: чтение не блокируется записью.
+
+    Ограничения задаются в OPTIONS:
+        MAX_ENTRIES: максимальное количество записей (по умолчанию 300)
+        MAX_SIZE: максимальный суммарный размер значений в байтах (по умолчанию без ограничения)
+        CULL_FREQUENCY: при превышении MAX_ENTRIES удаляется 1/CULL_FREQUENCY записей (по умолчанию 3)
+
+    Вытесняются давно не использованные записи (LRU), а также истекшие.
+
+    Если файл занят дольше таймаута соединения ("database is locked"), чтение
+    считается промахом, а запись и удаление пропускаются: кэш не должен
+    ронять запрос.
+
+    Example:
+        CACHES = {
+            'default': {
+                'BACKEND': 'subs_manager.cache_backends.SQLiteCache',
+                'LOCATION': BASE_DIR / 'cache' / 'default.sqlite3',
+                'OPTIONS': {'MAX_ENTRIES': 10000, 'MAX_SIZE': 64 * 1024 * 1024},
+            }
+        }
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        options = params.get('OPTIONS', {})
+        self._max_size = int(options.get('MAX_SIZE', 0)) or None
+
+    # Соединения
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Возвращает соединение текущего потока (после fork - новое соединение).
+        """
+        connections = getattr(_local, 'connections', None)
+        if connections is None:
+            connections = _local.connections = {}
+        pid, connection = connections.get(self._path, (None, None))
+        if connection is not None and pid == os.getpid():
+            return connection
+
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # в WAL безопасно и без fsync на каждую запись
+        self._ensure_schema(connection)
+        connections[self._path] = (os.getpid(), connection)
+        return connection
+
+    def _ensure_schema(self, connection: sqlite3.Connection) -> None:
+        with _ready_lock:
+            if self._path in _ready_paths:
+                return
+            connection.executescript('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed);
+                CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires);
+            ''')
+            _ready_paths.add(self._path)
+
+    # Вспомогательные функции
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _after_write(self, connection: sqlite3.Connection) -> None:
+        with _write_counts_lock:
+            writes = _write_counts[self._path] = _write_counts.get(self._path, 0) + 1
+        if (writes - 1) % CULL_CHECK_EVERY == 0:
+            try:
+                self._cull(connection)
+            except sqlite3.OperationalError as e:
+                # Запись уже сохранена; очистку выполнит одна из следующих записей
+                logger.warning(f"Не удалось очистить кэш {self._path}: {str(e)}")
+
+    def _cull(self, connection: sqlite3.Connection) -> None:
+        """
+        Удаляет истекшие записи и, если ограничения превышены, давно не
+        использованные записи.
+        """
+        now = time.time()
+        connection.execute('DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        count, total_size = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries'
+        ).fetchone()
+        if count > self._max_entries:
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache_entries')
+                return
+            connection.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed LIMIT ?)',
+                (count - self._max_entries + count // self._cull_frequency,),
+            )
+        if self._max_size is not None and total_size > self._max_size:
+            # Оставляем самые свежие записи, пока их суммарный размер не превысит 90% лимита
+            connection.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                ' SELECT key FROM ('
+                '  SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS running FROM cache_entries'
+                ' ) WHERE running > ?)',
+                (int(self._max_size * 0.9),),
+            )
+
+    # API кэша
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        data = self._dumps(value)
+        now = time.time()
+        try:
+            connection = self._connection()
+            # Атомарно: запись создается, только если ключа нет или он истек
+            cursor = connection.execute(
+                'INSERT INTO cache_entries (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+                'accessed = excluded.accessed, size = excluded.size '
+                'WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?',
+                (key, data, self.get_backend_timeout(timeout), now, len(data), now),
+            )
+            added = cursor.rowcount == 1
+            if added:
+                self._after_write(connection)
+            return added
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось записать {key} в кэш {self._path}: {str(e)}")
+            return False
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                'SELECT value, expires, accessed FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось прочитать {key} из кэша {self._path}: {str(e)}")
+            return default
+        if row is None:
+            return default
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            return default
+        if now - accessed > ACCESS_RESOLUTION:
+            self._touch_accessed(connection, [(now, key)])
+        return pickle.loads(value)
+
+    def _touch_accessed(self, connection: sqlite3.Connection, touched: List[tuple]) -> None:
+        """
+        Обновляет время последнего обращения; если файл занят, обновление пропускается.
+        """
+        try:
+            connection.executemany('UPDATE cache_entries SET accessed = ? WHERE key = ?', touched)
+        except sqlite3.OperationalError:
+            pass  # порядок LRU примерный, следующее чтение обновит время
+
+    def get_many(self, keys: Iterable[str], version=None) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        now = time.time()
+        placeholders = ', '.join('?' * len(key_map))
+        try:
+            connection = self._connection()
+            rows = connection.execute(
+                f'SELECT key, value, expires, accessed FROM cache_entries WHERE key IN ({placeholders})',
+                list(key_map),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось прочитать записи из кэша {self._path}: {str(e)}")
+            return {}
+        result, touched = {}, []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                continue
+            result[key_map[key]] = pickle.loads(value)
+            if now - accessed > ACCESS_RESOLUTION:
+                touched.append((now, key))
+        if touched:
+            self._touch_accessed(connection, touched)
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None) -> None:
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data: Dict[str, Any], timeout=DEFAULT_TIMEOUT, version=None) -> List[str]:
+        if not data:
+            return []
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = []
+        for key, value in data.items():
+            serialized = self._dumps(value)
+            rows.append((self.make_and_validate_key(key, version=version), serialized, expires, now, len(serialized)))
+        try:
+            connection = self._connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO cache_entries (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)',
+                    rows,
+                )
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+            self._after_write(connection)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось записать в кэш {self._path} (записей: {len(rows)}): {str(e)}")
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        try:
+            cursor = self._connection().execute(
+                'UPDATE cache_entries SET expires = ?, accessed = ? '
+                'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), now, key, now),
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось продлить {key} в кэше {self._path}: {str(e)}")
+            return False
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            cursor = self._connection().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        except sqlite3.OperationalError as e:
+            # Блокировки (single_flight, фоновое обновление) в этом случае истекут по таймауту
+            logger.warning(f"Не удалось удалить {key} из кэша {self._path}: {str(e)}")
+            return False
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys: Iterable[str], version=None) -> None:
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if not keys:
+            return
+        try:
+            self._connection().executemany('DELETE FROM cache_entries WHERE key = ?', [(key,) for key in keys])
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось удалить записи из кэша {self._path} (записей: {len(keys)}): {str(e)}")
+
+    def has_key(self, key, version=None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось прочитать {key} из кэша {self._path}: {str(e)}")
+            return False
+        return row is not None
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute('DELETE FROM cache_entries')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Не удалось очистить кэш {self._path}: {str(e)}")
+
+    def close(self, **kwargs) -> None:
+        # Соединения потоков переиспользуются между запросами и не закрываются
+        pass
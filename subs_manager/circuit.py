@@ -0,0 +1,239 @@
+import logging
+import random
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import django.dispatch
+from django.conf import settings
+from django.core.cache import cache
+from requests.exceptions import RequestException
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Константы автоматического выключателя (можно переопределить в settings.py)
+CIRCUIT_FAILURE_THRESHOLD = getattr(settings, 'CIRCUIT_FAILURE_THRESHOLD', 5)  # ошибок подряд до размыкания
+CIRCUIT_BASE_BACKOFF = getattr(settings, 'CIRCUIT_BASE_BACKOFF', 5)  # первая пауза после размыкания, в секундах
+CIRCUIT_MAX_BACKOFF = getattr(settings, 'CIRCUIT_MAX_BACKOFF', 60 * 5)  # максимальная пауза, в секундах
+CIRCUIT_PROBE_TIMEOUT = getattr(settings, 'CIRCUIT_PROBE_TIMEOUT', 30)  # сколько длится пробный запрос
+CIRCUIT_STATE_TIMEOUT = 60 * 60 * 24  # состояние выключателя хранится в кэше не дольше суток
+
+CLOSED = 'closed'  # запросы проходят
+OPEN = 'open'  # запросы сразу отклоняются
+HALF_OPEN = 'half_open'  # пропускается один пробный запрос
+
+# Сигнал о смене состояния выключателя: sender=None, endpoint, old_state, new_state, failures
+circuit_state_changed = django.dispatch.Signal()
+
+
+class CircuitOpenError(RequestException):
+    """
+    Запрос не выполнен: выключатель конечной точки разомкнут.
+
+    Наследуется от RequestException, поэтому вызывающий код обрабатывает
+    его так же, как недоступность API, и переходит к сохраненным данным.
+    """
+
+
+def endpoint_for(url: str) -> str:
+    """
+    Возвращает конечную точку API для URL: хост и путь без параметров запроса.
+
+    Все профили одной платформы обращаются к одной конечной точке, поэтому
+    ее недоступность обнаруживается по ошибкам любого из них.
+
+    Example:
+        endpoint_for("http://api:8090/linkedin/latest?profile_id=x")  # "api:8090/linkedin/latest"
+    """
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def _state_key(endpoint: str) -> str:
+    return f"circuit:{endpoint}"
+
+
+def _probe_key(endpoint: str) -> str:
+    return f"circuit:{endpoint}:probe"
+
+
+def _initial_state() -> Dict[str, Any]:
+    return {'state': CLOSED, 'failures': 0, 'opened': 0, 'retry_at': 0.0}
+
+
+def _backoff(opened: int) -> float:
+    """
+    Экспоненциальная пауза с джиттером: после каждого неудачного пробного
+    запроса пауза удваивается, а случайная доля разводит процессы во времени.
+    """
+    delay = min(CIRCUIT_MAX_BACKOFF, CIRCUIT_BASE_BACKOFF * 2 ** opened)
+    return random.uniform(delay / 2, delay)
+
+
+def _notify(endpoint: str, old_state: str, new_state: str, failures: int) -> None:
+    """
+    Сообщает о смене состояния выключателя в лог и сигналом circuit_state_changed.
+    """
+    if new_state == OPEN:
+        logger.warning(f"Выключатель {endpoint} разомкнут после {failures} ошибок ({old_state} -> {new_state})")
+    else:
+        logger.info(f"Выключатель {endpoint}: {old_state} -> {new_state}")
+    circuit_state_changed.send(
+        sender=None, endpoint=endpoint, old_state=old_state, new_state=new_state, failures=failures,
+    )
+
+
+def _on_failure(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Рассчитывает новое состояние после ошибки запроса.
+    """
+    if state['state'] == OPEN:
+        # Ошибки запросов, начатых до размыкания, не продлевают паузу
+        return state
+    failures = state['failures'] + 1
+    if state['state'] == HALF_OPEN or failures >= CIRCUIT_FAILURE_THRESHOLD:
+        opened = state['opened'] if state['state'] == CLOSED else state['opened'] + 1
+        return {'state': OPEN, 'failures': failures, 'opened': opened, 'retry_at': time.time() + _backoff(opened)}
+    return {**state, 'failures': failures}
+
+
+def _check(state: Dict[str, Any]) -> Tuple[bool, bool]:
+    """
+    Возвращает (пропустить запрос, нужен пробный запрос) для состояния.
+    """
+    if state['state'] == CLOSED:
+        return True, False
+    if state['state'] == OPEN and time.time() < state['retry_at']:
+        return False, False
+    return False, True
+
+
+def allow_request(url: str) -> None:
+    """
+    Проверяет выключатель конечной точки перед запросом к API.
+
+    Пока выключатель замкнут, запросы проходят. После разомкнутого
+    состояния и паузы один процесс (блокировка cache.add) выполняет
+    пробный запрос в полуоткрытом состоянии, остальные сразу получают
+    CircuitOpenError.
+
+    Args:
+        url (str): URL запроса
+
+    Raises:
+        CircuitOpenError: если выключатель разомкнут
+    """
+    endpoint = endpoint_for(url)
+    state = cache.get(_state_key(endpoint)) or _initial_state()
+    allowed, probe = _check(state)
+    if allowed:
+        return
+    if probe and cache.add(_probe_key(endpoint), True, CIRCUIT_PROBE_TIMEOUT):
+        if state['state'] != HALF_OPEN:
+            cache.set(_state_key(endpoint), {**state, 'state': HALF_OPEN}, CIRCUIT_STATE_TIMEOUT)
+            _notify(endpoint, state['state'], HALF_OPEN, state['failures'])
+        return
+    raise CircuitOpenError(f"API временно недоступно ({endpoint}), повторная попытка позже")
+
+
+def record_success(url: str) -> None:
+    """
+    Отмечает успешный запрос: выключатель замыкается, счетчик ошибок сбрасывается.
+    """
+    endpoint = endpoint_for(url)
+    state = cache.get(_state_key(endpoint))
+    if state is None or (state['state'] == CLOSED and state['failures'] == 0):
+        return
+    cache.set(_state_key(endpoint), _initial_state(), CIRCUIT_STATE_TIMEOUT)
+    cache.delete(_probe_key(endpoint))
+    if state['state'] != CLOSED:
+        _notify(endpoint, state['state'], CLOSED, 0)
+
+
+def record_failure(url: str) -> None:
+    """
+    Отмечает ошибку запроса. После CIRCUIT_FAILURE_THRESHOLD ошибок подряд
+    или неудачного пробного запроса выключатель размыкается.
+
+    Состояние читается и записывается без блокировки: при одновременных
+    ошибках в разных процессах счетчик может отстать на несколько единиц,
+    что лишь немного откладывает размыкание.
+    """
+    endpoint = endpoint_for(url)
+    state = cache.get(_state_key(endpoint)) or _initial_state()
+    new_state = _on_failure(state)
+    cache.set(_state_key(endpoint), new_state, CIRCUIT_STATE_TIMEOUT)
+    if new_state['state'] != state['state']:
+        cache.delete(_probe_key(endpoint))
+        _notify(endpoint, state['state'], new_state['state'], new_state['failures'])
+
+
+async def aallow_request(url: str) -> None:
+    """
+    Асинхронный вариант allow_request для async-представлений.
+
+    Raises:
+        CircuitOpenError: если выключатель разомкнут
+    """
+    endpoint = endpoint_for(url)
+    state = await cache.aget(_state_key(endpoint)) or _initial_state()
+    allowed, probe = _check(state)
+    if allowed:
+        return
+    if probe and await cache.aadd(_probe_key(endpoint), True, CIRCUIT_PROBE_TIMEOUT):
+        if state['state'] != HALF_OPEN:
+            await cache.aset(_state_key(endpoint), {**state, 'state': HALF_OPEN}, CIRCUIT_STATE_TIMEOUT)
+            _notify(endpoint, state['state'], HALF_OPEN, state['failures'])
+        return
+    raise CircuitOpenError(f"API временно недоступно ({endpoint}), повторная попытка позже")
+
+
+async def arecord_success(url: str) -> None:
+    """
+    Асинхронный вариант record_success.
+    """
+    endpoint = endpoint_for(url)
+    state = await cache.aget(_state_key(endpoint))
+    if state is None or (state['state'] == CLOSED and state['failures'] == 0):
+        return
+    await cache.aset(_state_key(endpoint), _initial_state(), CIRCUIT_STATE_TIMEOUT)
+    await cache.adelete(_probe_key(endpoint))
+    if state['state'] != CLOSED:
+        _notify(endpoint, state['state'], CLOSED, 0)
+
+
+async def arecord_failure(url: str) -> None:
+    """
+    Асинхронный вариант record_failure.
+    """
+    endpoint = endpoint_for(url)
+    state = await cache.aget(_state_key(endpoint)) or _initial_state()
+    new_state = _on_failure(state)
+    await cache.aset(_state_key(endpoint), new_state, CIRCUIT_STATE_TIMEOUT)
+    if new_state['state'] != state['state']:
+        await cache.adelete(_probe_key(endpoint))
+        _notify(endpoint, state['state'], new_state['state'], new_state['failures'])
+
+
+def get_circuit_states(endpoints: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Возвращает состояние выключателей конечных точек.
+
+    Args:
+        endpoints (List[str]): Конечные точки (см. endpoint_for)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Словарь вида
+            {'host/linkedin/latest': {'state': 'open', 'failures': 5, 'retry_in': 12.3}}
+    """
+    states = cache.get_many([_state_key(endpoint) for endpoint in endpoints])
+    result = {}
+    for endpoint in endpoints:
+        state = states.get(_state_key(endpoint)) or _initial_state()
+        result[endpoint] = {
+            'state': state['state'],
+            'failures': state['failures'],
+            'retry_in': round(max(0.0, state['retry_at'] - time.time()), 1) if state['state'] == OPEN else 0,
+        }
+    return result
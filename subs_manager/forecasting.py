@@ -0,0 +1,377 @@
+import hashlib
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import CACHE_REQUESTS, FORECAST_DURATION
+from .series import DailySeries
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Параметры прогноза (см. calculate_trend_prediction в views.py)
+FORECAST_WINDOW = 30  # прогноз строится по последним 30 точкам
+FORECAST_MIN_POINTS = 5  # минимум точек для надежного прогноза
+SMOOTHING_ALPHA = 0.3  # коэффициент экспоненциального сглаживания
+POLY_WEIGHT = 0.7  # доля полиномиального прогноза в итоговом значении
+
+# Кэш прогнозов (можно переопределить в settings.py)
+FORECAST_CACHE_ALIAS = getattr(settings, 'FORECAST_CACHE_ALIAS', 'forecasts')  # алиас в CACHES
+FORECAST_CACHE_TIMEOUT = getattr(settings, 'FORECAST_CACHE_TIMEOUT', 60 * 60 * 24 * 7)  # время жизни прогноза
+
+# Онлайн-прогноз (см. OnlineForecaster)
+FORECAST_DAYS_AHEAD = getattr(settings, 'FORECAST_DAYS_AHEAD', 2)  # горизонт прогноза, сохраняемого при опросе
+FORECAST_TREND_POINTS = 5  # сколько последних сглаженных изменений усредняется в тренд
+
+
+def forecast_batch(days_nums: np.ndarray, counts: np.ndarray, days_ahead: int = 2) -> np.ndarray:
+    """
+    Рассчитывает прогноз сразу для N рядов с общими датами.
+
+    Для всех рядов за один проход выполняется:
+    1. Полиномиальная регрессия 2-й степени (один вызов np.polyfit с матрицей
+       правых частей вместо N отдельных вызовов)
+    2. Экспоненциальное сглаживание изменений: рекуррентная формула
+       считается по времени, но одновременно для всех рядов
+    3. Взвешенная комбинация (70% полиномиальный прогноз, 30% линейный тренд)
+
+    Результат совпадает с calculate_trend_prediction для каждого ряда.
+
+    Args:
+        days_nums: Номера дней от первой даты окна, форма (W,)
+        counts: Количество подписчиков, форма (N, W)
+        days_ahead: На сколько дней вперед делать прогноз
+
+    Returns:
+        np.ndarray: Прогноз количества подписчиков, форма (N, days_ahead), int64
+
+    Example:
+        days = np.arange(30)
+        predictions = forecast_batch(days, counts_matrix, days_ahead=7)
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if counts.ndim == 1:
+        counts = counts[np.newaxis, :]
+    window = counts.shape[1]
+    steps = np.arange(1, days_ahead + 1)
+
+    # Полиномиальная регрессия 2-й степени для всех рядов сразу
+    coeffs = np.polyfit(days_nums, counts.T, 2)  # форма (3, N)
+    future_days = days_nums[-1] + steps
+    # Схема Горнера, как в np.poly1d
+    poly_pred = (coeffs[0][:, np.newaxis] * future_days + coeffs[1][:, np.newaxis]) * future_days \
+        + coeffs[2][:, np.newaxis]
+
+    # Экспоненциальное сглаживание изменений, векторно по рядам
+    changes = np.diff(counts, axis=1)
+    smoothed = np.empty_like(changes)
+    smoothed[:, 0] = changes[:, 0]
+    for i in range(1, window - 1):
+        smoothed[:, i] = SMOOTHING_ALPHA * changes[:, i] + (1 - SMOOTHING_ALPHA) * smoothed[:, i - 1]
+
+    # Среднее изменение за последние дни с учетом сглаживания
+    recent_trend = smoothed[:, -5:].mean(axis=1) if window - 1 >= 5 else smoothed[:, -1]
+    trend_pred = counts[:, -1][:, np.newaxis] + recent_trend[:, np.newaxis] * steps
+
+    # Взвешенная комбинация; приведение к int64 отбрасывает дробную часть, как int()
+    return (POLY_WEIGHT * poly_pred + (1 - POLY_WEIGHT) * trend_pred).astype(np.int64)
+
+
+def _format_predictions(last_date: np.datetime64, predicted: np.ndarray) -> List[Dict[str, object]]:
+    """
+    Преобразует строку прогноза в список словарей с датами.
+    """
+    future_dates = last_date + np.arange(1, len(predicted) + 1).astype('timedelta64[D]')
+    return [
+        {'date': day, 'predicted_count': count}
+        for day, count in zip(np.datetime_as_string(future_dates, unit='D').tolist(), predicted.tolist())
+    ]
+
+
+def forecast_series_batch(series_list: Sequence[DailySeries], days_ahead: int = 2) -> List[List[Dict[str, object]]]:
+    """
+    Рассчитывает прогноз для набора рядов (например, всех отслеживаемых профилей).
+
+    Из каждого ряда берутся последние FORECAST_WINDOW точек. Ряды с
+    одинаковыми датами окна объединяются в одну матрицу и считаются одним
+    вызовом forecast_batch, поэтому сотни профилей, которые опрашиваются
+    в одни и те же дни, обрабатываются за несколько векторных операций.
+
+    Args:
+        series_list: Ежедневная статистика профилей
+        days_ahead: На сколько дней вперед делать прогноз
+
+    Returns:
+        List[List[Dict]]: Для каждого ряда список вида
+            [{'date': 'YYYY-MM-DD', 'predicted_count': 123}, ...];
+            пустой список, если точек меньше FORECAST_MIN_POINTS
+    """
+    results: List[List[Dict[str, object]]] = [[] for _ in series_list]
+
+    # Группируем ряды по датам окна: внутри группы матрица X общая
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    windows = []
+    for index, series in enumerate(series_list):
+        recent = series.tail(FORECAST_WINDOW)
+        windows.append(recent)
+        if len(recent) < FORECAST_MIN_POINTS:
+            continue
+        key = tuple(recent.dates.astype(np.int64).tolist())
+        groups.setdefault(key, []).append(index)
+
+    for indices in groups.values():
+        first = windows[indices[0]]
+        days_nums = (first.dates - first.dates[0]).astype(np.int64)
+        counts = np.stack([windows[index].counts for index in indices])
+        predicted = forecast_batch(days_nums, counts, days_ahead)
+        for row, index in enumerate(indices):
+            results[index] = _format_predictions(first.dates[-1], predicted[row])
+
+    return results
+
+
+def series_fingerprint(series: DailySeries, days_ahead: int) -> str:
+    """
+    Возвращает отпечаток окна прогноза: одинаковые входные данные дают
+    одинаковый прогноз, поэтому отпечаток служит ключом кэша.
+
+    Args:
+        series: Ежедневная статистика профиля
+        days_ahead: На сколько дней вперед делается прогноз
+
+    Returns:
+        str: Ключ вида forecast:<sha1>
+    """
+    recent = series.tail(FORECAST_WINDOW)
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(recent.dates.astype(np.int64)).tobytes())
+    digest.update(np.ascontiguousarray(recent.counts.astype(np.int64)).tobytes())
+    digest.update(str(days_ahead).encode())
+    return f"forecast:{digest.hexdigest()}"
+
+
+def cached_forecast_series_batch(series_list: Sequence[DailySeries], days_ahead: int = 2) -> List[List[Dict[str, object]]]:
+    """
+    forecast_series_batch с кэшированием результатов по отпечатку окна.
+
+    Ряд меняется не чаще раза в день, поэтому повторные рендеры страниц
+    берут готовый прогноз из кэша FORECAST_CACHE_ALIAS (по умолчанию -
+    кэш в файле SQLite, см. cache_backends.SQLiteCache: общий для всех
+    процессов и переживающий перезапуск; давно не использованные записи
+    вытесняются по MAX_ENTRIES). Регрессия считается только
+    для рядов, которых нет в кэше, одним пакетным вызовом.
+
+    Args:
+        series_list: Ежедневная статистика профилей
+        days_ahead: На сколько дней вперед делать прогноз
+
+    Returns:
+        List[List[Dict]]: То же, что forecast_series_batch
+
+    Example:
+        predictions = cached_forecast_series_batch([series])[0]
+    """
+    forecast_cache = caches[FORECAST_CACHE_ALIAS]
+    keys = [series_fingerprint(series, days_ahead) for series in series_list]
+    cached = forecast_cache.get_many(keys)
+
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+    CACHE_REQUESTS.inc('forecast', 'hit', amount=len(keys) - len(missing))
+    if missing:
+        CACHE_REQUESTS.inc('forecast', 'miss', amount=len(missing))
+        logger.debug(f"Прогноз не найден в кэше для {len(missing)} из {len(keys)} рядов")
+        with FORECAST_DURATION.time():
+            computed = forecast_series_batch([series_list[index] for index in missing], days_ahead)
+        fresh = {keys[index]: predictions for index, predictions in zip(missing, computed)}
+        forecast_cache.set_many(fresh, FORECAST_CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return [cached[key] for key in keys]
+
+
+class OnlineForecaster:
+    """
+    Потоковый вариант forecast_batch для одного профиля.
+
+    Хранит окно из последних FORECAST_WINDOW точек и достаточные статистики
+    квадратичной регрессии (суммы x^k и x^k*y), а также текущее значение
+    экспоненциального сглаживания изменений. Добавление нового дня стоит O(1):
+    статистики вытесняемой точки вычитаются, новой - прибавляются. Суммы
+    считаются в целых числах Python, поэтому ошибка не накапливается.
+
+    Сглаживание, в отличие от forecast_batch, не начинается заново с начала
+    окна, а идет по всей истории. Влияние точек старше окна не превышает
+    0.7^29, поэтому прогноз совпадает с пакетным с точностью до единицы
+    (при истории короче окна - точно).
+
+    Состояние сохраняется между процессами через to_state()/from_state().
+
+    Example:
+        forecaster = OnlineForecaster.from_series(series)
+        forecaster.append(date(2024, 1, 31), 1234)
+        forecaster.predict(2)
+    """
+
+    # Номера дней считаются от origin; при удалении от него на столько дней
+    # начало пересчитывается, чтобы степени x оставались небольшими
+    REBASE_AFTER = FORECAST_WINDOW * 4
+
+    def __init__(self):
+        self.origin: Optional[int] = None  # номер дня (от 1970-01-01), от которого считается x
+        self.window: deque = deque(maxlen=FORECAST_WINDOW)  # пары (x, count)
+        self.sums: List[int] = [0] * 8  # n, Σx, Σx², Σx³, Σx⁴, Σy, Σxy, Σx²y
+        self.smoothed: Optional[float] = None  # текущее сглаженное изменение
+        self.recent: deque = deque(maxlen=FORECAST_TREND_POINTS)  # последние сглаженные изменения
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    @property
+    def last_day(self) -> Optional[int]:
+        """Номер последнего дня в окне (от 1970-01-01) или None."""
+        return self.origin + self.window[-1][0] if self.window else None
+
+    @staticmethod
+    def _point_sums(x: int, y: int) -> Tuple[int, ...]:
+        return 1, x, x ** 2, x ** 3, x ** 4, y, x * y, x ** 2 * y
+
+    def _rebase(self) -> None:
+        """
+        Переносит начало отсчета на первую точку окна и пересчитывает суммы.
+
+        Выполняется раз в REBASE_AFTER дней, поэтому в среднем тоже O(1).
+        """
+        shift = self.window[0][0]
+        self.origin += shift
+        self.window = deque(((x - shift, y) for x, y in self.window), maxlen=FORECAST_WINDOW)
+        self.sums = [0] * 8
+        for x, y in self.window:
+            self.sums = [total + part for total, part in zip(self.sums, self._point_sums(x, y))]
+
+    def append(self, day: int, count: int) -> None:
+        """
+        Добавляет новый день.
+
+        Args:
+            day (int): Номер дня от 1970-01-01 (больше последнего в окне)
+            count (int): Количество подписчиков
+
+        Raises:
+            ValueError: если день не новее последнего добавленного
+        """
+        day, count = int(day), int(count)
+        if self.origin is None:
+            self.origin = day
+        elif day <= self.last_day:
+            raise ValueError(f"День {day} не новее последнего ({self.last_day})")
+        else:
+            # Экспоненциальное сглаживание изменений, как в forecast_batch
+            change = count - self.window[-1][1]
+            if self.smoothed is None:
+                self.smoothed = change
+            else:
+                self.smoothed = SMOOTHING_ALPHA * change + (1 - SMOOTHING_ALPHA) * self.smoothed
+            self.recent.append(self.smoothed)
+
+        if len(self.window) == FORECAST_WINDOW:
+            # Вытесняем самую старую точку из статистик
+            old_x, old_y = self.window[0]
+            self.sums = [total - part for total, part in zip(self.sums, self._point_sums(old_x, old_y))]
+
+        x = day - self.origin
+        self.window.append((x, count))
+        self.sums = [total + part for total, part in zip(self.sums, self._point_sums(x, count))]
+        if x >= self.REBASE_AFTER:
+            self._rebase()
+
+    def extend(self, series: DailySeries) -> bool:
+        """
+        Добавляет дни ряда, которых еще нет в окне.
+
+        Дни, которые уже есть в окне с тем же значением, пропускаются (при
+        синхронизации последние дни загружаются повторно).
+
+        Args:
+            series: Ежедневная статистика, упорядоченная по дате
+
+        Returns:
+            bool: False, если значение уже добавленного дня изменилось или
+                день старше окна - тогда состояние нужно построить заново
+        """
+        known = {self.origin + x: y for x, y in self.window} if self.window else {}
+        for day, count in zip(series.dates.astype(np.int64).tolist(), series.counts.tolist()):
+            if self.window and day <= self.last_day:
+                if known.get(day) != count:
+                    return False
+                continue
+            self.append(day, count)
+        return True
+
+    def predict(self, days_ahead: int = FORECAST_DAYS_AHEAD) -> List[Dict[str, object]]:
+        """
+        Рассчитывает прогноз по текущему состоянию за O(1).
+
+        Args:
+            days_ahead: На сколько дней вперед делать прогноз
+
+        Returns:
+            List[Dict]: Список вида [{'date': 'YYYY-MM-DD', 'predicted_count': 123}, ...];
+                пустой список, если точек меньше FORECAST_MIN_POINTS
+        """
+        if len(self.window) < FORECAST_MIN_POINTS:
+            return []
+
+        n, sx, sx2, sx3, sx4, sy, sxy, sx2y = (float(total) for total in self.sums)
+        # Нормальные уравнения квадратичной регрессии
+        coeffs = np.linalg.solve(
+            np.array([[sx4, sx3, sx2], [sx3, sx2, sx], [sx2, sx, n]]),
+            np.array([sx2y, sxy, sy]),
+        )
+        steps = np.arange(1, days_ahead + 1)
+        last_x, last_count = self.window[-1]
+        future_x = last_x + steps
+        poly_pred = (coeffs[0] * future_x + coeffs[1]) * future_x + coeffs[2]
+
+        recent_trend = np.mean(self.recent) if len(self.recent) >= FORECAST_TREND_POINTS else self.recent[-1]
+        trend_pred = last_count + recent_trend * steps
+
+        predicted = (POLY_WEIGHT * poly_pred + (1 - POLY_WEIGHT) * trend_pred).astype(np.int64)
+        return _format_predictions(np.datetime64(self.last_day, 'D'), predicted)
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние в виде, пригодном для сохранения в JSON.
+        """
+        return {
+            'origin': self.origin,
+            'window': [list(point) for point in self.window],
+            'sums': [str(total) for total in self.sums],  # строки: суммы могут не поместиться в JSON-число
+            'smoothed': self.smoothed,
+            'recent': list(self.recent),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'OnlineForecaster':
+        """
+        Восстанавливает прогнозатор из состояния to_state().
+        """
+        forecaster = cls()
+        forecaster.origin = state['origin']
+        forecaster.window.extend(tuple(point) for point in state['window'])
+        forecaster.sums = [int(total) for total in state['sums']]
+        forecaster.smoothed = state['smoothed']
+        forecaster.recent.extend(state['recent'])
+        return forecaster
+
+    @classmethod
+    def from_series(cls, series: DailySeries) -> 'OnlineForecaster':
+        """
+        Строит прогнозатор по ряду, добавляя дни по одному.
+        """
+        forecaster = cls()
+        forecaster.extend(series)
+        return forecaster
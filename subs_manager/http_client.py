@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import threading
+import weakref
+from typing import AsyncIterator, Dict, Any, Optional, Tuple, Union
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError, RequestException, Timeout
+
+try:
+    import httpx
+except ImportError:  # без httpx async-запросы выполняются в пуле потоков
+    httpx = None
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Константы пула соединений (можно переопределить в settings.py)
+API_POOL_CONNECTIONS = getattr(settings, 'API_POOL_CONNECTIONS', 10)  # количество пулов (хостов)
+API_POOL_MAXSIZE = getattr(settings, 'API_POOL_MAXSIZE', 20)  # соединений на один хост
+API_POOL_BLOCK = getattr(settings, 'API_POOL_BLOCK', False)  # ждать ли свободное соединение
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncIterator]]' = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_session() -> requests.Session:
+    """
+    Возвращает общую для процесса HTTP-сессию с пулом keep-alive соединений.
+
+    Сессия создается лениво при первом обращении. Все запросы к API
+    переиспользуют уже открытые TCP-соединения вместо установки новых.
+
+    Returns:
+        requests.Session: Сессия с настроенным HTTPAdapter
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=API_POOL_CONNECTIONS,
+                    pool_maxsize=API_POOL_MAXSIZE,
+                    pool_block=API_POOL_BLOCK,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+                logger.debug(
+                    f"Создан пул соединений: {API_POOL_CONNECTIONS} хостов, "
+                    f"{API_POOL_MAXSIZE} соединений на хост"
+                )
+    return _session
+
+
+def http_get(url: str, timeout: float) -> requests.Response:
+    """
+    Выполняет GET-запрос через общую сессию.
+
+    Args:
+        url (str): URL для запроса
+        timeout (float): Таймаут запроса в секундах
+
+    Returns:
+        requests.Response: Ответ сервера
+    """
+    return get_session().get(url, timeout=timeout)
+
+
+async def _client_lifetime(
+    loop: asyncio.AbstractEventLoop, client: 'httpx.AsyncClient',
+) -> AsyncIterator['httpx.AsyncClient']:
+    """
+    Асинхронный генератор, закрывающий клиент при завершении цикла событий.
+
+    asyncio.run (в том числе внутри async_to_sync) перед закрытием цикла
+    вызывает loop.shutdown_asyncgens(), и незавершенный генератор выполняет
+    блок finally.
+    """
+    try:
+        yield client
+    finally:
+        # Клиент ссылается на цикл, поэтому запись сама из словаря не удалится
+        _async_clients.pop(loop, None)
+        await client.aclose()
+
+
+async def _get_async_client() -> 'httpx.AsyncClient':
+    """
+    Возвращает асинхронный HTTP-клиент с пулом соединений для текущего цикла событий.
+
+    Соединения httpx привязаны к циклу событий, поэтому клиент создается
+    по одному на цикл. Под ASGI цикл один на процесс, и все async-представления
+    используют общий пул keep-alive соединений. Короткоживущие циклы
+    (async_to_sync создает новый цикл на каждый вызов) закрывают свой клиент
+    при завершении, поэтому сокеты не накапливаются.
+
+    Returns:
+        httpx.AsyncClient: Клиент с лимитами API_POOL_MAXSIZE
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=API_POOL_CONNECTIONS * API_POOL_MAXSIZE,
+                max_keepalive_connections=API_POOL_MAXSIZE,
+            ),
+        )
+        lifetime = _client_lifetime(loop, client)
+        # Первая итерация регистрирует генератор в цикле событий
+        await lifetime.__anext__()
+        entry = _async_clients[loop] = (client, lifetime)
+    return entry[0]
+
+
+async def async_http_get(url: str, timeout: float) -> Union[requests.Response, 'httpx.Response']:
+    """
+    Асинхронный GET-запрос для использования в async-представлениях.
+
+    Если установлен httpx, запрос выполняется неблокирующим клиентом и не
+    занимает поток на время ожидания ответа. Иначе запрос выполняется в пуле
+    потоков через общую синхронную сессию.
+
+    Ошибки httpx преобразуются в исключения requests (Timeout, HTTPError с
+    ответом, RequestException), чтобы вызывающий код обрабатывал их
+    одинаково, в том числе отличал ответы 4xx от недоступности API.
+
+    Args:
+        url (str): URL для запроса
+        timeout (float): Таймаут запроса в секундах
+
+    Returns:
+        Ответ сервера с методами raise_for_status() и json()
+
+    Raises:
+        Timeout: при превышении времени ожидания
+        HTTPError: при HTTP-статусах 4xx/5xx (с ответом в атрибуте response)
+        RequestException: при ошибках сети
+    """
+    if httpx is None:
+        return await sync_to_async(http_get, thread_sensitive=False)(url, timeout)
+
+    try:
+        client = await _get_async_client()
+        response = await client.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response
+    except httpx.TimeoutException as e:
+        raise Timeout(str(e)) from e
+    except httpx.HTTPStatusError as e:
+        raise HTTPError(str(e), response=e.response) from e
+    except httpx.HTTPError as e:
+        raise RequestException(str(e)) from e
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Собирает статистику использования пула соединений.
+
+    Для каждого хоста возвращает количество открытых соединений, выполненных
+    запросов, свободных соединений в пуле и долю переиспользованных соединений.
+
+    Returns:
+        Dict[str, Any]: Статистика вида
+            {
+                'pool_connections': 10,
+                'pool_maxsize': 20,
+                'hosts': {
+                    'http://host:port': {
+                        'connections': 2,
+                        'requests': 150,
+                        'idle': 2,
+                        'reuse_rate': 0.987,
+                    },
+                },
+            }
+    """
+    stats = {
+        'pool_connections': API_POOL_CONNECTIONS,
+        'pool_maxsize': API_POOL_MAXSIZE,
+        'hosts': {},
+    }
+    if _session is None:
+        return stats
+
+    adapter = _session.get_adapter('http://')
+    pools = adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        num_requests = pool.num_requests
+        num_connections = pool.num_connections
+        host = f"{pool.scheme}://{pool.host}:{pool.port}"
+        stats['hosts'][host] = {
+            'connections': num_connections,
+            'requests': num_requests,
+            # Очередь пула заполнена заглушками None, считаем только реальные соединения
+            'idle': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+            'reuse_rate': round(1 - num_connections / num_requests, 3) if num_requests else 0.0,
+        }
+    return stats
@@ -0,0 +1,564 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from requests.exceptions import RequestException
+
+from .forecasting import FORECAST_DAYS_AHEAD, FORECAST_WINDOW, OnlineForecaster
+from .models import LatestSnapshot, DailyStat, StatRollup, SyncState, ForecastState
+from .profiles import Profile, get_profiles
+from .series import ROLLUP_GRANULARITIES, DailySeries, parse_daily_stats, period_starts
+from .views import afetch_api_data, fetch_api_data, parse_count, publish_stored_latest
+
+try:
+    import fcntl
+except ImportError:  # Windows: планировщик запускается в каждом процессе
+    fcntl = None
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Интервал фонового опроса API в секундах (можно переопределить в settings.py)
+INGESTION_INTERVAL = getattr(settings, 'INGESTION_INTERVAL', 60 * 5)
+# Сколько последних сохраненных дней перезагружать при инкрементальной синхронизации
+DAILY_SYNC_OVERLAP_DAYS = getattr(settings, 'DAILY_SYNC_OVERLAP_DAYS', 2)
+# Параметр запроса /daily-stats для фильтрации по дате (None - API не поддерживает).
+# Без него каждая синхронизация загружает всю историю: экономится только
+# разбор и запись уже сохраненных дней, но не трафик
+DAILY_STATS_SINCE_PARAM = getattr(settings, 'DAILY_STATS_SINCE_PARAM', None)
+# Максимальное количество одновременных запросов к API при опросе всех профилей
+INGESTION_CONCURRENCY = getattr(settings, 'INGESTION_CONCURRENCY', 32)
+# Сколько записей в базу выполняется в одной транзакции при опросе всех профилей
+INGESTION_WRITE_BATCH = 200
+# Сколько дней хранятся устаревшие снимки LatestSnapshot (последний снимок профиля хранится всегда)
+LATEST_SNAPSHOT_RETENTION_DAYS = getattr(settings, 'LATEST_SNAPSHOT_RETENTION_DAYS', 7)
+# Сколько секунд при завершении процесса ждать окончания текущего цикла опроса
+SCHEDULER_STOP_TIMEOUT = 10
+# Файл блокировки встроенного планировщика: опрос выполняет только процесс, захвативший его
+INGESTION_LOCK_PATH = getattr(
+    settings, 'INGESTION_LOCK_PATH', os.path.join(settings.BASE_DIR, 'cache', 'ingestion.lock')
+)
+
+_scheduler_thread: Optional[threading.Thread] = None
+_scheduler_lock_fd: Optional[int] = None
+_scheduler_stop = threading.Event()
+_scheduler_lock = threading.Lock()
+
+
+def store_latest(profile: Profile, data: Dict[str, Any]) -> LatestSnapshot:
+    """
+    Сохраняет ответ /latest в виде снимка профиля.
+
+    Если API вернуло тот же timestamp, что и в последнем снимке, новая запись
+    не создается, а у последней обновляется fetched_at.
+
+    Args:
+        profile (Profile): Профиль из реестра
+        data (Dict[str, Any]): Ответ API /latest
+
+    Returns:
+        LatestSnapshot: Сохраненный снимок
+
+    Raises:
+        ValueError: при некорректном ответе
+    """
+    latest_data = data.get('latest_data', {})
+    if 'count' not in latest_data:
+        raise ValueError(f"В ответе API нет количества подписчиков для {profile.key}")
+
+    count = parse_count(latest_data['count'])
+    upstream_timestamp = str(latest_data.get('timestamp', ''))
+    now = timezone.now()
+
+    last = (
+        LatestSnapshot.objects
+        .filter(platform=profile.platform, profile_id=profile.profile_id)
+        .order_by('-fetched_at')
+        .first()
+    )
+    if last is not None and last.upstream_timestamp == upstream_timestamp and last.count == count:
+        last.fetched_at = now
+        last.save(update_fields=['fetched_at'])
+        return last
+
+    return LatestSnapshot.objects.create(
+        platform=profile.platform,
+        profile_id=profile.profile_id,
+        count=count,
+        upstream_timestamp=upstream_timestamp,
+        fetched_at=now,
+    )
+
+
+def get_sync_start_date(profile: Profile) -> Optional[date]:
+    """
+    Возвращает дату, начиная с которой нужно загружать ежедневную статистику.
+
+    Это последняя сохраненная дата минус DAILY_SYNC_OVERLAP_DAYS: значения за
+    последние дни API еще может уточнить. None означает полную загрузку.
+
+    Args:
+        profile (Profile): Профиль из реестра
+
+    Returns:
+        Optional[date]: Дата начала синхронизации или None
+    """
+    last_date = (
+        SyncState.objects
+        .filter(platform=profile.platform, profile_id=profile.profile_id)
+        .values_list('last_date', flat=True)
+        .first()
+    )
+    if last_date is None:
+        return None
+    return last_date - timedelta(days=DAILY_SYNC_OVERLAP_DAYS)
+
+
+def get_sync_start_dates(profiles: List[Profile]) -> Dict[str, Optional[date]]:
+    """
+    Возвращает даты начала синхронизации для многих профилей одним запросом.
+
+    Args:
+        profiles (List[Profile]): Профили из реестра
+
+    Returns:
+        Dict[str, Optional[date]]: Словарь вида {profile.key: дата или None}
+    """
+    last_dates = {
+        f"{platform}/{profile_id}": last_date
+        for platform, profile_id, last_date in (
+            SyncState.objects
+            .filter(platform__in={profile.platform for profile in profiles}, last_date__isnull=False)
+            .values_list('platform', 'profile_id', 'last_date')
+        )
+    }
+    return {
+        profile.key: (
+            last_dates[profile.key] - timedelta(days=DAILY_SYNC_OVERLAP_DAYS)
+            if profile.key in last_dates else None
+        )
+        for profile in profiles
+    }
+
+
+def get_daily_stats_url(profile: Profile, since: Optional[date] = None) -> str:
+    """
+    Формирует URL /daily-stats с учетом даты начала синхронизации.
+
+    Если API поддерживает фильтрацию по дате (DAILY_STATS_SINCE_PARAM),
+    дата передается в запросе и API возвращает только новые дни. Иначе
+    запрашивается вся история, а дни до since отбрасываются при разборе.
+
+    Args:
+        profile (Profile): Профиль из реестра
+        since (Optional[date]): Дата начала синхронизации
+
+    Returns:
+        str: URL запроса
+    """
+    url = profile.daily_stats_url
+    if since is not None and DAILY_STATS_SINCE_PARAM:
+        url = f"{url}&{DAILY_STATS_SINCE_PARAM}={since.isoformat()}"
+    return url
+
+
+def store_daily_stats(profile: Profile, data: Dict[str, Any], since: Optional[date] = None) -> int:
+    """
+    Сохраняет ответ /daily-stats в базу.
+
+    Сохраняются только дни начиная с since: более ранние уже есть в базе
+    и не разбираются. Повторяющиеся даты в ответе схлопываются, а повторное
+    сохранение тех же дней идемпотентно: записи обновляются по уникальному
+    ключу (платформа, профиль, дата).
+
+    Args:
+        profile (Profile): Профиль из реестра
+        data (Dict[str, Any]): Ответ API /daily-stats
+        since (Optional[date]): Дата начала синхронизации (None - все дни)
+
+    Returns:
+        int: Количество сохраненных дней
+    """
+    platform, profile_id = profile.platform, profile.profile_id
+    series = parse_daily_stats(data.get('daily_stats', []), profile.count_field, since=since)
+
+    days = series.dates.astype(object)  # datetime64[D] -> datetime.date
+    rows = [
+        DailyStat(platform=platform, profile_id=profile_id, date=day, count=count)
+        for day, count in zip(days, series.counts.tolist())
+    ]
+
+    with transaction.atomic():
+        state, _ = SyncState.objects.select_for_update().get_or_create(platform=platform, profile_id=profile_id)
+        DailyStat.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['platform', 'profile_id', 'date'],
+            update_fields=['count', 'updated_at'],
+        )
+        if rows:
+            newest = days[-1]
+            if state.last_date is None or newest > state.last_date:
+                state.last_date = newest
+        state.daily_synced_at = timezone.now()
+        state.save(update_fields=['last_date', 'daily_synced_at'])
+        if rows:
+            update_forecast_state(profile, series)
+            update_rollups(profile, series)
+    return len(rows)
+
+
+def update_rollups(profile: Profile, series: DailySeries) -> int:
+    """
+    Пересчитывает недельные и месячные свертки (StatRollup) за периоды,
+    затронутые только что сохраненными днями.
+
+    Из базы читаются дни начиная с начала первого затронутого периода, то
+    есть не больше месяца до первого нового дня, поэтому обновление стоит
+    пропорционально числу новых дней, а не длине истории.
+
+    Args:
+        profile (Profile): Профиль из реестра
+        series (DailySeries): Только что сохраненные дни
+
+    Returns:
+        int: Количество обновленных сверток
+    """
+    platform, profile_id = profile.platform, profile.profile_id
+    first_periods = {
+        granularity: period_starts(series.dates[:1], granularity)[0]
+        for granularity in ROLLUP_GRANULARITIES
+    }
+    rows = (
+        DailyStat.objects
+        .filter(platform=platform, profile_id=profile_id, date__gte=min(first_periods.values()).astype(object))
+        .order_by('date')
+        .values_list('date', 'count')
+    )
+    stored = DailySeries.from_rows(rows)
+
+    rollups = []
+    for granularity in ROLLUP_GRANULARITIES:
+        rolled = stored.rollup(granularity)
+        starts = period_starts(rolled.dates, granularity)
+        # Периоды раньше первого затронутого прочитаны не полностью и не изменились
+        changed = starts >= first_periods[granularity]
+        rollups += [
+            StatRollup(
+                platform=platform, profile_id=profile_id, granularity=granularity,
+                period_start=period_start, date=day, count=count,
+            )
+            for period_start, day, count in zip(
+                starts[changed].astype(object), rolled.dates[changed].astype(object), rolled.counts[changed].tolist(),
+            )
+        ]
+    StatRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=['platform', 'profile_id', 'granularity', 'period_start'],
+        update_fields=['date', 'count'],
+    )
+    return len(rollups)
+
+
+def update_forecast_state(profile: Profile, series: DailySeries) -> ForecastState:
+    """
+    Обновляет онлайн-прогноз профиля новыми днями ежедневной статистики.
+
+    Обычно новые дни просто добавляются к сохраненному состоянию за O(1)
+    на день. Если API уточнило значение уже учтенного дня (или состояния
+    еще нет), прогнозатор строится заново по последним дням из базы.
+
+    Args:
+        profile (Profile): Профиль из реестра
+        series (DailySeries): Только что сохраненные дни
+
+    Returns:
+        ForecastState: Сохраненное состояние с готовым прогнозом
+    """
+    platform, profile_id = profile.platform, profile.profile_id
+    record, _ = ForecastState.objects.get_or_create(platform=platform, profile_id=profile_id)
+
+    forecaster = OnlineForecaster.from_state(record.state) if record.state else None
+    if forecaster is None or not forecaster.extend(series):
+        logger.info(f"Перестраиваем онлайн-прогноз для {profile.key}")
+        # Два окна: второе нужно для разогрева экспоненциального сглаживания
+        rows = (
+            DailyStat.objects
+            .filter(platform=platform, profile_id=profile_id)
+            .order_by('-date')
+            .values_list('date', 'count')[:FORECAST_WINDOW * 2]
+        )
+        forecaster = OnlineForecaster.from_series(DailySeries.from_rows(reversed(list(rows))))
+
+    record.state = forecaster.to_state()
+    record.last_date = np.datetime64(forecaster.last_day, 'D').astype(object) if len(forecaster) else None
+    record.predictions = forecaster.predict(FORECAST_DAYS_AHEAD)
+    record.save()
+    return record
+
+
+def sync_daily_stats(profile: Profile) -> int:
+    """
+    Инкрементально синхронизирует ежедневную статистику профиля с API.
+
+    Args:
+        profile (Profile): Профиль из реестра
+
+    Returns:
+        int: Количество сохраненных дней
+
+    Raises:
+        RequestException: при ошибках сети
+        ValueError: при некорректном ответе
+    """
+    since = get_sync_start_date(profile)
+    data = fetch_api_data(get_daily_stats_url(profile, since))
+    return store_daily_stats(profile, data, since)
+
+
+async def async_sync_daily_stats(profile: Profile) -> int:
+    """
+    Асинхронный вариант sync_daily_stats для async-представлений.
+
+    Запрос к API выполняется асинхронно, работа с базой - в пуле потоков.
+
+    Args:
+        profile (Profile): Профиль из реестра
+
+    Returns:
+        int: Количество сохраненных дней
+
+    Raises:
+        RequestException: при ошибках сети
+        ValueError: при некорректном ответе
+    """
+    since = await sync_to_async(get_sync_start_date)(profile)
+    data = await afetch_api_data(get_daily_stats_url(profile, since))
+    return await sync_to_async(store_daily_stats)(profile, data, since)
+
+
+async def _afetch_safely(url: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Выполняет запрос к API и возвращает ответ или исключение вместо выброса.
+    """
+    async with semaphore:
+        try:
+            return {'data': await afetch_api_data(url)}
+        except (RequestException, ValueError) as e:
+            return {'error': e}
+
+
+async def abulk_fetch(urls: List[str], concurrency: int = INGESTION_CONCURRENCY) -> List[Dict[str, Any]]:
+    """
+    Выполняет много запросов к API, не более concurrency одновременно.
+
+    Args:
+        urls (List[str]): URL запросов
+        concurrency (int): Максимальное количество одновременных запросов
+
+    Returns:
+        List[Dict[str, Any]]: Для каждого URL {'data': ответ} или {'error': исключение}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(_afetch_safely(url, semaphore) for url in urls))
+
+
+def bulk_fetch(urls: List[str], concurrency: int = INGESTION_CONCURRENCY) -> List[Dict[str, Any]]:
+    """
+    Синхронный вариант abulk_fetch для планировщика и management-команд.
+
+    Example:
+        responses = bulk_fetch([profile.latest_url for profile in get_profiles()])
+    """
+    return async_to_sync(abulk_fetch)(urls, concurrency)
+
+
+def run_ingestion_cycle(profiles: Optional[List[Profile]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Выполняет один цикл опроса API по всем активным профилям реестра.
+
+    Запросы к API выполняются параллельно (не более INGESTION_CONCURRENCY
+    одновременно), а запись в базу - последовательно в текущем потоке,
+    чтобы не конкурировать за блокировку SQLite. После записи последние
+    данные основных профилей публикуются в общем сегменте памяти.
+
+    Args:
+        profiles (Optional[List[Profile]]): Профили для опроса (по умолчанию все активные)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Результаты вида
+            {'platform/profile_id': {'latest': bool, 'daily': int, 'errors': [...]}}
+    """
+    if profiles is None:
+        profiles = get_profiles()
+    since = get_sync_start_dates(profiles)
+    jobs = [
+        (profile, kind, url)
+        for profile in profiles
+        for kind, url in (
+            ('latest', profile.latest_url),
+            ('daily', get_daily_stats_url(profile, since[profile.key])),
+        )
+    ]
+    responses = bulk_fetch([url for _, _, url in jobs])
+
+    results = {profile.key: {'latest': False, 'daily': 0, 'errors': []} for profile in profiles}
+    for start in range(0, len(jobs), INGESTION_WRITE_BATCH):
+        # Одна транзакция на пачку записей: в SQLite каждая фиксация - это fsync
+        with transaction.atomic():
+            for (profile, kind, _), response in zip(jobs[start:start + INGESTION_WRITE_BATCH],
+                                                    responses[start:start + INGESTION_WRITE_BATCH]):
+                result = results[profile.key]
+                try:
+                    if 'error' in response:
+                        raise response['error']
+                    if kind == 'latest':
+                        store_latest(profile, response['data'])
+                        result['latest'] = True
+                    else:
+                        result['daily'] = store_daily_stats(profile, response['data'], since[profile.key])
+                except (RequestException, ValueError) as e:
+                    logger.error(f"Ошибка при опросе {profile.key} ({kind}): {str(e)}")
+                    result['errors'].append(f"{kind}: {str(e)}")
+
+    # Новые снимки сразу становятся видны всем процессам веб-сервера
+    publish_stored_latest()
+    prune_latest_snapshots()
+    return results
+
+
+def prune_latest_snapshots(retention_days: int = LATEST_SNAPSHOT_RETENTION_DAYS) -> int:
+    """
+    Удаляет снимки LatestSnapshot старше retention_days дней.
+
+    Снимок создается на каждый новый timestamp API, поэтому без очистки
+    таблица растет бесконечно. Последний снимок каждого профиля не
+    удаляется, даже если он старый: по нему страницы показывают данные,
+    когда API недоступно.
+
+    Args:
+        retention_days (int): Сколько дней хранить снимки
+
+    Returns:
+        int: Количество удаленных снимков
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    newer = LatestSnapshot.objects.filter(
+        platform=OuterRef('platform'), profile_id=OuterRef('profile_id'), fetched_at__gt=OuterRef('fetched_at'),
+    )
+    deleted, _ = LatestSnapshot.objects.filter(fetched_at__lt=cutoff).filter(Exists(newer)).delete()
+    if deleted:
+        logger.info(f"Удалено устаревших снимков последних данных: {deleted}")
+    return deleted
+
+
+def _acquire_scheduler_lock() -> bool:
+    """
+    Захватывает файл INGESTION_LOCK_PATH до завершения процесса.
+
+    Под gunicorn планировщик стартует в каждом воркере, а опрашивать API
+    должен только один из них. Блокировка flock снимается системой при
+    завершении процесса, поэтому после падения владельца опрос подхватывает
+    другой воркер.
+
+    Returns:
+        bool: True, если этот процесс владеет планировщиком
+    """
+    global _scheduler_lock_fd
+    if fcntl is None or _scheduler_lock_fd is not None:
+        return True
+    os.makedirs(os.path.dirname(INGESTION_LOCK_PATH) or '.', exist_ok=True)
+    fd = os.open(INGESTION_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _scheduler_lock_fd = fd
+    return True
+
+
+def _scheduler_loop(interval: int) -> None:
+    """
+    Цикл встроенного планировщика: опрашивает API каждые interval секунд.
+
+    Пока планировщиком владеет другой процесс, цикл только проверяет
+    блокировку раз в interval секунд.
+    """
+    while not _scheduler_stop.is_set():
+        if not _acquire_scheduler_lock():
+            _scheduler_stop.wait(interval)
+            continue
+        try:
+            run_ingestion_cycle()
+        except Exception as e:
+            logger.error(f"Ошибка в цикле фонового опроса: {str(e)}")
+        finally:
+            # Поток планировщика не управляется Django, поэтому закрываем соединение с БД сами
+            close_old_connections()
+        _scheduler_stop.wait(interval)
+
+
+def start_scheduler(interval: int = INGESTION_INTERVAL) -> bool:
+    """
+    Запускает встроенный планировщик фонового опроса в daemon-потоке.
+
+    Повторный вызов в том же процессе ничего не делает. При завершении
+    процесса планировщик останавливается (atexit), чтобы цикл опроса не
+    обрывался посреди записи в базу.
+
+    Args:
+        interval (int): Интервал опроса в секундах
+
+    Returns:
+        bool: True, если планировщик был запущен этим вызовом
+    """
+    global _scheduler_thread
+    with _scheduler_lock:
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            return False
+        _scheduler_stop.clear()
+        _scheduler_thread = threading.Thread(
+            target=_scheduler_loop, args=(interval,), name='subs-ingest-scheduler', daemon=True
+        )
+        _scheduler_thread.start()
+        atexit.register(stop_scheduler)
+        logger.info(f"Запущен фоновый опрос API с интервалом {interval} с")
+        return True
+
+
+def stop_scheduler(timeout: float = SCHEDULER_STOP_TIMEOUT) -> None:
+    """
+    Останавливает встроенный планировщик и освобождает блокировку опроса.
+
+    Ждет окончания текущего цикла не дольше timeout секунд, после чего
+    блокировку может захватить планировщик другого процесса.
+
+    Args:
+        timeout (float): Сколько секунд ждать окончания текущего цикла
+    """
+    global _scheduler_thread, _scheduler_lock_fd
+    _scheduler_stop.set()
+    with _scheduler_lock:
+        thread, _scheduler_thread = _scheduler_thread, None
+    atexit.unregister(stop_scheduler)
+    if thread is not None and thread is not threading.current_thread():
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"Цикл фонового опроса не завершился за {timeout} с")
+            return  # блокировку держим, пока цикл пишет в базу
+    if _scheduler_lock_fd is not None:
+        os.close(_scheduler_lock_fd)  # закрытие файла снимает flock
+        _scheduler_lock_fd = None
+        logger.info("Фоновый опрос API остановлен")
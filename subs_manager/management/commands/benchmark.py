@@ -0,0 +1,138 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from subs_manager.benchmark import (
+    BENCHMARK_COLD_REQUESTS,
+    BENCHMARK_CONCURRENCY,
+    BENCHMARK_MICRO_REPEAT,
+    BENCHMARK_REQUESTS,
+    BENCHMARK_TOLERANCE,
+    FAKE_UPSTREAM_DAYS,
+    FAKE_UPSTREAM_LATENCY,
+    BenchmarkEnvironment,
+    FakeUpstream,
+    benchmark_metadata,
+    compare_results,
+    run_micro_benchmarks,
+    run_route_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет задержку и пропускную способность маршрутов с локальной заменой API, "
+        "а также прогноз и разбор ежедневной статистики"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', choices=('routes', 'micro'),
+            help="Запустить только бенчмарки маршрутов или только микробенчмарки",
+        )
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help="Имя маршрута из urls.py (можно указать несколько раз; по умолчанию все)",
+        )
+        parser.add_argument(
+            '--requests', type=int, default=BENCHMARK_REQUESTS,
+            help="Запросов к маршруту в теплом и параллельном режимах",
+        )
+        parser.add_argument(
+            '--cold-requests', type=int, default=BENCHMARK_COLD_REQUESTS,
+            help="Запросов к маршруту в холодном режиме",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=BENCHMARK_CONCURRENCY,
+            help="Одновременных клиентов в параллельном режиме",
+        )
+        parser.add_argument(
+            '--latency', type=float, default=FAKE_UPSTREAM_LATENCY * 1000,
+            help="Задержка ответа локального API в миллисекундах",
+        )
+        parser.add_argument(
+            '--error-rate', type=float, default=0.0,
+            help="Доля ответов локального API с ошибкой 503 (от 0 до 1)",
+        )
+        parser.add_argument(
+            '--days', type=int, default=FAKE_UPSTREAM_DAYS,
+            help="Сколько дней в ответе /daily-stats и в микробенчмарках",
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=BENCHMARK_MICRO_REPEAT,
+            help="Сколько раз вызывать функцию в микробенчмарке",
+        )
+        parser.add_argument(
+            '--output',
+            help="Сохранить результаты в JSON-файл (например, benchmarks/baseline.json)",
+        )
+        parser.add_argument(
+            '--baseline',
+            help="Сравнить результаты с сохраненными и завершиться с ошибкой при регрессии",
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=BENCHMARK_TOLERANCE,
+            help="Допустимое ухудшение относительно базовых результатов (0.2 = 20%%)",
+        )
+
+    def _write_summary(self, name: str, summary: dict) -> None:
+        line = (
+            f"{name:<45} p50 {summary['p50_ms']:9.2f} мс  p95 {summary['p95_ms']:9.2f} мс  "
+            f"p99 {summary['p99_ms']:9.2f} мс  {summary['throughput_rps']:9.1f} оп/с"
+        )
+        if 'upstream_requests' in summary:
+            line += f"  API {summary['upstream_requests']:4d}"
+        if 'bytes' in summary:
+            line += f"  {summary['bytes']:8d} Б"
+        if summary['errors']:
+            self.stdout.write(self.style.WARNING(f"{line}  ошибок {summary['errors']}"))
+        else:
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Не удалось прочитать базовые результаты {options['baseline']}: {e}")
+
+        config = {
+            key: options[key]
+            for key in ('routes', 'requests', 'cold_requests', 'concurrency', 'latency', 'error_rate', 'days', 'repeat')
+        }
+        results = {'meta': benchmark_metadata(config)}
+
+        with BenchmarkEnvironment() as environment:
+            if options['only'] != 'micro':
+                self.stdout.write("Маршруты (локальный API: "
+                                  f"задержка {options['latency']:.0f} мс, ошибок {options['error_rate']:.0%}, "
+                                  f"{options['days']} дней)")
+                with FakeUpstream(options['latency'] / 1000, options['error_rate'], options['days']) as upstream:
+                    results['routes'] = run_route_benchmarks(
+                        environment, upstream, options['routes'], options['requests'],
+                        options['cold_requests'], options['concurrency'],
+                        progress=lambda name, mode, summary: self._write_summary(f"{name} [{mode}]", summary),
+                    )
+
+            if options['only'] != 'routes':
+                self.stdout.write(f"Микробенчмарки ({options['days']} дней, {options['repeat']} вызовов)")
+                results['micro'] = run_micro_benchmarks(options['days'], options['repeat'])
+                for name, summary in results['micro'].items():
+                    self._write_summary(name, summary)
+
+        if options['output']:
+            os.makedirs(os.path.dirname(options['output']) or '.', exist_ok=True)
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(results, output_file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {options['output']}"))
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, options['tolerance'])
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f"Найдено регрессий: {len(regressions)}")
+            self.stdout.write(self.style.SUCCESS("Регрессий относительно базовых результатов нет"))
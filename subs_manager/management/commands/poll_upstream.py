@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from subs_manager.ingestion import INGESTION_INTERVAL, run_ingestion_cycle
+
+
+class Command(BaseCommand):
+    help = "Опрашивает API и сохраняет последние данные и ежедневную статистику в локальную базу"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=INGESTION_INTERVAL,
+            help="Интервал опроса в секундах",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Выполнить один цикл опроса и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            results = run_ingestion_cycle()
+            elapsed = time.monotonic() - started
+
+            for key, result in results.items():
+                line = f"{key}: latest={'ok' if result['latest'] else 'error'}, daily={result['daily']}"
+                if result['errors']:
+                    self.stderr.write(self.style.ERROR(f"{line} ({'; '.join(result['errors'])})"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(line))
+            self.stdout.write(f"Цикл опроса завершен за {elapsed:.2f} с")
+
+            if options['once']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
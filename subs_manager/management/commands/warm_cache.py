@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from subs_manager.warmup import WARM_CACHE_WORKERS, get_warm_jobs, next_warm_delay, warm_pages
+
+
+class Command(BaseCommand):
+    help = "Заранее рендерит страницы на всех языках и записывает их в кэш страниц"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--origin', action='append', dest='origins',
+            help="Адрес сайта, например https://example.com (можно указать несколько раз)",
+        )
+        parser.add_argument(
+            '--language', action='append', dest='languages',
+            help="Код языка (по умолчанию все языки из LANGUAGES)",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=WARM_CACHE_WORKERS,
+            help="Сколько страниц рендерить одновременно",
+        )
+        parser.add_argument(
+            '--repeat', action='store_true',
+            help="Прогревать каждую страницу повторно за WARM_CACHE_MARGIN секунд до истечения ее кэша",
+        )
+
+    def handle(self, *args, **options):
+        jobs = get_warm_jobs(options['origins'], options['languages'])
+        # Время следующего прогрева каждой страницы: у страниц разный срок жизни в кэше
+        due = {job: 0.0 for job in jobs}
+        while True:
+            now = time.monotonic()
+            batch = [job for job in jobs if due[job] <= now]
+            results = warm_pages(batch, options['workers'])
+            elapsed = time.monotonic() - now
+
+            for job, result in zip(batch, results):
+                due[job] = now + next_warm_delay(result)
+                line = f"{result['origin']}{result['path']} [{result['language']}]: {result['seconds']:.2f} с"
+                if 'error' in result:
+                    self.stderr.write(self.style.ERROR(f"{line} ({result['error']})"))
+                elif not result['cached']:
+                    self.stderr.write(self.style.WARNING(f"{line} (статус {result['status']}, не закэширована)"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(line))
+            self.stdout.write(f"Прогрето {sum(r['cached'] for r in results)} из {len(results)} страниц за {elapsed:.2f} с")
+
+            if not options['repeat']:
+                break
+            time.sleep(max(0.0, min(due.values()) - time.monotonic()))
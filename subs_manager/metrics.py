@@ -0,0 +1,198 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from django.dispatch import receiver
+
+from .circuit import circuit_state_changed
+
+# Границы корзин гистограмм времени в секундах (как у клиента Prometheus по
+# умолчанию, с запасом до таймаута API)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+# Тип содержимого текстового формата Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Счетчик, который только растет (например, количество повторных запросов).
+
+    Значения хранятся в памяти процесса по набору значений меток. Каждое
+    изменение - одна операция со словарем под блокировкой, поэтому счетчики
+    можно обновлять на горячем пути.
+
+    Example:
+        UPSTREAM_RETRIES.inc('api:8090/linkedin/latest')
+    """
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        """
+        Увеличивает счетчик для значений меток (в порядке labelnames).
+        """
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        """Текущее значение счетчика."""
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in sorted(values):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Гистограмма распределения значений (например, времени ответа API).
+
+    Для каждого набора значений меток хранится количество наблюдений в
+    каждой корзине, их сумма и общее количество. Накопленные значения
+    корзин, которые требует формат Prometheus, считаются только при выдаче.
+
+    Example:
+        with FORECAST_DURATION.time():
+            forecast_series_batch(series_list)
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}  # [корзины..., +Inf, сумма]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """
+        Добавляет наблюдение для значений меток (в порядке labelnames).
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labelvalues)
+            if counts is None:
+                counts = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        """
+        Измеряет время выполнения блока в секундах.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        """Количество наблюдений."""
+        counts = self._values.get(labelvalues)
+        return int(sum(counts[:-1])) if counts is not None else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(labelvalues, list(counts)) for labelvalues, counts in self._values.items()]
+        for labelvalues, counts in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+                labels = _format_labels(self.labelnames + ('le',), labelvalues + (le,))
+                yield f"{self.name}_bucket{labels} {int(cumulative)}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{labels} {int(cumulative)}"
+
+
+class Registry:
+    """
+    Набор метрик процесса, который выдается в текстовом формате Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Возвращает все метрики в текстовом формате Prometheus.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    'subs_upstream_request_duration_seconds', "Время запроса к API (каждая попытка)", ['endpoint'],
+))
+UPSTREAM_RETRIES = REGISTRY.register(Counter(
+    'subs_upstream_retries_total', "Повторные запросы к API после ошибки", ['endpoint'],
+))
+UPSTREAM_TIMEOUTS = REGISTRY.register(Counter(
+    'subs_upstream_timeouts_total', "Запросы к API, завершившиеся таймаутом", ['endpoint'],
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    'subs_upstream_errors_total', "Запросы к API, завершившиеся ошибкой (кроме таймаутов)", ['endpoint'],
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    'subs_cache_requests_total', "Обращения к кэшу по семействам ключей: hit, stale или miss", ['family', 'result'],
+))
+FORECAST_DURATION = REGISTRY.register(Histogram(
+    'subs_forecast_duration_seconds', "Время расчета прогноза (только рядов, которых нет в кэше)",
+))
+VIEW_DURATION = REGISTRY.register(Histogram(
+    'subs_view_duration_seconds', "Время обработки запроса представлением, включая кэш страниц", ['view'],
+))
+CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    'subs_circuit_transitions_total', "Смены состояния выключателей API", ['endpoint', 'state'],
+))
+
+
+@receiver(circuit_state_changed)
+def _count_circuit_transition(sender, endpoint: str, new_state: str, **kwargs) -> None:
+    CIRCUIT_TRANSITIONS.inc(endpoint, new_state)
+
+
+def render_metrics() -> str:
+    """
+    Возвращает метрики процесса в текстовом формате Prometheus.
+    """
+    return REGISTRY.render()
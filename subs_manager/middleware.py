@@ -0,0 +1,48 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from .metrics import CACHE_REQUESTS, VIEW_DURATION
+
+# Методы, ответы на которые берутся из кэша страниц (cache_page)
+PAGE_CACHE_METHODS = ('GET', 'HEAD')
+
+
+def _observe(request, elapsed: float) -> None:
+    """
+    Записывает время обработки запроса и результат обращения к кэшу страниц.
+    """
+    match = request.resolver_match
+    if match is None:
+        return  # путь не найден (404): метка представления не нужна
+    VIEW_DURATION.observe(elapsed, match.view_name)
+    # CacheMiddleware (cache_page) помечает запрос: False - ответ взят из
+    # кэша, True - отрендерен заново; без cache_page атрибута нет
+    update_cache = getattr(request, '_cache_update_cache', None)
+    if update_cache is not None and request.method in PAGE_CACHE_METHODS:
+        CACHE_REQUESTS.inc('page', 'miss' if update_cache else 'hit')
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Измеряет время обработки запросов по представлениям (см. metrics.py).
+
+    Стоит последним в MIDDLEWARE, поэтому измеряется только представление
+    вместе с декораторами cache_page и gzip_page. Под ASGI работает без
+    переключения в поток.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            response = await get_response(request)
+            _observe(request, time.perf_counter() - started)
+            return response
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            response = get_response(request)
+            _observe(request, time.perf_counter() - started)
+            return response
+    return middleware
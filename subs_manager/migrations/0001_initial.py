@@ -0,0 +1,55 @@
+# Generated by Django 5.1.15 on 2026-10-17 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('count', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'profile_id', 'date'), name='daily_stat_unique_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LatestSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('count', models.BigIntegerField()),
+                ('upstream_timestamp', models.CharField(max_length=40)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', 'profile_id', '-fetched_at'], name='latest_profile_fetched_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('daily_synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('platform', 'profile_id'), name='sync_state_unique_profile')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs_manager', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncstate',
+            name='last_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-17 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs_manager', '0002_syncstate_last_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('state', models.JSONField(default=dict)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('predictions', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('platform', 'profile_id'), name='forecast_state_unique_profile')],
+            },
+        ),
+    ]
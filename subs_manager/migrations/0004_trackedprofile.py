@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-17 20:37
+
+from django.db import migrations, models
+
+
+# Профили, которые раньше были заданы в коде (views.PROFILES)
+INITIAL_PROFILES = [
+    ('linkedin', 'gamsakhurdiya', 'profile_id', 'followers_count'),
+    ('youtube', 'UCRhID0powzDpE4D2KuVKGHg', 'channel_id', 'subscribers_count'),
+    ('medium', 'Eleron', 'username', 'followers_count'),
+    ('instagram', 'nikog_bim', 'username', 'followers_count'),
+]
+
+
+def add_initial_profiles(apps, schema_editor):
+    TrackedProfile = apps.get_model('subs_manager', 'TrackedProfile')
+    for platform, profile_id, query_param, count_field in INITIAL_PROFILES:
+        TrackedProfile.objects.get_or_create(
+            platform=platform,
+            profile_id=profile_id,
+            defaults={'query_param': query_param, 'count_field': count_field, 'is_primary': True},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs_manager', '0003_forecaststate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackedProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('query_param', models.CharField(max_length=30)),
+                ('count_field', models.CharField(default='followers_count', max_length=30)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_primary', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['platform', 'profile_id'],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'profile_id'), name='tracked_profile_unique'), models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('platform',), name='tracked_profile_one_primary')],
+            },
+        ),
+        migrations.RunPython(add_initial_profiles, migrations.RunPython.noop),
+    ]
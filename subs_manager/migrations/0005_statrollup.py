@@ -0,0 +1,59 @@
+# Generated by Django 5.1.15 on 2026-10-17 20:56
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Строит недельные и месячные свертки по уже сохраненной статистике.
+    """
+    DailyStat = apps.get_model('subs_manager', 'DailyStat')
+    StatRollup = apps.get_model('subs_manager', 'StatRollup')
+    # Строки упорядочены по дате, поэтому последняя запись периода побеждает
+    latest = {}
+    rows = DailyStat.objects.order_by('platform', 'profile_id', 'date').values_list(
+        'platform', 'profile_id', 'date', 'count',
+    )
+    for platform, profile_id, day, count in rows.iterator():
+        week_start = day - timedelta(days=day.weekday())
+        latest[(platform, profile_id, 'week', week_start)] = (day, count)
+        latest[(platform, profile_id, 'month', day.replace(day=1))] = (day, count)
+    StatRollup.objects.bulk_create(
+        [
+            StatRollup(
+                platform=platform, profile_id=profile_id, granularity=granularity,
+                period_start=period_start, date=day, count=count,
+            )
+            for (platform, profile_id, granularity, period_start), (day, count) in latest.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs_manager', '0004_trackedprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('profile_id', models.CharField(max_length=100)),
+                ('granularity', models.CharField(max_length=5)),
+                ('period_start', models.DateField()),
+                ('date', models.DateField()),
+                ('count', models.BigIntegerField()),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'profile_id', 'granularity', 'period_start'), name='stat_rollup_unique_period')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subs_manager', '0005_statrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trackedprofile',
+            name='platform',
+            field=models.CharField(choices=[('linkedin', 'LinkedIn'), ('youtube', 'YouTube'), ('medium', 'Medium'), ('instagram', 'Instagram')], max_length=20),
+        ),
+    ]
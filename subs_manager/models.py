@@ -1,3 +1,141 @@
 from django.db import models
 
-# Create your models here.
+from .profiles import PLATFORM_CHOICES
+
+
+class LatestSnapshot(models.Model):
+    """
+    Снимок текущего количества подписчиков профиля на платформе.
+
+    Новая запись создается фоновым опросом API только тогда, когда API
+    вернуло новый timestamp. Если данные не изменились, у последней записи
+    обновляется только fetched_at.
+    """
+    platform = models.CharField(max_length=20)
+    profile_id = models.CharField(max_length=100)
+    count = models.BigIntegerField()
+    upstream_timestamp = models.CharField(max_length=40)  # timestamp в формате API
+    fetched_at = models.DateTimeField()  # когда данные последний раз подтверждены API
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['platform', 'profile_id', '-fetched_at'], name='latest_profile_fetched_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id}: {self.count} ({self.upstream_timestamp})"
+
+
+class DailyStat(models.Model):
+    """
+    Количество подписчиков профиля на платформе за один день.
+    """
+    platform = models.CharField(max_length=20)
+    profile_id = models.CharField(max_length=100)
+    date = models.DateField()
+    count = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'profile_id', 'date'], name='daily_stat_unique_day'),
+        ]
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id} {self.date}: {self.count}"
+
+
+class StatRollup(models.Model):
+    """
+    Количество подписчиков профиля на конец недели или месяца.
+
+    Предрассчитанная свертка DailyStat: при сохранении ежедневной
+    статистики пересчитываются только затронутые периоды, а запрос
+    диапазона по неделям или месяцам читает одну строку на период.
+    """
+    platform = models.CharField(max_length=20)
+    profile_id = models.CharField(max_length=100)
+    granularity = models.CharField(max_length=5)  # week или month
+    period_start = models.DateField()  # понедельник недели или первое число месяца
+    date = models.DateField()  # последний день периода, за который есть данные
+    count = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['platform', 'profile_id', 'granularity', 'period_start'], name='stat_rollup_unique_period',
+            ),
+        ]
+        ordering = ['period_start']
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id} {self.granularity} {self.period_start}: {self.count}"
+
+
+class SyncState(models.Model):
+    """
+    Состояние фоновой синхронизации профиля с API.
+    """
+    platform = models.CharField(max_length=20)
+    profile_id = models.CharField(max_length=100)
+    daily_synced_at = models.DateTimeField(null=True, blank=True)  # последняя успешная загрузка daily-stats
+    last_date = models.DateField(null=True, blank=True)  # последний сохраненный день daily-stats
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'profile_id'], name='sync_state_unique_profile'),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id}: {self.last_date} ({self.daily_synced_at})"
+
+
+class ForecastState(models.Model):
+    """
+    Состояние онлайн-прогноза профиля (см. forecasting.OnlineForecaster).
+
+    Обновляется при каждой синхронизации ежедневной статистики, поэтому
+    страница статистики берет готовый прогноз, не пересчитывая регрессию.
+    """
+    platform = models.CharField(max_length=20)
+    profile_id = models.CharField(max_length=100)
+    state = models.JSONField(default=dict)  # OnlineForecaster.to_state()
+    last_date = models.DateField(null=True, blank=True)  # последний учтенный день
+    predictions = models.JSONField(default=list)  # прогноз на FORECAST_DAYS_AHEAD дней от last_date
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'profile_id'], name='forecast_state_unique_profile'),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id}: {self.last_date}"
+
+
+class TrackedProfile(models.Model):
+    """
+    Отслеживаемый профиль (см. subs_manager/profiles.py).
+
+    По активным профилям работает фоновый опрос API. Основной профиль
+    платформы показывается на страницах сайта.
+    """
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    profile_id = models.CharField(max_length=100)
+    query_param = models.CharField(max_length=30)  # параметр запроса API с ID профиля
+    count_field = models.CharField(max_length=30, default='followers_count')  # поле количества в daily-stats
+    is_active = models.BooleanField(default=True)  # опрашивать профиль
+    is_primary = models.BooleanField(default=False)  # показывать на страницах сайта
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'profile_id'], name='tracked_profile_unique'),
+            models.UniqueConstraint(
+                fields=['platform'], condition=models.Q(is_primary=True), name='tracked_profile_one_primary',
+            ),
+        ]
+        ordering = ['platform', 'profile_id']
+
+    def __str__(self):
+        return f"{self.platform}/{self.profile_id}"
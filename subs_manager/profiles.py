@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Адрес API и время жизни реестра профилей в памяти процесса (можно переопределить в settings.py)
+API_BASE_URL = getattr(settings, 'API_BASE_URL', "http://194.35.119.49:8090")
+PROFILE_REGISTRY_TTL = getattr(settings, 'PROFILE_REGISTRY_TTL', 60)
+
+# Поддерживаемые платформы: варианты поля TrackedProfile.platform и проверка в validate_platform
+PLATFORM_CHOICES = (
+    ('linkedin', 'LinkedIn'),
+    ('youtube', 'YouTube'),
+    ('medium', 'Medium'),
+    ('instagram', 'Instagram'),
+)
+PLATFORMS = tuple(platform for platform, _label in PLATFORM_CHOICES)
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Отслеживаемый профиль на платформе.
+
+    Attributes:
+        platform: Название платформы (linkedin, youtube, ...)
+        profile_id: ID профиля в API
+        query_param: Параметр запроса API, в котором передается ID профиля
+        count_field: Поле с количеством подписчиков в ответе /daily-stats
+        is_primary: Профиль показывается на страницах сайта
+    """
+    platform: str
+    profile_id: str
+    query_param: str
+    count_field: str = 'followers_count'
+    is_primary: bool = False
+
+    @property
+    def key(self) -> str:
+        """Ключ профиля вида platform/profile_id."""
+        return f"{self.platform}/{self.profile_id}"
+
+    @property
+    def latest_url(self) -> str:
+        """URL API для получения последних данных."""
+        return f"{API_BASE_URL}/{self.platform}/latest?{self.query_param}={quote(self.profile_id, safe='')}"
+
+    @property
+    def daily_stats_url(self) -> str:
+        """URL API для получения ежедневной статистики."""
+        return f"{API_BASE_URL}/{self.platform}/daily-stats?{self.query_param}={quote(self.profile_id, safe='')}"
+
+
+_registry: Optional[Tuple[float, List[Profile]]] = None
+_registry_lock = threading.Lock()
+
+
+def get_profiles() -> List[Profile]:
+    """
+    Возвращает все активные профили из реестра (таблица TrackedProfile).
+
+    Реестр читается из базы не чаще раза в PROFILE_REGISTRY_TTL секунд,
+    поэтому представления не делают лишний запрос на каждый вызов.
+
+    Returns:
+        List[Profile]: Активные профили, упорядоченные по платформе и ID
+
+    Example:
+        for profile in get_profiles():
+            fetch_api_data(profile.latest_url)
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is not None and _registry[0] > time.monotonic():
+            return _registry[1]
+
+    # Импорт внутри функции: модуль загружается до готовности моделей
+    from .models import TrackedProfile
+
+    profiles = [
+        Profile(
+            platform=row.platform,
+            profile_id=row.profile_id,
+            query_param=row.query_param,
+            count_field=row.count_field,
+            is_primary=row.is_primary,
+        )
+        for row in TrackedProfile.objects.filter(is_active=True)
+    ]
+    with _registry_lock:
+        _registry = (time.monotonic() + PROFILE_REGISTRY_TTL, profiles)
+    return profiles
+
+
+def reset_profiles_cache() -> None:
+    """
+    Сбрасывает реестр в памяти процесса (например, после изменения профилей).
+    """
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def get_primary_profiles() -> Dict[str, Profile]:
+    """
+    Возвращает основные профили, которые показываются на страницах сайта.
+
+    Returns:
+        Dict[str, Profile]: Словарь вида {платформа: профиль}
+    """
+    return {profile.platform: profile for profile in get_profiles() if profile.is_primary}
+
+
+def get_primary_profile(platform: str) -> Optional[Profile]:
+    """
+    Возвращает основной профиль платформы или None, если его нет.
+
+    Args:
+        platform (str): Название платформы
+
+    Returns:
+        Optional[Profile]: Основной профиль платформы
+    """
+    return get_primary_profiles().get(platform)
+
+
+def get_profile(platform: str, profile_id: str) -> Optional[Profile]:
+    """
+    Возвращает активный профиль по платформе и ID или None.
+
+    Args:
+        platform (str): Название платформы
+        profile_id (str): ID профиля
+
+    Returns:
+        Optional[Profile]: Профиль из реестра
+    """
+    for profile in get_profiles():
+        if profile.platform == platform and profile.profile_id == profile_id:
+            return profile
+    return None
@@ -0,0 +1,282 @@
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Поле с количеством подписчиков в ответе /daily-stats по умолчанию
+DEFAULT_COUNT_FIELD = 'followers_count'
+
+# Гранулярность ряда: по дням, неделям (с понедельника) или месяцам
+GRANULARITIES = ('day', 'week', 'month')
+ROLLUP_GRANULARITIES = ('week', 'month')  # свертки, которые хранятся в StatRollup
+
+
+@dataclass(frozen=True)
+class DailySeries:
+    """
+    Ежедневная статистика профиля в колоночном виде.
+
+    Attributes:
+        dates: Даты по возрастанию (datetime64[D])
+        counts: Количество подписчиков на каждую дату (int64)
+    """
+    dates: np.ndarray
+    counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def empty(cls) -> 'DailySeries':
+        return cls(np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[date, int]]) -> 'DailySeries':
+        """
+        Создает ряд из пар (дата, количество), например из values_list базы.
+
+        Пары должны быть упорядочены по дате.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        days, counts = zip(*rows)
+        return cls(np.array(days, dtype='datetime64[D]'), np.array(counts, dtype=np.int64))
+
+    def date_strings(self) -> List[str]:
+        """
+        Возвращает даты в формате YYYY-MM-DD.
+        """
+        return np.datetime_as_string(self.dates, unit='D').tolist()
+
+    def delta_encode(self) -> Dict[str, Any]:
+        """
+        Возвращает ряд в компактном виде для передачи клиенту: первая дата и
+        первое количество, затем разности между соседними точками.
+
+        Разности дат почти всегда равны 1, а разности количеств малы, поэтому
+        такой JSON короче и хорошо сжимается. Разности возвращаются массивами
+        numpy (int64).
+
+        Example:
+            {'start_date': '2024-01-01', 'date_deltas': [1, 1, 2],
+             'start_count': 1000, 'count_deltas': [3, 5, -1]}
+        """
+        if not len(self):
+            return {'start_date': None, 'date_deltas': [], 'start_count': None, 'count_deltas': []}
+        return {
+            'start_date': str(self.dates[0]),
+            'date_deltas': np.diff(self.dates).astype(np.int64),
+            'start_count': int(self.counts[0]),
+            'count_deltas': np.diff(self.counts),
+        }
+
+    def rollup(self, granularity: str) -> 'DailySeries':
+        """
+        Сворачивает ряд по неделям или месяцам: от каждого периода остается
+        последняя точка (количество подписчиков на конец периода).
+
+        Args:
+            granularity: 'day' (ряд без изменений), 'week' или 'month'
+
+        Raises:
+            ValueError: при неизвестной гранулярности
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Неизвестная гранулярность: {granularity}")
+        if granularity == 'day' or len(self) < 2:
+            return self
+        periods = period_starts(self.dates, granularity)
+        last_of_period = np.append(periods[1:] != periods[:-1], True)
+        return DailySeries(self.dates[last_of_period], self.counts[last_of_period])
+
+    def downsample(self, points: int) -> 'DailySeries':
+        """
+        Уменьшает ряд до points точек методом Largest-Triangle-Three-Buckets.
+
+        Сохраняются точки, которые сильнее всего влияют на форму графика
+        (изломы, пики), поэтому прореженный ряд визуально совпадает с полным.
+        Первая и последняя точки сохраняются всегда.
+
+        Args:
+            points: Максимальное количество точек (не меньше 3)
+        """
+        if len(self) <= points:
+            return self
+        indices = lttb_indices(self.dates.astype(np.float64), self.counts.astype(np.float64), points)
+        return DailySeries(self.dates[indices], self.counts[indices])
+
+    def tail(self, n: int) -> 'DailySeries':
+        """
+        Возвращает последние n точек ряда без копирования данных.
+        """
+        return DailySeries(self.dates[-n:], self.counts[-n:])
+
+
+def period_starts(dates: np.ndarray, granularity: str) -> np.ndarray:
+    """
+    Возвращает начало периода для каждой даты: понедельник недели или
+    первое число месяца (для 'day' - сами даты).
+
+    Args:
+        dates: Даты (datetime64[D])
+        granularity: 'day', 'week' или 'month'
+
+    Returns:
+        np.ndarray: Начала периодов (datetime64[D])
+    """
+    if granularity == 'week':
+        # 1970-01-01 - четверг, поэтому сдвигаем на 3 дня к понедельнику
+        days = dates.astype(np.int64)
+        return (days - (days + 3) % 7).astype('datetime64[D]')
+    if granularity == 'month':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    return dates
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Выбирает индексы точек ряда по алгоритму Largest-Triangle-Three-Buckets.
+
+    Точки между первой и последней делятся на threshold - 2 корзины. Из
+    каждой корзины берется точка, образующая наибольший треугольник с уже
+    выбранной точкой предыдущей корзины и средней точкой следующей. Средние
+    всех корзин считаются заранее одной операцией numpy, в цикле по
+    корзинам остается только выбор максимума.
+
+    Args:
+        x: Координаты по оси X по возрастанию (float64)
+        y: Значения (float64)
+        threshold: Сколько точек оставить (не меньше 3)
+
+    Returns:
+        np.ndarray: Индексы выбранных точек по возрастанию
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    buckets = threshold - 2
+    every = (n - 2) / buckets
+    # Границы корзин: корзина i занимает [bounds[i], bounds[i + 1])
+    bounds = (np.arange(buckets + 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    # Средние точки корзин; для последней корзины "следующая" - последняя точка ряда
+    sizes = np.diff(bounds)
+    avg_x = np.append(np.add.reduceat(x[:n - 1], bounds[:-1]) / sizes, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], bounds[:-1]) / sizes, y[-1])
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = selected = 0
+    for i in range(buckets):
+        start, end = bounds[i], bounds[i + 1]
+        next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        # Удвоенная площадь треугольника (выбранная точка, точка корзины, средняя следующей)
+        areas = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(areas.argmax())
+        indices[i + 1] = selected
+    indices[-1] = n - 1
+    return indices
+
+
+def _parse_dates(raw_dates: List[Any]) -> np.ndarray:
+    """
+    Преобразует даты в datetime64[D]; некорректные значения становятся NaT.
+    """
+    try:
+        # Быстрый путь: все даты корректны, numpy разбирает их целиком
+        return np.array(raw_dates, dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        parsed = []
+        for raw_date in raw_dates:
+            try:
+                parsed.append(np.datetime64(date.fromisoformat(raw_date), 'D'))
+            except (TypeError, ValueError):
+                parsed.append(np.datetime64('NaT', 'D'))
+        return np.array(parsed, dtype='datetime64[D]')
+
+
+def _parse_counts(raw_counts: List[Any]) -> np.ndarray:
+    """
+    Преобразует количество подписчиков (числа или строки вида "1,234") в int64.
+
+    Некорректные значения становятся -1.
+    """
+    try:
+        # Быстрый путь: в ответе только числа
+        return np.array(raw_counts, dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    try:
+        # Строки с разделителями тысяч: убираем запятые одной векторной операцией
+        return np.char.replace(np.array(raw_counts, dtype=str), ',', '').astype(np.int64)
+    except (TypeError, ValueError, OverflowError):
+        counts = np.full(len(raw_counts), -1, dtype=np.int64)
+        for i, raw_count in enumerate(raw_counts):
+            try:
+                counts[i] = int(str(raw_count).replace(',', ''))
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return counts
+
+
+def parse_daily_stats(daily_stats: List[Dict[str, Any]], count_field: str = DEFAULT_COUNT_FIELD,
+                      since: Optional[date] = None) -> DailySeries:
+    """
+    Разбирает ответ /daily-stats в колоночный ряд за один проход.
+
+    Значения извлекаются из строк ответа один раз, после чего даты и
+    количества преобразуются векторными операциями numpy. Некорректные
+    записи отбрасываются, повторяющиеся даты схлопываются (побеждает
+    последняя запись), результат упорядочен по дате.
+
+    Args:
+        daily_stats: Список записей ответа API
+        count_field: Поле с количеством подписчиков (зависит от платформы)
+        since: Если указана, записи с более ранней датой отбрасываются до разбора
+
+    Returns:
+        DailySeries: Даты (datetime64[D]) и количества (int64)
+
+    Example:
+        series = parse_daily_stats(data['daily_stats'], 'subscribers_count')
+        series.counts[-1]  # последнее известное количество
+    """
+    if since is not None:
+        # Даты в формате ISO сравниваются как строки, поэтому старые дни
+        # отбрасываются без разбора
+        since_str = since.isoformat()
+        daily_stats = [
+            stat for stat in daily_stats
+            if not isinstance(stat.get('date'), str) or stat['date'] >= since_str
+        ]
+    if not daily_stats:
+        return DailySeries.empty()
+
+    raw_dates, raw_counts = zip(*((stat.get('date'), stat.get(count_field, 0)) for stat in daily_stats))
+    dates = _parse_dates(list(raw_dates))
+    counts = _parse_counts(list(raw_counts))
+
+    valid = ~np.isnat(dates) & (counts >= 0)
+    if not valid.all():
+        logger.warning(f"Пропущено некорректных записей статистики: {int((~valid).sum())}")
+        dates, counts = dates[valid], counts[valid]
+
+    # Сортировка по дате с сохранением порядка записей (stable), затем
+    # из каждой группы одинаковых дат оставляем последнюю запись
+    order = np.argsort(dates, kind='stable')
+    dates, counts = dates[order], counts[order]
+    if len(dates) > 1:
+        last_of_day = np.append(dates[1:] != dates[:-1], True)
+        if not last_of_day.all():
+            dates, counts = dates[last_of_day], counts[last_of_day]
+
+    return DailySeries(dates, counts)
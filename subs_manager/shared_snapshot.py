@@ -0,0 +1,231 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка писателей недоступна
+    fcntl = None
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Файл общего сегмента и его размер (можно переопределить в settings.py).
+# На Linux файл в /dev/shm не попадает на диск.
+SHARED_SNAPSHOT_PATH = getattr(
+    settings, 'SHARED_SNAPSHOT_PATH', os.path.join(settings.BASE_DIR, 'cache', 'latest.snapshot')
+)
+SHARED_SNAPSHOT_SIZE = getattr(settings, 'SHARED_SNAPSHOT_SIZE', 64 * 1024)
+
+# Заголовок: счетчик последовательности, затем магическое число, время публикации,
+# длина данных, время изменения данных, ETag и срок свежести. Счетчик
+# записывается отдельно: последним при завершении записи
+_SEQ = struct.Struct('<Q')
+_META = struct.Struct('<4sdId40sd')
+_HEADER_SIZE = _SEQ.size + _META.size
+_MAGIC = b'SUB2'  # меняется вместе с форматом заголовка
+_READ_ATTEMPTS = 100  # сколько раз читатель повторяет чтение, если попал на запись
+
+
+class Snapshot(NamedTuple):
+    """
+    Опубликованные данные.
+
+    Attributes:
+        version: Номер публикации (растет с каждой записью)
+        published_at: Время публикации (time.time())
+        payload: Данные в том виде, в котором их опубликовали (JSON в байтах)
+        etag: ETag данных без кавычек (пустая строка, если не задан)
+        last_modified: Время изменения данных (time.time()) или None
+        fresh_until: До какого времени данные считаются свежими или None,
+            если писатель срок не задал
+    """
+    version: int
+    published_at: float
+    payload: bytes
+    etag: str = ''
+    last_modified: Optional[float] = None
+    fresh_until: Optional[float] = None
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        """
+        Проверяет, что данные еще свежие.
+
+        Срок, заданный писателем (fresh_until), важнее max_age: max_age
+        применяется только к публикациям без собственного срока.
+        """
+        now = time.time()
+        if self.fresh_until is not None:
+            return now <= self.fresh_until
+        return max_age is None or now - self.published_at <= max_age
+
+
+class SharedSnapshot:
+    """
+    Небольшой блок данных в разделяемой памяти (mmap файла), общий для всех
+    процессов на сервере.
+
+    Запись и чтение синхронизируются счетчиком последовательности (seqlock):
+    писатель делает счетчик нечетным, записывает данные и снова делает его
+    четным. Читатель не берет блокировок: он копирует данные и повторяет
+    чтение, если счетчик был нечетным или изменился за время копирования.
+    Писатели между собой синхронизируются блокировкой файла (flock).
+
+    Example:
+        segment = SharedSnapshot('/dev/shm/subs-latest', 64 * 1024)
+        segment.publish(b'{"success": true}')
+        segment.read().payload  # b'{"success": true}'
+    """
+
+    def __init__(self, path: str, size: int):
+        self._path = str(path)
+        self._size = size
+        self._map: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+        self._open_lock = threading.Lock()
+        self._decoded: Optional[tuple] = None  # (version, разобранный JSON)
+
+    def _open(self, create: bool) -> Optional[mmap.mmap]:
+        """
+        Отображает файл сегмента в память; при create=True создает его.
+        """
+        if self._map is not None:
+            return self._map
+        with self._open_lock:
+            if self._map is not None:
+                return self._map
+            if not create and not os.path.exists(self._path):
+                return None
+            os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+            if os.fstat(fd).st_size < self._size:
+                os.ftruncate(fd, self._size)
+            self._map = mmap.mmap(fd, self._size)
+            self._fd = fd
+            return self._map
+
+    @property
+    def capacity(self) -> int:
+        """Максимальный размер данных в байтах."""
+        return self._size - _HEADER_SIZE
+
+    def publish(self, payload: bytes, etag: str = '', last_modified: Optional[float] = None,
+                max_age: Optional[float] = None) -> Optional[int]:
+        """
+        Публикует новые данные.
+
+        ETag и время изменения хранятся рядом с данными, чтобы читатель мог
+        ответить на условный запрос, не разбирая данные. Срок свежести задает
+        писатель: он знает, когда данные обновятся в следующий раз.
+
+        Args:
+            payload (bytes): Данные (не больше capacity байт)
+            etag (str): ETag данных без кавычек (до 40 символов ASCII)
+            last_modified (float, optional): Время изменения данных
+            max_age (float, optional): Сколько секунд данные считаются свежими
+
+        Returns:
+            Optional[int]: Номер публикации или None, если данные не поместились
+        """
+        if len(payload) > self.capacity:
+            logger.warning(f"Данные ({len(payload)} байт) не помещаются в общий сегмент {self._path}")
+            return None
+        segment = self._open(create=True)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            seq = _SEQ.unpack_from(segment, 0)[0] if _META.unpack_from(segment, _SEQ.size)[0] == _MAGIC else 0
+            seq += seq % 2  # писатель мог завершиться посреди записи
+            # Нечетный счетчик: запись началась, читатели повторят чтение
+            _SEQ.pack_into(segment, 0, seq + 1)
+            now = time.time()
+            _META.pack_into(
+                segment, _SEQ.size, _MAGIC, now, len(payload), last_modified or 0.0, etag.encode('ascii'),
+                now + max_age if max_age is not None else 0.0,
+            )
+            segment[_HEADER_SIZE:_HEADER_SIZE + len(payload)] = payload
+            _SEQ.pack_into(segment, 0, seq + 2)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return (seq + 2) // 2
+
+    def clear(self) -> None:
+        """
+        Удаляет опубликованные данные: читатели получают None до следующей публикации.
+        """
+        segment = self._open(create=False)
+        if segment is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            seq = _SEQ.unpack_from(segment, 0)[0]
+            seq += seq % 2
+            _SEQ.pack_into(segment, 0, seq + 1)
+            segment[_SEQ.size:_HEADER_SIZE] = bytes(_HEADER_SIZE - _SEQ.size)
+            _SEQ.pack_into(segment, 0, seq + 2)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def read(self) -> Optional[Snapshot]:
+        """
+        Читает последние опубликованные данные без блокировок.
+
+        Returns:
+            Optional[Snapshot]: Данные или None, если ничего не опубликовано
+        """
+        segment = self._open(create=False)
+        if segment is None:
+            return None
+        for _ in range(_READ_ATTEMPTS):
+            seq = _SEQ.unpack_from(segment, 0)[0]
+            if seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0)  # уступаем процессор писателю
+                continue
+            magic, published_at, length, last_modified, etag, fresh_until = _META.unpack_from(segment, _SEQ.size)
+            payload = segment[_HEADER_SIZE:_HEADER_SIZE + length]
+            if _SEQ.unpack_from(segment, 0)[0] != seq:
+                continue
+            if magic != _MAGIC:
+                return None
+            return Snapshot(
+                seq // 2, published_at, payload, etag.rstrip(b'\0').decode('ascii'), last_modified or None,
+                fresh_until or None,
+            )
+        logger.warning(f"Не удалось прочитать общий сегмент {self._path}: данные постоянно меняются")
+        return None
+
+    def read_json(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Читает опубликованный JSON. Разобранное значение кэшируется в процессе
+        до следующей публикации.
+
+        Args:
+            max_age (float, optional): Данные старше max_age секунд не возвращаются
+                (если писатель не задал срок свежести, см. Snapshot.is_fresh)
+
+        Returns:
+            Optional[Dict[str, Any]]: Разобранные данные или None
+        """
+        snapshot = self.read()
+        if snapshot is None or not snapshot.is_fresh(max_age):
+            return None
+        decoded = self._decoded
+        if decoded is None or decoded[0] != snapshot.version:
+            decoded = self._decoded = (snapshot.version, json.loads(snapshot.payload))
+        return decoded[1]
+
+
+# Последние данные по платформам в формате ответа update_statistics
+shared_latest = SharedSnapshot(SHARED_SNAPSHOT_PATH, SHARED_SNAPSHOT_SIZE)
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Константы single-flight (можно переопределить в settings.py)
+SINGLE_FLIGHT_LOCK_TIMEOUT = getattr(settings, 'SINGLE_FLIGHT_LOCK_TIMEOUT', 60)  # время жизни блокировки в кэше
+SINGLE_FLIGHT_WAIT_TIMEOUT = getattr(settings, 'SINGLE_FLIGHT_WAIT_TIMEOUT', 50)  # сколько ждать чужой результат
+SINGLE_FLIGHT_POLL_INTERVAL = getattr(settings, 'SINGLE_FLIGHT_POLL_INTERVAL', 0.1)  # интервал опроса кэша
+
+
+class _Call:
+    """Выполняющийся вызов, результата которого ждут остальные потоки."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_calls: Dict[str, _Call] = {}
+_calls_lock = threading.Lock()
+
+
+def single_flight(key: str, func: Callable[[], Any], check: Optional[Callable[[], Any]] = None) -> Any:
+    """
+    Выполняет func не более одного раза одновременно для одного ключа.
+
+    Внутри процесса первый поток становится ведущим и выполняет func, а
+    остальные потоки с тем же ключом ждут его результат. Между процессами
+    ведущий захватывает блокировку в бэкенде кэша (cache.add). Если блокировку
+    уже держит другой процесс, вызов опрашивает check() до появления результата,
+    снятия блокировки или истечения SINGLE_FLIGHT_WAIT_TIMEOUT.
+
+    Args:
+        key (str): Ключ объединения запросов (например, URL API)
+        func (Callable): Функция, выполняющая запрос
+        check (Callable, optional): Функция, возвращающая готовый результат
+            другого процесса (например, из кэша) или None
+
+    Returns:
+        Any: Результат func или результат, полученный другим потоком/процессом
+
+    Raises:
+        Exception: исключение, выброшенное func ведущего вызова
+
+    Example:
+        data = single_flight(url, lambda: fetch_api_data(url),
+                             check=lambda: cache.get(cache_key))
+    """
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+
+    if not leader:
+        logger.debug(f"Ожидаем результат выполняющегося запроса для {key}")
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _run_across_processes(key, func, check)
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.done.set()
+
+
+def _run_across_processes(key: str, func: Callable[[], Any], check: Optional[Callable[[], Any]]) -> Any:
+    """
+    Выполняет func под блокировкой в кэше, общей для всех процессов.
+    """
+    lock_key = f"singleflight:{key}"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+
+    while not cache.add(lock_key, token, SINGLE_FLIGHT_LOCK_TIMEOUT):
+        # Блокировку держит другой процесс: ждем его результат
+        if check is not None:
+            result = check()
+            if result is not None:
+                logger.debug(f"Получен результат другого процесса для {key}")
+                return result
+        if time.monotonic() >= deadline:
+            logger.warning(f"Не дождались результата другого процесса для {key}, выполняем запрос сами")
+            return func()
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+    try:
+        # Пока мы ждали блокировку, результат мог уже появиться
+        if check is not None:
+            result = check()
+            if result is not None:
+                return result
+        return func()
+    finally:
+        # Снимаем только свою блокировку: чужую могли выставить после истечения нашей
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+_async_calls: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]' = weakref.WeakKeyDictionary()
+
+
+async def async_single_flight(
+    key: str,
+    func: Callable[[], Awaitable[Any]],
+    check: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> Any:
+    """
+    Асинхронный вариант single_flight для async-представлений.
+
+    Внутри цикла событий первая корутина запускает func в отдельной задаче,
+    и все корутины с тем же ключом, включая первую, ждут эту задачу через
+    asyncio.shield. Отмена одной ожидающей корутины (например, при разрыве
+    соединения клиента) не отменяет общий запрос и не передается остальным.
+    Между процессами используется та же блокировка в бэкенде кэша, что и в
+    single_flight.
+
+    Args:
+        key (str): Ключ объединения запросов (например, URL API)
+        func (Callable): Корутинная функция, выполняющая запрос
+        check (Callable, optional): Корутинная функция, возвращающая готовый
+            результат другого процесса или None
+
+    Returns:
+        Any: Результат func или результат, полученный другой корутиной/процессом
+
+    Raises:
+        Exception: исключение, выброшенное func
+    """
+    loop = asyncio.get_running_loop()
+    calls = _async_calls.setdefault(loop, {})
+    task = calls.get(key)
+    if task is not None:
+        logger.debug(f"Ожидаем результат выполняющегося запроса для {key}")
+    else:
+        task = calls[key] = loop.create_task(_arun_across_processes(key, func, check))
+        task.add_done_callback(lambda done: _forget_async_call(calls, key, done))
+    return await asyncio.shield(task)
+
+
+def _forget_async_call(calls: Dict[str, asyncio.Task], key: str, task: asyncio.Task) -> None:
+    """
+    Убирает завершенную задачу из выполняющихся вызовов.
+    """
+    if calls.get(key) is task:
+        del calls[key]
+    # Помечаем исключение полученным, даже если все ожидающие были отменены
+    if not task.cancelled():
+        task.exception()
+
+
+async def _arun_across_processes(
+    key: str,
+    func: Callable[[], Awaitable[Any]],
+    check: Optional[Callable[[], Awaitable[Any]]],
+) -> Any:
+    """
+    Асинхронно выполняет func под блокировкой в кэше, общей для всех процессов.
+    """
+    lock_key = f"singleflight:{key}"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_TIMEOUT
+
+    while not await cache.aadd(lock_key, token, SINGLE_FLIGHT_LOCK_TIMEOUT):
+        # Блокировку держит другой процесс: ждем его результат
+        if check is not None:
+            result = await check()
+            if result is not None:
+                logger.debug(f"Получен результат другого процесса для {key}")
+                return result
+        if time.monotonic() >= deadline:
+            logger.warning(f"Не дождались результата другого процесса для {key}, выполняем запрос сами")
+            return await func()
+        await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+    try:
+        # Пока мы ждали блокировку, результат мог уже появиться
+        if check is not None:
+            result = await check()
+            if result is not None:
+                return result
+        return await func()
+    finally:
+        # Снимаем только свою блокировку: чужую могли выставить после истечения нашей
+        if await cache.aget(lock_key) == token:
+            await cache.adelete(lock_key)
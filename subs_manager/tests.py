@@ -1,3 +1,734 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import requests
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from requests.exceptions import ConnectionError, HTTPError
+
+from . import cache_backends, circuit, views
+from .benchmark import make_daily_stats
+from .cache_backends import SQLiteCache
+from .circuit import CircuitOpenError, allow_request, circuit_state_changed, record_failure, record_success
+from .forecasting import FORECAST_WINDOW, OnlineForecaster, forecast_series_batch
+from .ingestion import store_daily_stats
+from .models import LatestSnapshot
+from .profiles import Profile, get_primary_profile, get_primary_profiles
+from .series import DailySeries, lttb_indices, parse_daily_stats, period_starts
+from .shared_snapshot import SharedSnapshot
+from .singleflight import async_single_flight, single_flight
+from .views import fetch_api_data, is_upstream_failure, read_daily_range
+from .warmup import next_warm_delay, warm_page
+
+# Кэши в памяти процесса: тесты не трогают файлы в cache/
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'forecasts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-forecasts'},
+}
+
+API_URL = 'http://api.test/youtube/latest?channel_id=x'
+
+
+def baseline_prediction(rows, days_ahead=2):
+    """
+    Исходный расчет прогноза по одному ряду (до пакетного forecast_batch).
+    """
+    if len(rows) < 5:
+        return []
+    rows = rows[-30:]
+    dates = [datetime.strptime(row['date'], '%Y-%m-%d') for row in rows]
+    days_nums = [(day - dates[0]).days for day in dates]
+    counts = [row['followers_count'] for row in rows]
+    poly = np.poly1d(np.polyfit(days_nums, counts, 2))
+    changes = []
+    for i in range(len(counts) - 1):
+        change = counts[i + 1] - counts[i]
+        changes.append(change if not changes else 0.3 * change + 0.7 * changes[-1])
+    trend = np.mean(changes[-5:]) if len(changes) >= 5 else changes[-1]
+    predictions = []
+    for i in range(1, days_ahead + 1):
+        future = dates[-1] + timedelta(days=i)
+        poly_pred = poly((future - dates[0]).days)
+        trend_pred = counts[-1] + trend * i
+        predictions.append({'date': future.strftime('%Y-%m-%d'), 'predicted_count': int(0.7 * poly_pred + 0.3 * trend_pred)})
+    return predictions
+
+
+def api_response(status, data=None):
+    """
+    Ответ API с кодом status и JSON data.
+    """
+    response = requests.Response()
+    response.status_code = status
+    response.url = API_URL
+    response._content = json.dumps(data or {}).encode()
+    return response
+
+
+def latest_api(counts, down=()):
+    """
+    Замена http_get для /latest: платформы из down недоступны, остальные
+    возвращают количество из counts.
+    """
+    def http_get(url, timeout=None):
+        platform = url.split('/')[-2]
+        if platform in down:
+            raise ConnectionError(f"{platform} down")
+        return api_response(200, {'latest_data': {'count': counts[platform], 'timestamp': '2024-04-24T08:59:00Z'}})
+    return http_get
+
+
+def random_daily_stats(rng, days, gaps=False):
+    """
+    Случайная растущая статистика; при gaps=True часть дней пропущена.
+    """
+    offsets = np.sort(rng.choice(days * 2, days, replace=False)) if gaps else np.arange(days)
+    counts = 1000 + np.cumsum(rng.integers(-5, 30, days))
+    return [
+        {'date': (date(2023, 1, 1) + timedelta(days=int(offset))).isoformat(), 'followers_count': int(count)}
+        for offset, count in zip(offsets, counts)
+    ]
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_calls_run_once(self):
+        calls = []
+        barrier = threading.Barrier(5)
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        def call():
+            barrier.wait()
+            results.append(single_flight('key', work))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [42] * 5)
+
+    def test_error_is_raised_to_waiters(self):
+        barrier = threading.Barrier(3)
+        errors = []
+
+        def work():
+            time.sleep(0.1)
+            raise ValueError('upstream')
+
+        def call():
+            barrier.wait()
+            try:
+                single_flight('key', work)
+            except ValueError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ['upstream'] * 3)
+
+    def test_check_returns_result_of_other_process(self):
+        # Блокировку держит другой процесс, а его результат уже в кэше
+        cache.add('singleflight:key', 'other', 60)
+        work = mock.Mock(return_value='own')
+        self.assertEqual(single_flight('key', work, check=lambda: 'cached'), 'cached')
+        work.assert_not_called()
+
+    def test_async_calls_run_once(self):
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def main():
+            return await asyncio.gather(*(async_single_flight('key', work) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), [42] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_async_leader_cancellation_does_not_cancel_waiters(self):
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return 42
+
+        async def main():
+            leader = asyncio.ensure_future(async_single_flight('key', work))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(async_single_flight('key', work))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter, leader.cancelled()
+
+        self.assertEqual(asyncio.run(main()), (42, True))
+        self.assertEqual(len(calls), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.transitions = []
+        circuit_state_changed.connect(self._record_transition)
+
+    def tearDown(self):
+        circuit_state_changed.disconnect(self._record_transition)
+
+    def _record_transition(self, sender, endpoint, old_state, new_state, failures, **kwargs):
+        self.transitions.append((old_state, new_state))
+
+    def _open(self):
+        for _ in range(circuit.CIRCUIT_FAILURE_THRESHOLD):
+            allow_request(API_URL)
+            record_failure(API_URL)
+
+    def _expire_backoff(self):
+        key = f"circuit:{circuit.endpoint_for(API_URL)}"
+        cache.set(key, {**cache.get(key), 'retry_at': 0.0})
+
+    def test_opens_after_threshold(self):
+        self._open()
+        with self.assertRaises(CircuitOpenError):
+            allow_request(API_URL)
+        self.assertEqual(self.transitions, [(circuit.CLOSED, circuit.OPEN)])
+
+    def test_half_open_allows_one_probe_and_closes_on_success(self):
+        self._open()
+        self._expire_backoff()
+        allow_request(API_URL)  # пробный запрос
+        with self.assertRaises(CircuitOpenError):
+            allow_request(API_URL)
+        record_success(API_URL)
+        allow_request(API_URL)
+        self.assertEqual(self.transitions, [
+            (circuit.CLOSED, circuit.OPEN), (circuit.OPEN, circuit.HALF_OPEN), (circuit.HALF_OPEN, circuit.CLOSED),
+        ])
+
+    def test_failed_probe_reopens(self):
+        self._open()
+        self._expire_backoff()
+        allow_request(API_URL)
+        record_failure(API_URL)
+        with self.assertRaises(CircuitOpenError):
+            allow_request(API_URL)
+        self.assertEqual(self.transitions[-1], (circuit.HALF_OPEN, circuit.OPEN))
+
+    def test_client_errors_are_not_upstream_failures(self):
+        def http_error(status):
+            response = requests.Response()
+            response.status_code = status
+            return HTTPError(response=response)
+
+        self.assertFalse(is_upstream_failure(http_error(404)))
+        self.assertTrue(is_upstream_failure(http_error(429)))
+        self.assertTrue(is_upstream_failure(http_error(503)))
+        self.assertTrue(is_upstream_failure(ConnectionError()))
+
+    def test_client_errors_do_not_open_circuit(self):
+        response = requests.Response()
+        response.status_code = 404
+        response.url = API_URL
+        with mock.patch('subs_manager.views.http_get', return_value=response), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            for _ in range(circuit.CIRCUIT_FAILURE_THRESHOLD):
+                with self.assertRaises(HTTPError):
+                    fetch_api_data(API_URL)
+        allow_request(API_URL)
+        self.assertEqual(self.transitions, [])
+
+    def _failures(self):
+        return cache.get(f"circuit:{circuit.endpoint_for(API_URL)}", {'failures': 0})['failures']
+
+    def test_retries_count_as_one_failure(self):
+        with mock.patch('subs_manager.views.http_get', return_value=api_response(503)), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            with self.assertRaises(HTTPError):
+                fetch_api_data(API_URL)
+        self.assertEqual(self._failures(), 1)
+
+    def test_flaky_request_is_not_a_failure(self):
+        responses = [api_response(503), api_response(200, {'count': 1})]
+        with mock.patch('subs_manager.views.http_get', side_effect=responses), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            self.assertEqual(fetch_api_data(API_URL), {'count': 1})
+        self.assertEqual(self._failures(), 0)
+
+    def test_failed_probe_is_not_retried(self):
+        self._open()
+        self._expire_backoff()
+        with mock.patch('subs_manager.views.http_get', return_value=api_response(503)) as http_get, \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            with self.assertRaises(CircuitOpenError):
+                fetch_api_data(API_URL)
+        self.assertEqual(http_get.call_count, 1)
+        self.assertEqual(self.transitions[-1], (circuit.HALF_OPEN, circuit.OPEN))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LastKnownGoodTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fallback_is_marked_stale(self):
+        with mock.patch('subs_manager.views.http_get', return_value=api_response(200, {'latest_data': {'count': 5}})):
+            views.get_api_data(API_URL)
+        cache.delete(views.make_cache_key('get_api_data', API_URL))  # истек жесткий срок кэша
+        with mock.patch('subs_manager.views.http_get', side_effect=ConnectionError('down')), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            data = views.get_api_data(API_URL)
+        self.assertTrue(data[views.LAST_KNOWN_GOOD_FLAG])
+
+        profiles = {'youtube': Profile('youtube', 'x', 'channel_id')}
+        merged = views._merge_latest_data(profiles, {'youtube': data}, {}, {})
+        self.assertEqual(merged['youtube'], {'latest_data': {'count': 5}, 'status': views.STATUS_STALE})
+        self.assertTrue(views.is_degraded(merged))
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = self._make_cache(MAX_ENTRIES=10, CULL_FREQUENCY=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _make_cache(self, **options):
+        path = os.path.join(self.directory, f"cache-{len(os.listdir(self.directory))}.sqlite3")
+        return SQLiteCache(path, {'OPTIONS': options})
+
+    def test_add_only_if_missing(self):
+        self.assertTrue(self.cache.add('key', 1))
+        self.assertFalse(self.cache.add('key', 2))
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_expired_entry_is_miss_and_can_be_added(self):
+        self.cache.set('key', 1, timeout=0)  # timeout=0 - запись сразу истекает
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.has_key('key'))
+        self.assertTrue(self.cache.add('key', 2))
+        self.assertEqual(self.cache.get('key'), 2)
+
+    def test_locked_database_does_not_raise(self):
+        self.cache.set('key', 1)
+        locked = mock.Mock()
+        locked.execute.side_effect = locked.executemany.side_effect = sqlite3.OperationalError('database is locked')
+        with mock.patch.object(self.cache, '_connection', return_value=locked):
+            self.assertIsNone(self.cache.get('key'))
+            self.assertEqual(self.cache.get_many(['key']), {})
+            self.assertFalse(self.cache.add('other', 1))
+            self.cache.set('other', 1)
+            self.assertFalse(self.cache.touch('key'))
+            self.assertFalse(self.cache.has_key('key'))
+            self.assertFalse(self.cache.delete('key'))
+            self.cache.delete_many(['key'])
+            self.cache.clear()
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_cull_keeps_entry_limit(self):
+        with mock.patch.object(cache_backends, 'CULL_CHECK_EVERY', 1):
+            for i in range(30):
+                self.cache.set(f"key-{i}", i)
+        count = self.cache._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertEqual(self.cache.get('key-29'), 29)
+
+    def test_cull_keeps_size_limit(self):
+        sized = self._make_cache(MAX_SIZE=4000)
+        with mock.patch.object(cache_backends, 'CULL_CHECK_EVERY', 1):
+            for i in range(20):
+                sized.set(f"key-{i}", b'x' * 500)
+        total = sized._connection().execute('SELECT SUM(size) FROM cache_entries').fetchone()[0]
+        self.assertLessEqual(total, 4000)
+        self.assertIsNotNone(sized.get('key-19'))
+        sized.close()
+
+
+class SharedSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.segment = SharedSnapshot(os.path.join(self.directory, 'latest.snapshot'), 4096)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_writer_max_age_overrides_reader_default(self):
+        self.segment.publish(b'{"a": 1}', 'etag', max_age=300)
+        with mock.patch('time.time', return_value=time.time() + 200):
+            # Данные фонового опроса доверяются дольше мягкого срока кэша API
+            self.assertEqual(self.segment.read_json(max_age=120), {'a': 1})
+        with mock.patch('time.time', return_value=time.time() + 400):
+            self.assertIsNone(self.segment.read_json(max_age=120))
+
+    def test_reader_max_age_without_writer_max_age(self):
+        self.segment.publish(b'{"a": 1}')
+        snapshot = self.segment.read()
+        self.assertIsNone(snapshot.fresh_until)
+        self.assertTrue(snapshot.is_fresh(120))
+        with mock.patch('time.time', return_value=time.time() + 200):
+            self.assertFalse(snapshot.is_fresh(120))
+
+
+class DailySeriesTests(SimpleTestCase):
+    def test_parse_sorts_deduplicates_and_drops_invalid(self):
+        series = parse_daily_stats([
+            {'date': '2024-01-03', 'followers_count': '1,300'},
+            {'date': '2024-01-01', 'followers_count': 1000},
+            {'date': 'bad', 'followers_count': 5},
+            {'date': '2024-01-02', 'followers_count': 'n/a'},
+            {'date': '2024-01-01', 'followers_count': 1100},
+        ])
+        self.assertEqual(series.date_strings(), ['2024-01-01', '2024-01-03'])
+        self.assertEqual(series.counts.tolist(), [1100, 1300])
+        self.assertEqual(series.counts.dtype, np.int64)
+
+    def test_parse_since_and_count_field(self):
+        series = parse_daily_stats(
+            [{'date': '2024-01-01', 'subscribers_count': 1}, {'date': '2024-01-02', 'subscribers_count': 2}],
+            'subscribers_count', since=date(2024, 1, 2),
+        )
+        self.assertEqual(series.date_strings(), ['2024-01-02'])
+        self.assertEqual(series.counts.tolist(), [2])
+
+    def test_delta_encode(self):
+        series = DailySeries.from_rows([(date(2024, 1, 1), 10), (date(2024, 1, 2), 13), (date(2024, 1, 4), 12)])
+        encoded = series.delta_encode()
+        self.assertEqual(encoded['start_date'], '2024-01-01')
+        self.assertEqual(encoded['start_count'], 10)
+        self.assertEqual(encoded['date_deltas'].tolist(), [1, 2])
+        self.assertEqual(encoded['count_deltas'].tolist(), [3, -1])
+        self.assertEqual(DailySeries.empty().delta_encode()['start_date'], None)
+
+    def test_rollup_keeps_last_day_of_period(self):
+        series = parse_daily_stats(make_daily_stats(40, start=date(2024, 1, 29)))  # понедельник
+        weekly = series.rollup('week')
+        self.assertEqual(weekly.date_strings()[:2], ['2024-02-04', '2024-02-11'])
+        monthly = series.rollup('month')
+        self.assertEqual(monthly.date_strings(), ['2024-01-31', '2024-02-29', '2024-03-08'])
+        self.assertEqual(monthly.counts[-1], series.counts[-1])
+
+
+class LttbTests(SimpleTestCase):
+    def test_keeps_endpoints_and_point_count(self):
+        rng = np.random.default_rng(1)
+        x = np.arange(1000, dtype=np.float64)
+        y = rng.normal(size=1000).cumsum()
+        indices = lttb_indices(x, y, 100)
+        self.assertEqual(len(indices), 100)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue((np.diff(indices) > 0).all())
+
+    def test_keeps_spike(self):
+        y = np.zeros(500)
+        y[321] = 100.0
+        self.assertIn(321, lttb_indices(np.arange(500, dtype=np.float64), y, 20))
+
+    def test_short_series_unchanged(self):
+        series = parse_daily_stats(make_daily_stats(50))
+        self.assertIs(series.downsample(100), series)
+        self.assertEqual(len(series.downsample(10)), 10)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ForecastTests(SimpleTestCase):
+    def test_batch_matches_baseline(self):
+        rng = np.random.default_rng(7)
+        # Ряды одинаковой длины с общими датами считаются одной матрицей
+        rows_list = [random_daily_stats(rng, 45) for _ in range(5)]
+        rows_list += [random_daily_stats(rng, days, gaps=True) for days in (6, 12, 30, 80)]
+        rows_list.append(random_daily_stats(rng, 4))
+        predictions = forecast_series_batch([parse_daily_stats(rows) for rows in rows_list], days_ahead=3)
+        for rows, predicted in zip(rows_list, predictions):
+            self.assertEqual(predicted, baseline_prediction(rows, days_ahead=3))
+
+    def test_online_matches_batch(self):
+        rng = np.random.default_rng(11)
+        for days in (10, FORECAST_WINDOW, 200):
+            series = parse_daily_stats(random_daily_stats(rng, days, gaps=True))
+            online = OnlineForecaster.from_series(series).predict(2)
+            batch = forecast_series_batch([series], days_ahead=2)[0]
+            self.assertEqual([row['date'] for row in online], [row['date'] for row in batch])
+            for online_row, batch_row in zip(online, batch):
+                # При истории не длиннее окна - точно, иначе с точностью до единицы
+                tolerance = 0 if days <= FORECAST_WINDOW else 1
+                self.assertLessEqual(abs(online_row['predicted_count'] - batch_row['predicted_count']), tolerance)
+
+    def test_online_state_round_trip(self):
+        series = parse_daily_stats(make_daily_stats(60))
+        forecaster = OnlineForecaster.from_series(series.tail(40))
+        restored = OnlineForecaster.from_state(forecaster.to_state())
+        # Последние дни окна загружаются повторно и пропускаются
+        self.assertTrue(restored.extend(series.tail(25)))
+        self.assertEqual(restored.predict(2), OnlineForecaster.from_series(series).predict(2))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RollupRangeTests(TestCase):
+    def setUp(self):
+        self.profile = Profile('youtube', 'channel', 'channel_id', 'followers_count', is_primary=True)
+        self.rows = make_daily_stats(120, start=date(2024, 1, 1))
+        store_daily_stats(self.profile, {'daily_stats': self.rows})
+        self.series = parse_daily_stats(self.rows)
+
+    def _expected(self, granularity, start, end):
+        # Период, в который попадает start, включается целиком
+        rolled = self.series.rollup(granularity)
+        periods = period_starts(rolled.dates, granularity)
+        first = period_starts(np.array([start], dtype='datetime64[D]'), granularity)[0]
+        keep = (periods >= first) & (periods <= np.datetime64(end))
+        return np.datetime_as_string(rolled.dates[keep], unit='D').tolist(), rolled.counts[keep].tolist()
+
+    def test_day_range(self):
+        series = read_daily_range(self.profile, 'day', date(2024, 2, 1), date(2024, 2, 10))
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series.date_strings()[0], '2024-02-01')
+        self.assertEqual(series.counts.tolist(), self.series.counts[31:41].tolist())
+
+    def test_week_and_month_ranges_match_rollup(self):
+        for granularity in ('week', 'month'):
+            start, end = date(2024, 1, 17), date(2024, 3, 20)
+            series = read_daily_range(self.profile, granularity, start, end)
+            self.assertEqual((series.date_strings(), series.counts.tolist()), self._expected(granularity, start, end))
+
+    def test_incremental_sync_updates_last_period(self):
+        more = make_daily_stats(130, start=date(2024, 1, 1))
+        store_daily_stats(self.profile, {'daily_stats': more[-12:]}, since=date(2024, 4, 20))
+        monthly = read_daily_range(self.profile, 'month')
+        self.assertEqual(monthly.date_strings()[-1], more[-1]['date'])
+        self.assertEqual(monthly.counts[-1], more[-1]['followers_count'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class OpsAccessTests(TestCase):
+    def test_local_address_allowed(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_remote_address_forbidden(self):
+        for path in ('/metrics', '/pool-stats/', '/circuit-status/'):
+            self.assertEqual(self.client.get(path, REMOTE_ADDR='203.0.113.5').status_code, 403)
+
+    def test_bearer_token(self):
+        with mock.patch.object(views, 'OPS_TOKEN', 'secret'):
+            allowed = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5', HTTP_AUTHORIZATION='Bearer secret')
+            denied = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(allowed.status_code, 200)
+        self.assertEqual(denied.status_code, 403)
+
+    def test_staff_user(self):
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.5').status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class WarmupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_daily_page_is_warmed_for_its_own_lifetime(self):
+        path = '/statistics/daily/youtube/'
+        result = warm_page('http://testserver', path, 'ru')
+        self.assertTrue(result['cached'])
+        self.assertEqual(result['timeout'], views.DAILY_PAGE_CACHE_TIMEOUT)
+        self.assertEqual(next_warm_delay(result), views.DAILY_PAGE_CACHE_TIMEOUT - 60)
+        # Посетитель получает прогретую страницу из кэша
+        response = self.client.get(path, HTTP_ACCEPT_LANGUAGE='ru')
+        self.assertFalse(response.wsgi_request._cache_update_cache)
+
+    def test_short_lived_pages_are_not_rewarmed_continuously(self):
+        self.assertEqual(next_warm_delay({'timeout': 60}), 30)
+        self.assertEqual(next_warm_delay({'timeout': None}), 60)
+
+
+class SharedSegmentMixin:
+    """
+    Подменяет общий сегмент памяти временным файлом, чтобы данные,
+    опубликованные одним тестом, не попадали в другие.
+    """
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        segment = mock.patch.object(views, 'shared_latest', SharedSnapshot(os.path.join(directory, 'latest.snapshot'), 4096))
+        segment.start()
+        self.addCleanup(segment.stop)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LatestViewTests(SharedSegmentMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.urls = [profile.latest_url for profile in get_primary_profiles().values()]
+
+    def _count(self, response, platform='youtube'):
+        return json.loads(response.content)[platform]['count']
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        # Без общего сегмента каждый запрос проходит через кэш ответов API
+        with mock.patch.object(views, 'publish_latest_data'):
+            with mock.patch('subs_manager.views.http_get', side_effect=latest_api(dict.fromkeys(views.PLATFORMS, 100))):
+                self.assertEqual(self._count(self.client.get('/update-statistics/')), 100)
+            for url in self.urls:
+                key = views.make_cache_key('get_api_data', url)
+                cache.set(key, {**cache.get(key), 'fresh_until': 0.0})
+
+            with mock.patch('subs_manager.views.http_get', side_effect=latest_api(dict.fromkeys(views.PLATFORMS, 200))) as http_get, \
+                    mock.patch.object(views, '_refresh_executor') as executor:
+                # Устаревшие данные отдаются сразу, обновление запускается один раз на ключ
+                self.assertEqual(self._count(self.client.get('/update-statistics/')), 100)
+                self.assertEqual(self._count(self.client.get('/update-statistics/')), 100)
+                self.assertEqual(http_get.call_count, 0)
+                self.assertEqual(executor.submit.call_count, len(self.urls))
+                for call in executor.submit.call_args_list:
+                    call.args[0](*call.args[1:])
+                self.assertEqual(self._count(self.client.get('/update-statistics/')), 200)
+
+    def test_fresh_entry_is_served_without_api_call(self):
+        with mock.patch.object(views, 'publish_latest_data'), \
+                mock.patch('subs_manager.views.http_get', side_effect=latest_api(dict.fromkeys(views.PLATFORMS, 100))) as http_get:
+            self.client.get('/update-statistics/')
+            self.client.get('/update-statistics/')
+        self.assertEqual(http_get.call_count, len(self.urls))
+
+    def test_update_statistics_not_modified(self):
+        with mock.patch('subs_manager.views.http_get', side_effect=latest_api(dict.fromkeys(views.PLATFORMS, 100))):
+            first = self.client.get('/update-statistics/')
+            # Второй ответ берется из общего сегмента: ETag совпадает с рассчитанным
+            second = self.client.get('/update-statistics/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+    def test_stale_and_unavailable_platforms(self):
+        profile = get_primary_profile('youtube')
+        LatestSnapshot.objects.create(
+            platform='youtube', profile_id=profile.profile_id, count=42,
+            upstream_timestamp='2024-04-20T10:00:00Z', fetched_at=timezone.now() - timedelta(hours=1),
+        )
+        api = latest_api(dict.fromkeys(views.PLATFORMS, 100), down=('youtube', 'instagram'))
+        with mock.patch('subs_manager.views.http_get', side_effect=api), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            response = self.client.get('/')
+        self.assertEqual(response.context['youtube_status'], views.STATUS_STALE)
+        self.assertEqual(response.context['youtube_count'], 42)
+        self.assertEqual(response.context['instagram_status'], views.STATUS_UNAVAILABLE)
+        self.assertEqual(response.context['linkedin_status'], views.STATUS_OK)
+        # Неполная страница кэшируется ненадолго и не публикуется в общем сегменте
+        self.assertIn(f'max-age={views.DEGRADED_CACHE_TIMEOUT}', response['Cache-Control'])
+        self.assertIsNone(views.read_shared_latest())
+
+    def test_stream_sends_single_event_under_wsgi(self):
+        platforms_data = {'youtube': {'latest_data': {'count': 5, 'timestamp': '2024-04-24T08:59:00Z'}, 'status': 'ok'}}
+        with mock.patch.object(views, 'aload_latest_data', mock.AsyncMock(return_value=platforms_data)):
+            response = self.client.get('/stream-statistics/')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: stats\ndata: {"success": true, "youtube": {"count": 5', content)
+        self.assertTrue(content.endswith(f'event: mode\ndata: {views.STREAM_MODE_SINGLE}\n\n'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DailyViewTests(TestCase):
+    series_path = '/statistics/daily/youtube/series/'
+
+    def setUp(self):
+        cache.clear()
+        store_daily_stats(get_primary_profile('youtube'), {'daily_stats': make_daily_stats(120, start=date(2024, 1, 1))})
+
+    def test_daily_page_not_modified(self):
+        first = self.client.get('/statistics/daily/youtube/')
+        second = self.client.get('/statistics/daily/youtube/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+
+    def test_series_not_modified(self):
+        first = self.client.get(self.series_path)
+        second = self.client.get(self.series_path, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+
+    def test_points_redirect_to_canonical_value(self):
+        response = self.client.get(self.series_path, {'points': 150, 'granularity': 'week'})
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Location'], f'{self.series_path}?points=200&granularity=week')
+        response = self.client.get(self.series_path, {'points': 10 ** 6})
+        self.assertEqual(response['Location'], f'{self.series_path}?points={views.SERIES_MAX_POINTS}')
+        self.assertEqual(self.client.get(self.series_path, {'points': 200}).status_code, 200)
+
+    def test_date_range(self):
+        data = self.client.get(self.series_path, {'from': '2024-02-01', 'to': '2024-02-10'}).json()
+        self.assertEqual(data['start_date'], '2024-02-01')
+        self.assertEqual(len(data['date_deltas']), 9)
+        # Диапазон не доходит до последнего дня: прогноз не показывается
+        self.assertEqual(data['predictions'], [])
+
+    def test_invalid_date_range(self):
+        for params in ({'from': '2024-03-01', 'to': '2024-02-01'}, {'from': '01.02.2024'}, {'points': 'many'}):
+            response = self.client.get(self.series_path, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertFalse(response.json()['success'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.youtube = get_primary_profile('youtube')
+        store_daily_stats(self.youtube, {'daily_stats': make_daily_stats(5, start=date(2024, 1, 1))})
+        store_daily_stats(get_primary_profile('linkedin'), {'daily_stats': make_daily_stats(3, start=date(2024, 1, 1))})
+
+    def _export(self, **params):
+        # Профили без сохраненной статистики не синхронизируются: API недоступно
+        with mock.patch('subs_manager.views.http_get', side_effect=ConnectionError('down')), \
+                mock.patch('subs_manager.views.retry_delay', return_value=0):
+            response = self.client.get('/statistics/export/', params)
+            return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, content = self._export()
+        lines = content.splitlines()
+        self.assertEqual(response['Content-Type'], views.EXPORT_CONTENT_TYPES['csv'])
+        self.assertEqual(lines[0], 'platform,profile_id,date,count')
+        self.assertEqual(len(lines), 1 + 5 + 3)
+        self.assertIn(f'youtube,{self.youtube.profile_id},2024-01-01,1000', lines)
+
+    def test_ndjson_with_filters(self):
+        _, content = self._export(format='ndjson', platform='youtube', profile_id=self.youtube.profile_id,
+                                  **{'from': '2024-01-02', 'to': '2024-01-04'})
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['date'] for row in rows], ['2024-01-02', '2024-01-03', '2024-01-04'])
+        self.assertEqual({(row['platform'], row['profile_id']) for row in rows}, {('youtube', self.youtube.profile_id)})
+
+    def test_invalid_params(self):
+        for params in ({'format': 'xml'}, {'platform': 'myspace'}, {'profile_id': self.youtube.profile_id},
+                       {'platform': 'youtube', 'profile_id': 'unknown'}, {'from': '2024-02-01', 'to': '2024-01-01'}):
+            response = self.client.get('/statistics/export/', params)
+            self.assertEqual(response.status_code, 400, params)
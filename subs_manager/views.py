@@ -3,17 +3,66 @@ import requests
 from django.shortcuts import render
 from django.core.exceptions import ValidationError
 from requests.exceptions import RequestException, Timeout
+from django.middleware.cache import CacheMiddleware
 from django.views.decorators.cache import cache_page
+from django.views.decorators.gzip import gzip_page
+from django.urls import reverse
 from django.core.cache import cache
+from django.conf import settings
+import csv
 import json
-from typing import Dict, Any, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 from functools import wraps
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor, wait
 import time
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponsePermanentRedirect, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import async_to_sync, sync_to_async
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.translation import gettext as _
 import numpy as np
-from datetime import datetime, timedelta
+import asyncio
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from .http_client import http_get, async_http_get, get_pool_stats
+from .circuit import (
+    CircuitOpenError,
+    allow_request,
+    aallow_request,
+    arecord_failure,
+    arecord_success,
+    endpoint_for,
+    get_circuit_states,
+    record_failure,
+    record_success,
+)
+from .singleflight import single_flight, async_single_flight
+from .broadcast import Broadcaster
+from .metrics import (
+    CACHE_REQUESTS,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    UPSTREAM_ERRORS,
+    UPSTREAM_LATENCY,
+    UPSTREAM_RETRIES,
+    UPSTREAM_TIMEOUTS,
+    render_metrics,
+)
+from .series import GRANULARITIES, DailySeries, period_starts
+from .forecasting import FORECAST_WINDOW, cached_forecast_series_batch
+from .models import LatestSnapshot, DailyStat, StatRollup, SyncState, ForecastState
+from .profiles import PLATFORMS, Profile, get_primary_profile, get_primary_profiles, get_profile, get_profiles
+from .shared_snapshot import Snapshot, shared_latest
+
+try:
+    import orjson
+except ImportError:  # без orjson ответы сериализуются стандартным json
+    orjson = None
 
 # Настроим логгер для отслеживания ошибок и важных событий
 logger = logging.getLogger(__name__)
@@ -21,53 +70,329 @@ logger = logging.getLogger(__name__)
 # Константы для настройки приложения
 API_TIMEOUT = 15  # увеличиваем таймаут до 15 секунд
 API_MAX_RETRIES = 3  # максимальное количество попыток
-API_BASE_URL = "http://194.35.119.49:8090"
 CACHE_TIMEOUT = 60 * 15  # 15 минут
+API_MAX_WORKERS = 8  # максимальное количество параллельных запросов к API
+API_CACHE_SOFT_TIMEOUT = 60 * 2  # через 2 минуты ответ API обновляется в фоне
+API_CACHE_HARD_TIMEOUT = 60 * 60 * 24  # устаревший ответ API отдается не дольше суток
+API_RETRY_BACKOFF = 0.5  # базовая пауза между попытками, удваивается с каждой попыткой
+API_RETRY_MAX_BACKOFF = 4  # максимальная пауза между попытками
+LAST_KNOWN_GOOD_TIMEOUT = 60 * 60 * 24 * 7  # последний успешный ответ API хранится неделю
+LAST_KNOWN_GOOD_FLAG = 'last_known_good'  # отметка ответа get_api_data, взятого из последнего успешного
+
+STREAM_RETRY_MS = 30 * 1000  # через сколько браузер переподключается к потоку событий
+STREAM_MODE_SINGLE = 'single'  # событие mode: сервер отдал одно событие и закрыл поток (WSGI)
+STORE_MAX_AGE = 60 * 10  # данные локального хранилища старше 10 минут считаются устаревшими
+SHARED_LATEST_MAX_AGE = API_CACHE_SOFT_TIMEOUT  # сколько доверять данным, опубликованным из ответов API
+# Данные фонового опроса доверяются до следующего цикла (INGESTION_INTERVAL) с запасом на его длительность
+SHARED_POLLED_MAX_AGE = getattr(settings, 'INGESTION_INTERVAL', 60 * 5) + 60
+PAGE_DEADLINE = 5  # сколько секунд страница ждет ответы API по всем платформам вместе
+DEGRADED_CACHE_TIMEOUT = 60  # страница с устаревшими или недоступными платформами кэшируется на минуту
+DAILY_PAGE_CACHE_TIMEOUT = 60 * 60 * 24  # страница ежедневной статистики без данных кэшируется на сутки
+SERIES_MAX_POINTS = 2000  # максимальное количество точек графика в ответе get_daily_series
+SERIES_POINTS_STEP = 100  # запрошенное количество точек округляется вверх до шага, чтобы ограничить число вариантов в кэше
+EXPORT_CHUNK_SIZE = 2000  # сколько строк выгрузки читается из базы и отправляется клиенту за раз
+
+# Доступ к служебным endpoint'ам (/metrics, /pool-stats/, /circuit-status/)
+OPS_ALLOWED_IPS = getattr(settings, 'OPS_ALLOWED_IPS', ['127.0.0.1', '::1'])  # адреса, которым доступ открыт
+OPS_TOKEN = getattr(settings, 'OPS_TOKEN', None)  # токен для заголовка Authorization: Bearer <токен>
+
+# Форматы выгрузки истории подписчиков и их типы содержимого
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_CSV_HEADER = ('platform', 'profile_id', 'date', 'count')
+
+# Статус данных платформы в ответе
+STATUS_OK = 'ok'  # данные из свежего снимка или от API
+STATUS_STALE = 'stale'  # API не ответило вовремя, показаны последние сохраненные данные
+STATUS_UNAVAILABLE = 'unavailable'  # API не ответило вовремя, сохраненных данных нет
+
+# Общий пул потоков для параллельных запросов к API
+_api_executor = ThreadPoolExecutor(max_workers=API_MAX_WORKERS, thread_name_prefix='subs-api')
+# Отдельный пул для фонового обновления кэша, чтобы не занимать потоки запросов
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='subs-api-refresh')
+
+def _json_default(value: Any) -> Any:
+    """
+    Преобразует массивы и числа numpy для стандартного json.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Объект типа {type(value).__name__} не сериализуется в JSON")
+
+def fast_json_response(data: Dict[str, Any]) -> HttpResponse:
+    """
+    Формирует компактный JSON-ответ.
+    
+    Если установлен orjson, данные (включая массивы numpy) сериализуются им
+    без промежуточных списков Python; иначе используется стандартный json.
+    
+    Args:
+        data (Dict[str, Any]): Данные ответа
+    
+    Returns:
+        HttpResponse: Ответ application/json
+    """
+    if orjson is not None:
+        body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(data, default=_json_default, separators=(',', ':'))
+    return HttpResponse(body, content_type='application/json')
+
+def make_cache_key(prefix: str, *args, **kwargs) -> str:
+    """
+    Формирует стабильный ключ кэша на основе аргументов функции.
+    
+    Аргументы сериализуются в JSON с сортировкой ключей и хэшируются,
+    поэтому ключ не зависит от порядка kwargs и не превышает ограничений
+    на длину ключа в бэкендах кэша.
+    
+    Args:
+        prefix (str): Префикс ключа (например, имя функции)
+        *args: Позиционные аргументы
+        **kwargs: Именованные аргументы
+        
+    Returns:
+        str: Ключ кэша вида "api_response:<prefix>:<sha1>"
+    """
+    payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return f"api_response:{prefix}:{digest}"
+
+def _refresh_cache_entry(func, cache_key: str, timeout: int, soft_timeout: int, args, kwargs) -> None:
+    """
+    Обновляет запись кэша в фоне и снимает блокировку обновления.
+    """
+    try:
+        data = func(*args, **kwargs)
+        cache.set(cache_key, {'data': data, 'fresh_until': time.time() + soft_timeout}, timeout)
+        logger.debug(f"Данные в кэше обновлены в фоне для {cache_key}")
+    except Exception as e:
+        logger.error(f"Ошибка при фоновом обновлении кэша {cache_key}: {str(e)}")
+    finally:
+        cache.delete(f"{cache_key}:refreshing")
 
-def cache_api_response(timeout: int = CACHE_TIMEOUT):
+def cache_api_response(timeout: int = API_CACHE_HARD_TIMEOUT, soft_timeout: int = API_CACHE_SOFT_TIMEOUT,
+                       key_prefix: Optional[str] = None):
     """
-    Декоратор для кэширования ответов API.
+    Декоратор для кэширования ответов API по схеме stale-while-revalidate.
     
     Используется для оптимизации производительности путем сохранения
-    результатов API-запросов в кэше на определенное время.
+    результатов API-запросов в кэше. У записи два срока жизни:
+    - soft_timeout: пока он не истек, данные считаются свежими;
+    - timeout: после soft_timeout устаревшие данные все еще отдаются сразу,
+      а обновление запускается в фоне. Только после timeout запись удаляется
+      и запрос ждет ответа от API.
+    
+    Одновременные промахи по одному ключу объединяются через single_flight,
+    поэтому к API уходит только один запрос, а остальные ждут его результат.
+    
+    Декоратор поддерживает и корутинные функции: для них кэш читается через
+    асинхронный API кэша, а промахи объединяются через async_single_flight.
     
     Args:
-        timeout (int): Время жизни кэша в секундах. По умолчанию 15 минут.
+        timeout (int): Жесткое время жизни кэша в секундах. По умолчанию сутки.
+        soft_timeout (int): Время, в течение которого данные считаются свежими.
+        key_prefix (str, optional): Префикс ключа кэша (по умолчанию имя функции).
+            Синхронная и асинхронная версии одной функции с общим префиксом
+            используют общие записи кэша.
     
     Returns:
         Callable: Декорированная функция, которая сначала проверяет кэш,
                 и только при отсутствии данных делает запрос к API.
     
     Example:
-        @cache_api_response(timeout=300)
+        @cache_api_response(timeout=3600, soft_timeout=60)
         def get_user_data(user_id):
             return requests.get(f"/api/users/{user_id}")
     """
     def decorator(func):
+        prefix = key_prefix or func.__name__
+        
+        if asyncio.iscoroutinefunction(func):
+            return _async_cache_api_response(func, prefix, timeout, soft_timeout)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Создаем уникальный ключ кэша на основе аргументов функции
-            cache_key = f"api_response_{func.__name__}_{str(args)}_{str(kwargs)}"
+            cache_key = make_cache_key(prefix, *args, **kwargs)
             
             # Пробуем получить данные из кэша
-            cached_data = cache.get(cache_key)
-            if cached_data is not None:
+            entry = cache.get(cache_key)
+            if entry is not None:
+                stale = entry['fresh_until'] <= time.time()
+                CACHE_REQUESTS.inc(prefix, 'stale' if stale else 'hit')
+                if stale:
+                    # Данные устарели: отдаем их сразу, а обновляем в фоне.
+                    # cache.add гарантирует, что обновление запустится один раз.
+                    if cache.add(f"{cache_key}:refreshing", True, API_TIMEOUT * API_MAX_RETRIES):
+                        logger.debug(f"Запущено фоновое обновление кэша для {cache_key}")
+                        _refresh_executor.submit(
+                            _refresh_cache_entry, func, cache_key, timeout, soft_timeout, args, kwargs
+                        )
                 logger.debug(f"Получены данные из кэша для {cache_key}")
-                return cached_data
+                return entry['data']
             
-            # Если данных нет в кэше, получаем их от API
-            try:
+            def fetch_and_store():
                 data = func(*args, **kwargs)
                 # Сохраняем в кэш
-                cache.set(cache_key, data, timeout)
+                cache.set(cache_key, {'data': data, 'fresh_until': time.time() + soft_timeout}, timeout)
                 logger.debug(f"Данные сохранены в кэш для {cache_key}")
                 return data
+            
+            def cached_data():
+                entry = cache.get(cache_key)
+                return entry['data'] if entry is not None else None
+            
+            # Если данных нет в кэше, получаем их от API. Одновременные промахи
+            # по одному ключу объединяются: к API идет только один запрос.
+            CACHE_REQUESTS.inc(prefix, 'miss')
+            try:
+                return single_flight(cache_key, fetch_and_store, check=cached_data)
             except Exception as e:
                 logger.error(f"Ошибка при получении данных: {str(e)}")
                 raise
         return wrapper
     return decorator
 
+def _async_cache_api_response(func, prefix: str, timeout: int, soft_timeout: int):
+    """
+    Асинхронный вариант обертки cache_api_response для корутинных функций.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        cache_key = make_cache_key(prefix, *args, **kwargs)
+        
+        # Пробуем получить данные из кэша
+        entry = await cache.aget(cache_key)
+        if entry is not None:
+            stale = entry['fresh_until'] <= time.time()
+            CACHE_REQUESTS.inc(prefix, 'stale' if stale else 'hit')
+            if stale:
+                # Фоновое обновление выполняется в пуле потоков, а не в задаче
+                # текущего цикла событий: под WSGI цикл живет только до конца запроса
+                if await cache.aadd(f"{cache_key}:refreshing", True, API_TIMEOUT * API_MAX_RETRIES):
+                    logger.debug(f"Запущено фоновое обновление кэша для {cache_key}")
+                    _refresh_executor.submit(
+                        _refresh_cache_entry, async_to_sync(func), cache_key, timeout, soft_timeout, args, kwargs
+                    )
+            logger.debug(f"Получены данные из кэша для {cache_key}")
+            return entry['data']
+        
+        async def fetch_and_store():
+            data = await func(*args, **kwargs)
+            # Сохраняем в кэш
+            await cache.aset(cache_key, {'data': data, 'fresh_until': time.time() + soft_timeout}, timeout)
+            logger.debug(f"Данные сохранены в кэш для {cache_key}")
+            return data
+        
+        async def cached_data():
+            entry = await cache.aget(cache_key)
+            return entry['data'] if entry is not None else None
+        
+        CACHE_REQUESTS.inc(prefix, 'miss')
+        try:
+            return await async_single_flight(cache_key, fetch_and_store, check=cached_data)
+        except Exception as e:
+            logger.error(f"Ошибка при получении данных: {str(e)}")
+            raise
+    return wrapper
+
+def async_cache_page(timeout: Optional[int]):
+    """
+    Вариант cache_page для async-представлений.
+
+    cache_page выполняет чтение и запись кэша прямо в цикле событий, и
+    обращения к файлу SQLite блокируют все запросы процесса. Здесь те же
+    шаги CacheMiddleware выполняются в пуле потоков, поэтому ключи кэша
+    совпадают с синхронными представлениями (и с manage.py warm_cache).
+
+    Args:
+        timeout (int, optional): Время жизни страницы в кэше; None - из max-age ответа
+
+    Returns:
+        Callable: Декоратор корутинного представления
+    """
+    def decorator(view):
+        middleware = CacheMiddleware(view, page_timeout=timeout)
+        process_request = sync_to_async(middleware.process_request, thread_sensitive=False)
+        process_response = sync_to_async(middleware.process_response, thread_sensitive=False)
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            cached = await process_request(request)
+            if cached is not None:
+                return cached
+            response = await view(request, *args, **kwargs)
+            return await process_response(request, response)
+        return wrapper
+    return decorator
+
+def has_ops_access(request) -> bool:
+    """
+    Проверяет доступ к служебным endpoint'ам.
+
+    Доступ открыт адресам из OPS_ALLOWED_IPS, запросам с заголовком
+    Authorization: Bearer OPS_TOKEN и сотрудникам (is_staff). Адрес
+    берется из REMOTE_ADDR: за обратным прокси это адрес прокси, поэтому
+    там доступ лучше открывать по токену.
+
+    Args:
+        request: HTTP запрос
+
+    Returns:
+        bool: True, если доступ разрешен
+    """
+    if request.META.get('REMOTE_ADDR') in OPS_ALLOWED_IPS:
+        return True
+    if OPS_TOKEN:
+        scheme, separator, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        valid = hmac.compare_digest(token.strip().encode(), str(OPS_TOKEN).encode())
+        if separator and scheme.lower() == 'bearer' and valid:
+            return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+def ops_endpoint(view):
+    """
+    Декоратор служебного представления: без доступа (см. has_ops_access)
+    возвращается 403.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not has_ops_access(request):
+            return HttpResponseForbidden()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+def retry_delay(attempt: int) -> float:
+    """
+    Пауза перед повторной попыткой: экспоненциальная, со случайной составляющей.
+    
+    Случайная пауза не дает множеству клиентов повторять запросы одновременно.
+    
+    Args:
+        attempt (int): Номер неудачной попытки, начиная с 0
+        
+    Returns:
+        float: Пауза в секундах от 0 до API_RETRY_BACKOFF * 2^attempt (не больше API_RETRY_MAX_BACKOFF)
+    """
+    return random.uniform(0, min(API_RETRY_MAX_BACKOFF, API_RETRY_BACKOFF * 2 ** attempt))
+
+def is_upstream_failure(error: RequestException) -> bool:
+    """
+    Проверяет, говорит ли ошибка о недоступности API.
+    
+    Ответы 4xx (кроме 429) означают ошибку запроса, а не сбой API, и не
+    размыкают выключатель.
+    """
+    response = getattr(error, 'response', None)
+    if response is None:
+        return True
+    return response.status_code >= 500 or response.status_code == 429
+
 def fetch_api_data(url: str) -> Dict[str, Any]:
     """
     Безопасное получение данных от API с обработкой ошибок и кэшированием.
@@ -75,6 +400,13 @@ def fetch_api_data(url: str) -> Dict[str, Any]:
     Выполняет HTTP GET запрос к указанному URL с настроенным таймаутом
     и обработкой возможных ошибок.
     
+    Запрос проходит через автоматический выключатель конечной точки (см.
+    circuit.py): если API недавно было недоступно, запрос сразу завершается
+    CircuitOpenError, не занимая поток. Между попытками выдерживается
+    экспоненциальная пауза со случайной составляющей. Выключатель получает
+    одну ошибку на вызов, когда все попытки исчерпаны, поэтому единичный
+    нестабильный запрос не размыкает его для всех процессов.
+    
     Args:
         url (str): URL для запроса
         
@@ -82,6 +414,7 @@ def fetch_api_data(url: str) -> Dict[str, Any]:
         Dict[str, Any]: Словарь с данными от API
         
     Raises:
+        CircuitOpenError: если выключатель конечной точки разомкнут
         RequestException: при ошибках сети
         Timeout: при превышении времени ожидания
         ValueError: при некорректном ответе
@@ -93,342 +426,1322 @@ def fetch_api_data(url: str) -> Dict[str, Any]:
         except RequestException as e:
             handle_error(e)
     """
+    allow_request(url)
+    endpoint = endpoint_for(url)
     for attempt in range(API_MAX_RETRIES):
+        started = time.perf_counter()
         try:
-            response = requests.get(url, timeout=API_TIMEOUT)
+            response = http_get(url, timeout=API_TIMEOUT)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
         except Timeout:
+            UPSTREAM_TIMEOUTS.inc(endpoint)
             if attempt == API_MAX_RETRIES - 1:
+                # Выключатель считает вызовы, а не попытки: одна ошибка после всех повторов
+                record_failure(url)
                 logger.error(f"Timeout при запросе к {url} после {API_MAX_RETRIES} попыток")
                 raise
             logger.warning(f"Timeout при запросе к {url}, попытка {attempt + 1} из {API_MAX_RETRIES}")
-            time.sleep(1)  # Ждем секунду перед повторной попыткой
         except RequestException as e:
+            UPSTREAM_ERRORS.inc(endpoint)
             if attempt == API_MAX_RETRIES - 1:
+                if is_upstream_failure(e):
+                    record_failure(url)
                 logger.error(f"Ошибка при запросе к {url}: {str(e)}")
                 raise
             logger.warning(f"Ошибка при запросе к {url}, попытка {attempt + 1} из {API_MAX_RETRIES}")
-            time.sleep(1)
+        else:
+            record_success(url)
+            return data
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint)
+        UPSTREAM_RETRIES.inc(endpoint)
+        time.sleep(retry_delay(attempt))
+        # Пока мы ждали, выключатель мог разомкнуться; в полуоткрытом состоянии
+        # повторов нет: пробный запрос не удался, и выключатель снова размыкается
+        try:
+            allow_request(url)
+        except CircuitOpenError:
+            record_failure(url)
+            raise
 
-def validate_platform(platform: str) -> None:
+async def afetch_api_data(url: str) -> Dict[str, Any]:
     """
-    Проверяет корректность названия платформы.
+    Асинхронное получение данных от API с обработкой ошибок.
+    
+    Асинхронный вариант fetch_api_data: запрос и паузы между попытками
+    не блокируют поток, пока ответ API не получен.
     
     Args:
-        platform (str): Название платформы для проверки
+        url (str): URL для запроса
+        
+    Returns:
+        Dict[str, Any]: Словарь с данными от API
         
     Raises:
-        ValidationError: если платформа не входит в список поддерживаемых
+        CircuitOpenError: если выключатель конечной точки разомкнут
+        RequestException: при ошибках сети
+        Timeout: при превышении времени ожидания
+        ValueError: при некорректном ответе
     """
-    valid_platforms = ["linkedin", "youtube", "medium", "instagram"]
-    if platform.lower() not in valid_platforms:
-        raise ValidationError(_(f"Недопустимая платформа: {platform}"))
+    await aallow_request(url)
+    endpoint = endpoint_for(url)
+    for attempt in range(API_MAX_RETRIES):
+        started = time.perf_counter()
+        try:
+            response = await async_http_get(url, timeout=API_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+        except Timeout:
+            UPSTREAM_TIMEOUTS.inc(endpoint)
+            if attempt == API_MAX_RETRIES - 1:
+                # Выключатель считает вызовы, а не попытки: одна ошибка после всех повторов
+                await arecord_failure(url)
+                logger.error(f"Timeout при запросе к {url} после {API_MAX_RETRIES} попыток")
+                raise
+            logger.warning(f"Timeout при запросе к {url}, попытка {attempt + 1} из {API_MAX_RETRIES}")
+        except RequestException as e:
+            UPSTREAM_ERRORS.inc(endpoint)
+            if attempt == API_MAX_RETRIES - 1:
+                if is_upstream_failure(e):
+                    await arecord_failure(url)
+                logger.error(f"Ошибка при запросе к {url}: {str(e)}")
+                raise
+            logger.warning(f"Ошибка при запросе к {url}, попытка {attempt + 1} из {API_MAX_RETRIES}")
+        else:
+            await arecord_success(url)
+            return data
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint)
+        UPSTREAM_RETRIES.inc(endpoint)
+        await asyncio.sleep(retry_delay(attempt))
+        # Пока мы ждали, выключатель мог разомкнуться; в полуоткрытом состоянии
+        # повторов нет: пробный запрос не удался, и выключатель снова размыкается
+        try:
+            await aallow_request(url)
+        except CircuitOpenError:
+            await arecord_failure(url)
+            raise
 
-def validate_profile_id(platform: str, profile_id: str) -> None:
+@cache_api_response()
+def get_api_data(url: str) -> Dict[str, Any]:
     """
-    Проверяет корректность ID профиля для каждой платформы.
+    Получение данных от API через кэш stale-while-revalidate.
+    
+    Обертка над fetch_api_data, которую используют представления: пользователь
+    ждет ответа API только если данных в кэше нет совсем. Если API
+    недоступно (в том числе разомкнут выключатель), отдается последний
+    успешный ответ, сохраненный не более LAST_KNOWN_GOOD_TIMEOUT назад,
+    с отметкой LAST_KNOWN_GOOD_FLAG: такие данные показываются как устаревшие.
     
     Args:
-        platform (str): Название платформы
-        profile_id (str): ID профиля для проверки
+        url (str): URL для запроса
         
-    Raises:
-        ValidationError: если ID профиля некорректен
+    Returns:
+        Dict[str, Any]: Словарь с данными от API
     """
-    if not profile_id or not isinstance(profile_id, str):
-        raise ValidationError(_(f"Некорректный ID профиля для {platform}"))
+    last_known_good_key = make_cache_key('last_known_good', url)
+    try:
+        data = fetch_api_data(url)
+    except RequestException as e:
+        data = cache.get(last_known_good_key)
+        if data is None:
+            raise
+        logger.warning(f"API недоступно, отдаем последний успешный ответ для {url}: {str(e)}")
+        return {**data, LAST_KNOWN_GOOD_FLAG: True}
+    cache.set(last_known_good_key, data, LAST_KNOWN_GOOD_TIMEOUT)
+    return data
 
-def calculate_trend_prediction(daily_stats: list, days_ahead: int = 2) -> list:
+@cache_api_response(key_prefix='get_api_data')
+async def aget_api_data(url: str) -> Dict[str, Any]:
     """
-    Рассчитывает прогноз на основе комбинации методов:
-    1. Полиномиальная регрессия 2-й степени для определения тренда
-    2. Экспоненциальное сглаживание для учета последних изменений
+    Асинхронное получение данных от API через кэш stale-while-revalidate.
+    
+    Использует те же записи кэша и последний успешный ответ, что и get_api_data.
     
     Args:
-        daily_stats: список словарей с данными за последние дни
-        days_ahead: на сколько дней вперед делать прогноз
+        url (str): URL для запроса
         
     Returns:
-        list: список предсказанных значений с датами
+        Dict[str, Any]: Словарь с данными от API
     """
-    if len(daily_stats) < 5:  # Нужно минимум 5 точек для надежного прогноза
-        return []
-        
-    # Берем только последние 30 дней для прогноза
-    recent_stats = daily_stats[-30:] if len(daily_stats) > 30 else daily_stats
+    last_known_good_key = make_cache_key('last_known_good', url)
+    try:
+        data = await afetch_api_data(url)
+    except RequestException as e:
+        data = await cache.aget(last_known_good_key)
+        if data is None:
+            raise
+        logger.warning(f"API недоступно, отдаем последний успешный ответ для {url}: {str(e)}")
+        return {**data, LAST_KNOWN_GOOD_FLAG: True}
+    await cache.aset(last_known_good_key, data, LAST_KNOWN_GOOD_TIMEOUT)
+    return data
+
+def fetch_platforms_data_partial(urls: Dict[str, str], timeout: float) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+    """
+    Параллельное получение данных от API с общим сроком ожидания.
     
-    # Подготовка данных
-    dates = [datetime.strptime(stat['date'], '%Y-%m-%d') for stat in recent_stats]
-    days_nums = [(date - dates[0]).days for date in dates]
-    counts = [stat.get('followers_count', stat.get('subscribers_count', 0)) for stat in recent_stats]
-    
-    # Полиномиальная регрессия 2-й степени
-    poly_coeffs = np.polyfit(days_nums, counts, 2)
-    poly = np.poly1d(poly_coeffs)
-    
-    # Экспоненциальное сглаживание для определения краткосрочного тренда
-    alpha = 0.3  # Коэффициент сглаживания
-    exp_smooth = counts[-1]  # Последнее известное значение
-    last_changes = []
-    
-    # Рассчитываем последние изменения с экспоненциальным сглаживанием
-    for i in range(len(counts)-1):
-        change = counts[i+1] - counts[i]
-        if not last_changes:
-            last_changes.append(change)
-        else:
-            smoothed_change = alpha * change + (1 - alpha) * last_changes[-1]
-            last_changes.append(smoothed_change)
+    Запросы выполняются одновременно в общем пуле потоков. Ошибка или
+    медленный ответ одной платформы не мешает остальным: ответы, не
+    полученные за timeout секунд, попадают в ошибки. Такие запросы
+    продолжают выполняться в пуле потоков и заполняют кэш для следующих
+    запросов.
     
-    # Среднее изменение за последние дни с учетом сглаживания
-    recent_trend = np.mean(last_changes[-5:]) if len(last_changes) >= 5 else last_changes[-1]
+    Args:
+        urls (Dict[str, str]): Словарь вида {платформа: URL}
+        timeout (float): Сколько секунд ждать ответы всех платформ
+        
+    Returns:
+        Tuple[Dict, Dict]: ({платформа: данные от API}, {платформа: исключение})
+    """
+    futures = {
+        platform: _api_executor.submit(get_api_data, url)
+        for platform, url in urls.items()
+    }
+    done, pending = wait(futures.values(), timeout=max(0.0, timeout))
+    results, errors = {}, {}
+    for platform, future in futures.items():
+        if future not in done:
+            errors[platform] = Timeout(f"API не ответило за {timeout:.1f} с")
+        elif future.exception() is not None:
+            errors[platform] = future.exception()
+        else:
+            results[platform] = future.result()
+    return results, errors
+
+def _discard_task_result(task: asyncio.Task) -> None:
+    """
+    Помечает результат фоновой задачи полученным, чтобы asyncio не писал в лог
+    "Task exception was never retrieved".
+    """
+    if not task.cancelled():
+        task.exception()
+
+async def afetch_platforms_data_partial(urls: Dict[str, str], timeout: float) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Exception]]:
+    """
+    Асинхронный вариант fetch_platforms_data_partial.
     
-    # Расчет прогноза как комбинации полиномиальной регрессии и последнего тренда
-    predictions = []
-    last_date = dates[-1]
-    last_count = counts[-1]
+    Запросы, не завершенные за timeout секунд, не отменяются: отмена
+    ведущего запроса single-flight отменила бы его и для других ожидающих.
+    Под ASGI такие запросы завершаются в фоне и заполняют кэш, а под WSGI
+    их отменяет завершение цикла событий (async_to_sync).
     
-    for i in range(1, days_ahead + 1):
-        future_date = last_date + timedelta(days=i)
-        future_days = (future_date - dates[0]).days
-        
-        # Комбинируем полиномиальный прогноз с трендом
-        poly_pred = poly(future_days)
-        trend_pred = last_count + (recent_trend * i)
-        
-        # Взвешенная комбинация (70% полиномиальный прогноз, 30% линейный тренд)
-        predicted_count = int(0.7 * poly_pred + 0.3 * trend_pred)
+    Args:
+        urls (Dict[str, str]): Словарь вида {платформа: URL}
+        timeout (float): Сколько секунд ждать ответы всех платформ
         
-        predictions.append({
-            'date': future_date.strftime('%Y-%m-%d'),
-            'predicted_count': predicted_count
-        })
-    
-    return predictions
+    Returns:
+        Tuple[Dict, Dict]: ({платформа: данные от API}, {платформа: исключение})
+    """
+    if not urls:
+        return {}, {}
+    tasks = {platform: asyncio.ensure_future(aget_api_data(url)) for platform, url in urls.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=max(0.0, timeout))
+    for task in pending:
+        # Ошибку запроса, завершившегося в фоне, уже некому получить
+        task.add_done_callback(_discard_task_result)
+    results, errors = {}, {}
+    for platform, task in tasks.items():
+        if task in pending:
+            errors[platform] = Timeout(f"API не ответило за {timeout:.1f} с")
+        elif task.cancelled():
+            errors[platform] = RequestException("Запрос к API отменен")
+        elif task.exception() is not None:
+            errors[platform] = task.exception()
+        else:
+            results[platform] = task.result()
+    return results, errors
 
-@cache_page(CACHE_TIMEOUT)
-def get_daily_statistics(request, platform: str) -> Any:
+def parse_count(value: Any) -> int:
     """
-    Получение ежедневной статистики для указанной платформы.
+    Преобразует количество подписчиков из ответа API в число.
     
-    Извлекает и обрабатывает статистические данные за день для заданной
-    социальной платформы. Поддерживает кэширование результатов.
+    API возвращает количество то числом, то строкой с разделителями
+    тысяч (например, "1,234").
     
     Args:
-        request: HTTP запрос
-        platform (str): Название платформы
+        value: Значение из ответа API
         
     Returns:
-        HttpResponse: Отрендеренный шаблон с данными статистики
+        int: Количество подписчиков
         
     Raises:
-        ValidationError: при некорректной платформе
-        RequestException: при ошибках API
+        ValueError: если значение нельзя преобразовать в число
     """
-    try:
-        validate_platform(platform)
-        
-        # URL API для получения ежедневной статистики
-        platform_urls = {
-            "linkedin": f"{API_BASE_URL}/linkedin/daily-stats?profile_id=gamsakhurdiya",
-            "youtube": f"{API_BASE_URL}/youtube/daily-stats?channel_id=UCRhID0powzDpE4D2KuVKGHg",
-            "medium": f"{API_BASE_URL}/medium/daily-stats?username=Eleron",
-            "instagram": f"{API_BASE_URL}/instagram/daily-stats?username=nikog_bim"
-        }
+    if isinstance(value, str):
+        return int(value.replace(',', ''))
+    return int(value)
 
-        url = platform_urls.get(platform)
-        if not url:
-            raise ValidationError(f"Неизвестная платформа: {platform}")
+def _snapshot_to_api_data(snapshot: LatestSnapshot) -> Dict[str, Any]:
+    """
+    Преобразует снимок из локального хранилища в формат ответа /latest.
+    """
+    return {'latest_data': {'count': snapshot.count, 'timestamp': snapshot.upstream_timestamp}}
 
-        data = fetch_api_data(url)
-        daily_stats = data.get('daily_stats', [])
-        
-        if not daily_stats:
-            logger.warning(f"Нет данных для платформы: {platform}")
-            daily_stats = [{'date': 'No data', 'subscribers_count': 'N/A'}]
-
-        # Обработка данных в зависимости от платформы
-        if platform == "linkedin":
-            daily_stats = [
-                {
-                    'date': stat.get('date', 'Unknown'),
-                    'followers_count': int(str(stat.get('followers_count', '0')).replace(',', ''))
-                    if isinstance(stat.get('followers_count'), str) else stat.get('followers_count', 0)
-                }
-                for stat in daily_stats
-            ]
-        elif platform == "youtube":
-            daily_stats = [
-                {
-                    'date': stat.get('date', 'Unknown'),
-                    'subscribers_count': int(stat.get('subscribers_count', 0))
-                    if isinstance(stat.get('subscribers_count'), int)
-                    else int(str(stat.get('subscribers_count', '0')).replace(',', ''))
-                }
-                for stat in daily_stats
-            ]
-        elif platform == "medium":
-            daily_stats = [
-                {
-                    'date': stat.get('date', 'Unknown'),
-                    'followers_count': int(stat.get('followers_count', 0))
-                    if isinstance(stat.get('followers_count'), int)
-                    else int(stat.get('followers_count', '0').replace(',', ''))
-                }
-                for stat in daily_stats
-            ]
-        elif platform == "instagram":
-            daily_stats = [
-                {
-                    'date': stat.get('date', 'Unknown'),
-                    'followers_count': int(stat.get('followers_count', 0))
-                    if isinstance(stat.get('followers_count'), int)
-                    else int(str(stat.get('followers_count', '0')).replace(',', ''))
-                }
-                for stat in daily_stats
-            ]
-
-        # Рассчитываем прогноз
-        predictions = calculate_trend_prediction(daily_stats)
-
-        return render(request, 'subs_manager/daily_statistics.html', {
-            'platform': platform.capitalize(),
-            'daily_stats': daily_stats,
-            'predictions': predictions,
-        })
+def _read_latest_snapshots(profiles: Dict[str, Profile]) -> Dict[str, LatestSnapshot]:
+    """
+    Читает из базы последний снимок каждого из переданных профилей.
+    """
+    snapshots = {}
+    for platform, profile in profiles.items():
+        snapshot = (
+            LatestSnapshot.objects
+            .filter(platform=platform, profile_id=profile.profile_id)
+            .order_by('-fetched_at')
+            .first()
+        )
+        if snapshot is not None:
+            snapshots[platform] = snapshot
+    return snapshots
 
-    except (ValidationError, RequestException, Timeout, ValueError) as e:
-        logger.error(f"Ошибка при получении статистики для {platform}: {str(e)}")
-        return render(request, 'subs_manager/error.html', {
-            'message': _('Ошибка при получении данных: {}').format(str(e))
-        })
+def _split_latest_snapshots(profiles: Dict[str, Profile], snapshots: Dict[str, LatestSnapshot]):
+    """
+    Делит платформы на те, у которых есть свежий снимок, и те, которые нужно запросить у API.
+    
+    Returns:
+        Tuple[Dict, Dict]: (данные из свежих снимков, {платформа: URL} для запроса)
+    """
+    fresh_after = timezone.now() - timedelta(seconds=STORE_MAX_AGE)
+    platforms_data = {
+        platform: _snapshot_to_api_data(snapshot)
+        for platform, snapshot in snapshots.items()
+        if snapshot.fetched_at >= fresh_after
+    }
+    missing = {
+        platform: profile.latest_url
+        for platform, profile in profiles.items()
+        if platform not in platforms_data
+    }
+    return platforms_data, missing
 
-@cache_page(CACHE_TIMEOUT)
-def get_real_time_statistics(request) -> Any:
+def _merge_latest_data(profiles: Dict[str, Profile], platforms_data: Dict[str, Dict[str, Any]],
+                       errors: Dict[str, Exception], snapshots: Dict[str, LatestSnapshot]) -> Dict[str, Dict[str, Any]]:
     """
-    Получение статистики в реальном времени для всех платформ.
+    Собирает итоговые данные платформ со статусом.
     
-    Собирает текущие данные о подписчиках со всех поддерживаемых платформ
-    и отображает их на главной странице.
+    Для платформ, по которым API не ответило вовремя, используется последний
+    сохраненный снимок (статус stale), а если его нет - пустые данные
+    (статус unavailable). Последний успешный ответ, который get_api_data
+    отдал вместо недоступного API, тоже получает статус stale.
+    """
+    result = {}
+    for platform in profiles:
+        if platform in platforms_data:
+            data = dict(platforms_data[platform])
+            status = STATUS_STALE if data.pop(LAST_KNOWN_GOOD_FLAG, False) else STATUS_OK
+            result[platform] = {**data, 'status': status}
+            continue
+        error = errors.get(platform)
+        if platform in snapshots:
+            logger.warning(f"API недоступно для {platform}, используем сохраненные данные: {str(error)}")
+            result[platform] = {**_snapshot_to_api_data(snapshots[platform]), 'status': STATUS_STALE}
+        else:
+            logger.error(f"Нет данных для {platform}: {str(error)}")
+            result[platform] = {'latest_data': {}, 'status': STATUS_UNAVAILABLE}
+    return result
+
+def is_degraded(platforms_data: Dict[str, Dict[str, Any]]) -> bool:
+    """
+    Проверяет, есть ли среди платформ устаревшие или недоступные.
+    """
+    return any(data.get('status', STATUS_OK) != STATUS_OK for data in platforms_data.values())
+
+def read_shared_latest() -> Optional[Snapshot]:
+    """
+    Читает последние данные, опубликованные в общем сегменте памяти.
+    
+    Срок свежести задает писатель: данные из ответов API доверяются
+    SHARED_LATEST_MAX_AGE (мягкий срок кэша ответов API), а данные фонового
+    опроса - SHARED_POLLED_MAX_AGE, до следующего цикла опроса. Устаревшие
+    данные запрашиваются обычным путем, как без сегмента.
     
-    Args:
-        request: HTTP запрос
-        
     Returns:
-        HttpResponse: Отрендеренный шаблон с текущей статистикой
-        
-    Example:
-        При запросе главной страницы отображаются текущие показатели
-        подписчиков для LinkedIn, YouTube, Medium и Instagram.
+        Optional[Snapshot]: Данные в формате ответа update_statistics (JSON в
+            байтах) или None, если ничего не опубликовано или данные устарели
     """
-    try:
-        # Получаем данные для всех платформ
-        platforms_data = {
-            'linkedin': fetch_api_data(f"{API_BASE_URL}/linkedin/latest?profile_id=gamsakhurdiya"),
-            'youtube': fetch_api_data(f"{API_BASE_URL}/youtube/latest?channel_id=UCRhID0powzDpE4D2KuVKGHg"),
-            'medium': fetch_api_data(f"{API_BASE_URL}/medium/latest?username=Eleron"),
-            'instagram': fetch_api_data(f"{API_BASE_URL}/instagram/latest?username=nikog_bim")
-        }
+    snapshot = shared_latest.read()
+    if snapshot is None or not snapshot.is_fresh(SHARED_LATEST_MAX_AGE):
+        return None
+    return snapshot
 
-        # Извлекаем данные
-        stats = {}
-        for platform, data in platforms_data.items():
-            latest_data = data.get('latest_data', {})
-            stats[f'{platform}_count'] = latest_data.get('count', _('Не удалось получить данные'))
-            stats[f'{platform}_timestamp'] = latest_data.get('timestamp', _('Не удалось получить данные'))
+def _shared_latest_data() -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Возвращает данные из общего сегмента памяти в формате load_latest_data.
+    """
+    payload = shared_latest.read_json(max_age=SHARED_LATEST_MAX_AGE)
+    if payload is None:
+        return None
+    return {
+        platform: {
+            'latest_data': {'count': data['count'], 'timestamp': data['timestamp']},
+            'status': data['status'],
+        }
+        for platform, data in payload.items()
+        if platform != 'success'
+    }
 
-        return render(request, 'subs_manager/real_time_statistics.html', stats)
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Преобразует timestamp API (ISO 8601) в секунды; без часового пояса считается UTC.
+    """
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment.timestamp()
 
-    except (RequestException, Timeout, ValueError) as e:
-        logger.error(f"Ошибка при получении статистики в реальном времени: {str(e)}")
-        return render(request, 'subs_manager/error.html', {
-            'message': f'Ошибка при получении данных: {str(e)}'
-        })
+def statistics_validators(platforms_data: Dict[str, Dict[str, Any]]) -> Tuple[str, Optional[float]]:
+    """
+    Рассчитывает ETag и Last-Modified для ответа update_statistics.
+    
+    ETag - хэш количества, timestamp и статуса каждой платформы, поэтому он
+    меняется только вместе с данными и считается без сериализации ответа.
+    Last-Modified - самый поздний timestamp API среди платформ.
+    
+    Args:
+        platforms_data (Dict[str, Dict[str, Any]]): Данные в формате load_latest_data
+    
+    Returns:
+        Tuple[str, Optional[float]]: (ETag без кавычек, время изменения или None)
+    """
+    parts, timestamps = [], []
+    for platform in sorted(platforms_data):
+        data = platforms_data[platform]
+        latest_data = data.get('latest_data', {})
+        parts.append(f"{platform}:{latest_data.get('count')}:{latest_data.get('timestamp')}:{data.get('status', STATUS_OK)}")
+        if 'timestamp' in latest_data:
+            timestamps.append(_parse_timestamp(latest_data['timestamp']))
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    timestamps = [value for value in timestamps if value is not None]
+    return etag, max(timestamps) if timestamps else None
 
-@cache_page(CACHE_TIMEOUT)
-def get_analytics(request) -> Any:
+def conditional_response(request, etag: str, last_modified: Optional[float], make_response) -> HttpResponse:
     """
-    Получение аналитики по всем платформам.
+    Отвечает 304 Not Modified, если у клиента актуальные данные, иначе строит ответ.
     
-    Собирает и анализирует данные о подписчиках со всех платформ,
-    подготавливает статистические показатели для страницы аналитики.
+    make_response вызывается только при изменившихся данных, поэтому
+    актуальному клиенту ответ не формируется вовсе. Cache-Control: no-cache
+    заставляет браузер проверять данные при каждом запросе, а не брать их из
+    своего кэша по эвристике Last-Modified.
     
     Args:
         request: HTTP запрос
-        
+        etag (str): ETag без кавычек
+        last_modified (Optional[float]): Время изменения данных
+        make_response: Функция без аргументов, возвращающая полный ответ
+    
     Returns:
-        HttpResponse: Отрендеренный шаблон с аналитическими данными
+        HttpResponse: Ответ 304 или полный ответ с заголовками ETag и Last-Modified
     """
-    try:
-        # Получаем данные для всех платформ
-        platforms_data = {
-            'linkedin': fetch_api_data(f"{API_BASE_URL}/linkedin/latest?profile_id=gamsakhurdiya"),
-            'youtube': fetch_api_data(f"{API_BASE_URL}/youtube/latest?channel_id=UCRhID0powzDpE4D2KuVKGHg"),
-            'medium': fetch_api_data(f"{API_BASE_URL}/medium/latest?username=Eleron"),
-            'instagram': fetch_api_data(f"{API_BASE_URL}/instagram/latest?username=nikog_bim")
-        }
+    quoted_etag = f'"{etag}"'
+    last_modified = int(last_modified) if last_modified else None
+    response = get_conditional_response(request, etag=quoted_etag, last_modified=last_modified)
+    if response is None:
+        response = make_response()
+    response.headers.setdefault('ETag', quoted_etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, no_cache=True)
+    return response
 
-        # Извлекаем и обрабатываем данные
-        stats = {}
-        for platform, data in platforms_data.items():
-            count = data.get('latest_data', {}).get('count', 0)
-            # Преобразуем строковые значения в числа
-            stats[f'{platform}_count'] = int(str(count).replace(',', '')) if isinstance(count, str) else int(count)
-
-        return render(request, 'subs_manager/analytics.html', stats)
-
-    except (RequestException, Timeout, ValueError) as e:
-        logger.error(f"Ошибка при получении аналитики: {str(e)}")
-        return render(request, 'subs_manager/error.html', {
-            'message': f'Ошибка при получении данных: {str(e)}'
-        })
-
-def update_statistics(request):
+def publish_latest_data(platforms_data: Dict[str, Dict[str, Any]],
+                        max_age: float = SHARED_LATEST_MAX_AGE) -> Optional[int]:
     """
-    Обработчик для обновления статистики через AJAX-запрос.
+    Публикует последние данные в общем сегменте памяти для всех процессов.
     
-    Получает актуальные данные со всех платформ и возвращает их в формате JSON.
-    Используется для асинхронного обновления данных на странице.
+    Публикуются только полные данные: если какая-то платформа устарела или
+    недоступна, процессы продолжают получать данные обычным путем.
     
     Args:
-        request: HTTP запрос
-        
+        platforms_data (Dict[str, Dict[str, Any]]): Данные в формате load_latest_data
+        max_age (float): Сколько секунд читатели доверяют опубликованным данным
+    
     Returns:
-        JsonResponse: Актуальные данные по всем платформам
+        Optional[int]: Номер публикации или None, если данные не опубликованы
+    """
+    if not platforms_data or is_degraded(platforms_data):
+        return None
+    payload = json.dumps(build_statistics_payload(platforms_data), cls=DjangoJSONEncoder)
+    etag, last_modified = statistics_validators(platforms_data)
+    return shared_latest.publish(payload.encode(), etag, last_modified, max_age=max_age)
+
+def publish_stored_latest() -> Optional[int]:
+    """
+    Публикует в общем сегменте памяти свежие снимки основных профилей из базы.
+    
+    Вызывается фоновым опросом после записи новых снимков. Данные
+    доверяются SHARED_POLLED_MAX_AGE: до следующего цикла опроса читатели не
+    обращаются ни к базе, ни к API.
+    
+    Returns:
+        Optional[int]: Номер публикации или None, если свежих снимков нет по всем платформам
+    """
+    profiles = get_primary_profiles()
+    snapshots = _read_latest_snapshots(profiles)
+    platforms_data, missing = _split_latest_snapshots(profiles, snapshots)
+    if missing:
+        return None
+    return publish_latest_data(_merge_latest_data(profiles, platforms_data, {}, snapshots), SHARED_POLLED_MAX_AGE)
+
+def load_latest_data(deadline: float = PAGE_DEADLINE) -> Dict[str, Dict[str, Any]]:
+    """
+    Получение последних данных основных профилей всех платформ из локального хранилища.
+    
+    Свежие снимки (не старше STORE_MAX_AGE), записанные фоновым опросом,
+    отдаются без обращения к API. Для остальных платформ данные запрашиваются
+    у API параллельно, но не дольше deadline секунд на все платформы вместе.
+    Если платформа не ответила вовремя, используется последний сохраненный
+    снимок, а если его нет, платформа помечается недоступной. Поэтому время
+    ответа страницы ограничено, как бы ни вело себя API одной платформы.
+    
+    Если фоновый опрос или другой процесс опубликовал данные в общем
+    сегменте памяти (см. shared_snapshot) и их срок свежести не истек, они
+    берутся оттуда без обращения к базе и API.
+    
+    Args:
+        deadline (float): Общий срок ожидания ответов API в секундах
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Словарь вида
+            {платформа: {'latest_data': {...}, 'status': 'ok' | 'stale' | 'unavailable'}}
+    """
+    shared = _shared_latest_data()
+    if shared is not None:
+        return shared
+
+    started = time.monotonic()
+    profiles = get_primary_profiles()
+    snapshots = _read_latest_snapshots(profiles)
+    platforms_data, missing = _split_latest_snapshots(profiles, snapshots)
+    errors = {}
+    if missing:
+        fetched, errors = fetch_platforms_data_partial(missing, deadline - (time.monotonic() - started))
+        platforms_data.update(fetched)
+
+    result = _merge_latest_data(profiles, platforms_data, errors, snapshots)
+    if missing:
+        # Данные получены от API: делимся ими с остальными процессами
+        publish_latest_data(result)
+    return result
+
+async def aload_latest_data(deadline: float = PAGE_DEADLINE) -> Dict[str, Dict[str, Any]]:
+    """
+    Асинхронный вариант load_latest_data для async-представлений.
+    
+    Args:
+        deadline (float): Общий срок ожидания ответов API в секундах
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Словарь вида
+            {платформа: {'latest_data': {...}, 'status': 'ok' | 'stale' | 'unavailable'}}
+    """
+    shared = _shared_latest_data()
+    if shared is not None:
+        return shared
+
+    started = time.monotonic()
+    profiles = await sync_to_async(get_primary_profiles)()
+    snapshots = await sync_to_async(_read_latest_snapshots)(profiles)
+    platforms_data, missing = _split_latest_snapshots(profiles, snapshots)
+    errors = {}
+    if missing:
+        fetched, errors = await afetch_platforms_data_partial(missing, deadline - (time.monotonic() - started))
+        platforms_data.update(fetched)
+
+    result = _merge_latest_data(profiles, platforms_data, errors, snapshots)
+    if missing:
+        publish_latest_data(result)
+    return result
+
+def _read_daily_stats(profile: Profile) -> DailySeries:
+    """
+    Читает ежедневную статистику профиля из базы в колоночном виде.
+    """
+    rows = (
+        DailyStat.objects
+        .filter(platform=profile.platform, profile_id=profile.profile_id)
+        .order_by('date')
+        .values_list('date', 'count')
+    )
+    return DailySeries.from_rows(rows)
+
+def _is_daily_state_fresh(state: Optional[SyncState]) -> bool:
+    """
+    Проверяет, синхронизирована ли статистика не позднее STORE_MAX_AGE назад.
+    """
+    fresh_after = timezone.now() - timedelta(seconds=STORE_MAX_AGE)
+    return state is not None and state.daily_synced_at is not None and state.daily_synced_at >= fresh_after
+
+def _daily_sync_done(profile: Profile) -> Optional[int]:
+    """
+    Проверка для single_flight: синхронизировал ли профиль другой процесс.
+
+    Returns:
+        Optional[int]: 0 (новых дней не загружено), если статистика уже свежая, иначе None
+    """
+    state = SyncState.objects.filter(platform=profile.platform, profile_id=profile.profile_id).first()
+    return 0 if _is_daily_state_fresh(state) else None
+
+def ensure_daily_stats(profile: Profile) -> None:
+    """
+    Синхронизирует ежедневную статистику профиля с API, если она устарела.
+    
+    Если статистика синхронизирована не позднее STORE_MAX_AGE назад, API не
+    запрашивается. Иначе из API инкрементально догружаются только новые
+    дни, а при недоступности API остаются последние сохраненные данные.
+    
+    Args:
+        profile (Profile): Профиль из реестра
+        
+    Raises:
+        RequestException: при ошибках сети, если сохраненных данных нет
+        ValueError: при некорректном ответе, если сохраненных данных нет
+    """
+    state = SyncState.objects.filter(platform=profile.platform, profile_id=profile.profile_id).first()
+    if _is_daily_state_fresh(state):
+        return
+
+    # Импорт внутри функции: модуль ingestion сам импортирует views
+    from .ingestion import sync_daily_stats
+
+    try:
+        # Догружаем только новые дни; одновременные запросы синхронизируют профиль один раз
+        single_flight(
+            f"daily-sync:{profile.key}", lambda: sync_daily_stats(profile),
+            check=lambda: _daily_sync_done(profile),
+        )
+    except (RequestException, ValueError) as e:
+        if state is None or state.daily_synced_at is None:
+            raise
+        logger.warning(f"API недоступно, используем сохраненную статистику для {profile.key}: {str(e)}")
+
+def load_daily_stats(profile: Profile) -> DailySeries:
+    """
+    Получение ежедневной статистики профиля из локального хранилища.
+    
+    Устаревшая статистика сначала синхронизируется с API (см. ensure_daily_stats).
+    
+    Args:
+        profile (Profile): Профиль из реестра
+        
+    Returns:
+        DailySeries: Даты и количества подписчиков по возрастанию даты
+        
+    Raises:
+        RequestException: при ошибках сети, если сохраненных данных нет
+        ValueError: при некорректном ответе, если сохраненных данных нет
+    """
+    ensure_daily_stats(profile)
+    return _read_daily_stats(profile)
+
+async def aensure_daily_stats(profile: Profile) -> None:
+    """
+    Асинхронный вариант ensure_daily_stats для async-представлений.
+    
+    Raises:
+        RequestException: при ошибках сети, если сохраненных данных нет
+        ValueError: при некорректном ответе, если сохраненных данных нет
+    """
+    state = await SyncState.objects.filter(platform=profile.platform, profile_id=profile.profile_id).afirst()
+    if _is_daily_state_fresh(state):
+        return
+
+    # Импорт внутри функции: модуль ingestion сам импортирует views
+    from .ingestion import async_sync_daily_stats
+
+    try:
+        await async_single_flight(
+            f"daily-sync:{profile.key}", lambda: async_sync_daily_stats(profile),
+            check=sync_to_async(lambda: _daily_sync_done(profile)),
+        )
+    except (RequestException, ValueError) as e:
+        if state is None or state.daily_synced_at is None:
+            raise
+        logger.warning(f"API недоступно, используем сохраненную статистику для {profile.key}: {str(e)}")
+
+async def aload_daily_stats(profile: Profile) -> DailySeries:
+    """
+    Асинхронный вариант load_daily_stats для async-представлений.
+    
+    Args:
+        profile (Profile): Профиль из реестра
+        
+    Returns:
+        DailySeries: Даты и количества подписчиков по возрастанию даты
+        
+    Raises:
+        RequestException: при ошибках сети, если сохраненных данных нет
+        ValueError: при некорректном ответе, если сохраненных данных нет
+    """
+    await aensure_daily_stats(profile)
+    return await sync_to_async(_read_daily_stats)(profile)
+
+def read_daily_range(profile: Profile, granularity: str = 'day', start: Optional[date] = None,
+                     end: Optional[date] = None) -> DailySeries:
+    """
+    Читает статистику профиля за диапазон дат с нужной гранулярностью.
+    
+    Дни читаются из DailyStat, недели и месяцы - из предрассчитанных
+    сверток StatRollup. Оба запроса идут по уникальному индексу, поэтому
+    время ответа пропорционально количеству возвращаемых точек, а не
+    длине всей истории.
+    
+    Args:
+        profile (Profile): Профиль из реестра
+        granularity (str): 'day', 'week' или 'month'
+        start (Optional[date]): Первый день диапазона (None - с начала истории)
+        end (Optional[date]): Последний день диапазона (None - до конца истории)
+    
+    Returns:
+        DailySeries: Для недель и месяцев - последний день периода с данными
+            и количество подписчиков на этот день
+    """
+    if granularity == 'day':
+        rows = DailyStat.objects.filter(platform=profile.platform, profile_id=profile.profile_id)
+        if start is not None:
+            rows = rows.filter(date__gte=start)
+        if end is not None:
+            rows = rows.filter(date__lte=end)
+        return DailySeries.from_rows(rows.order_by('date').values_list('date', 'count'))
+
+    rows = StatRollup.objects.filter(platform=profile.platform, profile_id=profile.profile_id, granularity=granularity)
+    if start is not None:
+        # Период, в который попадает start, включается целиком
+        first_period = period_starts(np.array([start], dtype='datetime64[D]'), granularity)[0]
+        rows = rows.filter(period_start__gte=first_period.astype(object))
+    if end is not None:
+        rows = rows.filter(period_start__lte=end)
+    return DailySeries.from_rows(rows.order_by('period_start').values_list('date', 'count'))
+
+def _read_recent_daily_stats(profile: Profile) -> DailySeries:
+    """
+    Читает последние FORECAST_WINDOW дней статистики профиля (окно прогноза).
+    """
+    rows = (
+        DailyStat.objects
+        .filter(platform=profile.platform, profile_id=profile.profile_id)
+        .order_by('-date')
+        .values_list('date', 'count')[:FORECAST_WINDOW]
+    )
+    return DailySeries.from_rows(reversed(list(rows)))
+
+def validate_platform(platform: str) -> None:
+    """
+    Проверяет корректность названия платформы.
+    
+    Args:
+        platform (str): Название платформы для проверки
+        
+    Raises:
+        ValidationError: если платформа не входит в список поддерживаемых
+    """
+    if platform.lower() not in PLATFORMS:
+        raise ValidationError(_(f"Недопустимая платформа: {platform}"))
+
+def validate_profile_id(platform: str, profile_id: str) -> None:
+    """
+    Проверяет корректность ID профиля для каждой платформы.
+    
+    Args:
+        platform (str): Название платформы
+        profile_id (str): ID профиля для проверки
+        
+    Raises:
+        ValidationError: если ID профиля некорректен
+    """
+    if not profile_id or not isinstance(profile_id, str):
+        raise ValidationError(_(f"Некорректный ID профиля для {platform}"))
+
+def calculate_trend_prediction(daily_stats: list, days_ahead: int = 2) -> list:
+    """
+    Рассчитывает прогноз на основе комбинации методов:
+    1. Полиномиальная регрессия 2-й степени для определения тренда
+    2. Экспоненциальное сглаживание для учета последних изменений
+    
+    Принимает статистику в виде списка словарей; расчет выполняет
+    calculate_series_prediction.
+    
+    Args:
+        daily_stats: список словарей с данными за последние дни
+        days_ahead: на сколько дней вперед делать прогноз
+        
+    Returns:
+        list: список предсказанных значений с датами
+    """
+    if len(daily_stats) < 5:  # Нужно минимум 5 точек для надежного прогноза
+        return []
+        
+    # Берем только последние 30 дней для прогноза
+    recent_stats = daily_stats[-30:] if len(daily_stats) > 30 else daily_stats
+    series = DailySeries(
+        np.array([stat['date'] for stat in recent_stats], dtype='datetime64[D]'),
+        np.array(
+            [stat.get('followers_count', stat.get('subscribers_count', 0)) for stat in recent_stats],
+            dtype=np.int64,
+        ),
+    )
+    return calculate_series_prediction(series, days_ahead)
+
+def calculate_series_prediction(series: DailySeries, days_ahead: int = 2) -> list:
+    """
+    Рассчитывает прогноз по колоночному ряду (см. calculate_trend_prediction).
+    
+    Расчет выполняет пакетный forecast_series_batch, который считает сразу
+    много рядов; здесь он вызывается для одного. Результат кэшируется по
+    отпечатку окна, поэтому повторные рендеры не пересчитывают регрессию.
+    
+    Args:
+        series: ежедневная статистика в колоночном виде
+        days_ahead: на сколько дней вперед делать прогноз
+        
+    Returns:
+        list: список предсказанных значений с датами
+    """
+    return cached_forecast_series_batch([series], days_ahead)[0]
+
+def _load_predictions(profile: Profile, series: DailySeries, days_ahead: int = 2) -> list:
+    """
+    Возвращает прогноз, рассчитанный онлайн при синхронизации статистики.
+
+    Если сохраненный прогноз построен по тому же последнему дню, что и ряд,
+    он используется без пересчета; иначе прогноз считается по ряду.
+    """
+    if len(series):
+        stored = (
+            ForecastState.objects
+            .filter(platform=profile.platform, profile_id=profile.profile_id, last_date=series.dates[-1].astype(object))
+            .values_list('predictions', flat=True)
+            .first()
+        )
+        if stored is not None and len(stored) == days_ahead:
+            return stored
+    return calculate_series_prediction(series, days_ahead)
+
+def _render_daily_statistics(request, profile: Profile) -> Any:
+    """
+    Рендерит страницу ежедневной статистики профиля.
+    
+    Общая часть get_daily_statistics и aget_daily_statistics. Страница не
+    содержит данных: график загружает их с get_daily_series, поэтому
+    страница не зависит от длины истории и кэшируется надолго.
+    """
+    response = render(request, 'subs_manager/daily_statistics.html', {
+        'platform': profile.platform.capitalize(),
+        'series_url': reverse('get_daily_series', kwargs={'platform': profile.platform}),
+        'series_points_step': SERIES_POINTS_STEP,
+        'series_max_points': SERIES_MAX_POINTS,
+    })
+    # cache_page(None) и warm_cache берут время жизни страницы в кэше из max-age
+    patch_cache_control(response, max_age=DAILY_PAGE_CACHE_TIMEOUT)
+    return response
+
+def _parse_date_param(request, name: str) -> Optional[date]:
+    """
+    Читает дату в формате YYYY-MM-DD из параметра запроса.
+    """
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Некорректная дата в параметре {name}: {value}")
+
+def parse_series_params(request) -> Tuple[str, int, Optional[date], Optional[date]]:
+    """
+    Читает параметры запроса get_daily_series.
+    
+    Количество точек ограничивается SERIES_MAX_POINTS и округляется вверх
+    до SERIES_POINTS_STEP: ответы кэшируются по URL, и так число вариантов
+    в кэше остается небольшим, какой бы ширины ни был экран (запросы с
+    другим значением перенаправляются, см. _canonical_series_redirect).
+    
+    Args:
+        request: HTTP запрос с параметрами granularity (day, week, month),
+            points, from и to (даты YYYY-MM-DD включительно)
+    
+    Returns:
+        Tuple[str, int, Optional[date], Optional[date]]:
+            (гранулярность, максимальное количество точек, начало, конец диапазона)
+    
+    Raises:
+        ValueError: при некорректных параметрах
+    """
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Неизвестная гранулярность: {granularity}")
+    try:
+        points = int(request.GET.get('points', SERIES_MAX_POINTS))
+    except ValueError:
+        raise ValueError(f"Некорректное количество точек: {request.GET['points']}")
+    points = -(-points // SERIES_POINTS_STEP) * SERIES_POINTS_STEP
+    start, end = _parse_date_param(request, 'from'), _parse_date_param(request, 'to')
+    if start is not None and end is not None and start > end:
+        raise ValueError(f"Начало диапазона позже конца: {start} > {end}")
+    return granularity, min(SERIES_MAX_POINTS, max(SERIES_POINTS_STEP, points)), start, end
+
+def _canonical_series_redirect(request, points: int) -> Optional[HttpResponsePermanentRedirect]:
+    """
+    Перенаправляет запрос с неокругленным points на URL с округленным значением.
+    
+    Страница кэшируется по полному URL, поэтому без перенаправления каждое
+    значение points занимало бы в кэше отдельную запись. Ответы 301 в кэш
+    страниц не попадают.
+    
+    Returns:
+        Optional[HttpResponsePermanentRedirect]: Перенаправление или None, если URL уже канонический
+    """
+    if 'points' not in request.GET or request.GET['points'] == str(points):
+        return None
+    query = request.GET.copy()
+    query['points'] = str(points)
+    return HttpResponsePermanentRedirect(f"{request.path}?{query.urlencode()}")
+
+def _render_daily_series(profile: Profile, series: DailySeries, predictions: list, granularity: str = 'day',
+                         points: int = SERIES_MAX_POINTS) -> HttpResponse:
+    """
+    Формирует JSON-ответ с ежедневной статистикой профиля и прогнозом.
+    
+    Ряд прореживается до points точек.
+    """
+    if not len(series):
+        logger.warning(f"Нет данных для профиля: {profile.key}")
+
+    shown = series.downsample(points)
+    response = fast_json_response({
+        'platform': profile.platform,
+        'granularity': granularity,
+        **shown.delta_encode(),
+        'predictions': predictions,
+    })
+
+    # Валидаторы по данным: ConditionalGetMiddleware отвечает 304,
+    # пока статистика и прогноз не изменились (и для ответов из кэша)
+    digest = hashlib.sha1(f"{granularity}:{shown.date_strings()}:{predictions}".encode('utf-8'))
+    digest.update(shown.counts.tobytes())
+    response.headers['ETag'] = f'"{digest.hexdigest()}"'
+    # cache_page(None) и warm_cache берут время жизни ответа в кэше из max-age
+    patch_cache_control(response, max_age=CACHE_TIMEOUT)
+    if len(series):
+        last_day = datetime.combine(series.dates[-1].astype(object), datetime.min.time(), dt_timezone.utc)
+        response.headers['Last-Modified'] = http_date(last_day.timestamp())
+    return response
+
+def _daily_series_response(profile: Profile, granularity: str, points: int, start: Optional[date],
+                           end: Optional[date]) -> HttpResponse:
+    """
+    Читает статистику за диапазон и прогноз и формирует ответ get_daily_series.
+    
+    Общая часть get_daily_series и aget_daily_series. Прогноз строится по
+    последним дням истории и показывается, только если диапазон доходит до
+    последнего известного дня.
+    """
+    series = read_daily_range(profile, granularity, start, end)
+    recent = _read_recent_daily_stats(profile)
+    predictions = []
+    if len(recent) and (end is None or end >= recent.dates[-1].astype(object)):
+        # Берем прогноз, рассчитанный при синхронизации, или считаем его
+        predictions = _load_predictions(profile, recent)
+    return _render_daily_series(profile, series, predictions, granularity, points)
+
+@cache_page(None)  # время жизни задает max-age ответа
+def get_daily_statistics(request, platform: str) -> Any:
+    """
+    Получение страницы ежедневной статистики для указанной платформы.
+    
+    Данные графика загружаются отдельным запросом к get_daily_series,
+    поэтому страница кэшируется на DAILY_PAGE_CACHE_TIMEOUT.
+    
+    Args:
+        request: HTTP запрос
+        platform (str): Название платформы
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон страницы статистики
+        
+    Raises:
+        ValidationError: при некорректной платформе
+    """
+    try:
+        validate_platform(platform)
+        
+        profile = get_primary_profile(platform)
+        if profile is None:
+            raise ValidationError(f"Неизвестная платформа: {platform}")
+
+        return _render_daily_statistics(request, profile)
+
+    except (ValidationError, ValueError) as e:
+        logger.error(f"Ошибка при получении статистики для {platform}: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': _('Ошибка при получении данных: {}').format(str(e))
+        })
+
+def _series_error_response(platform: str, error: Exception) -> JsonResponse:
+    """
+    Формирует JSON-ответ об ошибке получения ежедневной статистики.
+    """
+    logger.error(f"Ошибка при получении статистики для {platform}: {str(error)}")
+    status = 400 if isinstance(error, (ValidationError, ValueError)) else 503
+    return JsonResponse({'success': False, 'error': str(error)}, status=status)
+
+@gzip_page
+@cache_page(None)  # время жизни задает max-age ответа
+def get_daily_series(request, platform: str) -> HttpResponse:
+    """
+    Ежедневная статистика платформы в компактном JSON для графика.
+    
+    Ряды передаются колонками с разностным кодированием (см.
+    DailySeries.delta_encode) и сжимаются gzip. В кэше хранится
+    несжатый ответ, поэтому ключ кэша не зависит от Accept-Encoding.
+    
+    Параметры from и to ограничивают диапазон дат, а granularity выбирает
+    дни или предрассчитанные свертки по неделям или месяцам (см.
+    read_daily_range). Результат прореживается методом LTTB до points
+    точек (обычно ширина графика в пикселях), поэтому размер ответа и время
+    отрисовки не растут с длиной истории.
+    
+    Args:
+        request: HTTP запрос с параметрами granularity, points, from и to (см. parse_series_params)
+        platform (str): Название платформы
+        
+    Returns:
+        HttpResponse: JSON вида
+            {'platform': 'youtube', 'granularity': 'day', 'start_date': '2024-01-01',
+             'date_deltas': [1, 1], 'start_count': 1000, 'count_deltas': [3, 5], 'predictions': [...]}
+    """
+    try:
+        validate_platform(platform)
+        
+        profile = get_primary_profile(platform)
+        if profile is None:
+            raise ValidationError(f"Неизвестная платформа: {platform}")
+
+        params = parse_series_params(request)
+        redirect = _canonical_series_redirect(request, params[1])
+        if redirect is not None:
+            return redirect
+        ensure_daily_stats(profile)
+        return _daily_series_response(profile, *params)
+
+    except (ValidationError, RequestException, Timeout, ValueError) as e:
+        return _series_error_response(platform, e)
+
+def _render_real_time_statistics(request, platforms_data: Dict[str, Dict[str, Any]]) -> Any:
+    """
+    Рендерит главную страницу по данным /latest всех платформ.
+    
+    Общая часть get_real_time_statistics и aget_real_time_statistics.
+    """
+    # Извлекаем данные
+    stats = {}
+    for platform, data in platforms_data.items():
+        latest_data = data.get('latest_data', {})
+        stats[f'{platform}_count'] = latest_data.get('count', _('Не удалось получить данные'))
+        stats[f'{platform}_timestamp'] = latest_data.get('timestamp', _('Не удалось получить данные'))
+        stats[f'{platform}_status'] = data.get('status', STATUS_OK)
+
+    response = render(request, 'subs_manager/real_time_statistics.html', stats)
+    # Неполную страницу кэшируем ненадолго, чтобы быстрее показать свежие данные.
+    # cache_page(None) берет время жизни страницы в кэше из max-age
+    patch_cache_control(response, max_age=DEGRADED_CACHE_TIMEOUT if is_degraded(platforms_data) else CACHE_TIMEOUT)
+    return response
+
+@cache_page(None)  # время жизни задает max-age ответа
+def get_real_time_statistics(request) -> Any:
+    """
+    Получение статистики в реальном времени для всех платформ.
+    
+    Собирает текущие данные о подписчиках со всех поддерживаемых платформ
+    и отображает их на главной странице.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон с текущей статистикой
+        
+    Example:
+        При запросе главной страницы отображаются текущие показатели
+        подписчиков для LinkedIn, YouTube, Medium и Instagram.
+    """
+    try:
+        # Получаем данные для всех платформ
+        platforms_data = load_latest_data()
+
+        return _render_real_time_statistics(request, platforms_data)
+
+    except (RequestException, Timeout, ValueError) as e:
+        logger.error(f"Ошибка при получении статистики в реальном времени: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': f'Ошибка при получении данных: {str(e)}'
+        })
+
+def _render_analytics(request, platforms_data: Dict[str, Dict[str, Any]]) -> Any:
+    """
+    Рендерит страницу аналитики по данным /latest всех платформ.
+    
+    Общая часть get_analytics и aget_analytics.
+    """
+    # Извлекаем и обрабатываем данные
+    stats = {}
+    for platform, data in platforms_data.items():
+        count = data.get('latest_data', {}).get('count', 0)
+        # Преобразуем строковые значения в числа
+        stats[f'{platform}_count'] = int(str(count).replace(',', '')) if isinstance(count, str) else int(count)
+        stats[f'{platform}_status'] = data.get('status', STATUS_OK)
+
+    response = render(request, 'subs_manager/analytics.html', stats)
+    # Неполную страницу кэшируем ненадолго, чтобы быстрее показать свежие данные.
+    # cache_page(None) берет время жизни страницы в кэше из max-age
+    patch_cache_control(response, max_age=DEGRADED_CACHE_TIMEOUT if is_degraded(platforms_data) else CACHE_TIMEOUT)
+    return response
+
+@cache_page(None)  # время жизни задает max-age ответа
+def get_analytics(request) -> Any:
+    """
+    Получение аналитики по всем платформам.
+    
+    Собирает и анализирует данные о подписчиках со всех платформ,
+    подготавливает статистические показатели для страницы аналитики.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон с аналитическими данными
+    """
+    try:
+        # Получаем данные для всех платформ
+        platforms_data = load_latest_data()
+
+        return _render_analytics(request, platforms_data)
+
+    except (RequestException, Timeout, ValueError) as e:
+        logger.error(f"Ошибка при получении аналитики: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': f'Ошибка при получении данных: {str(e)}'
+        })
+
+def build_statistics_payload(platforms_data: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Формирует ответ с текущими данными по всем платформам.
+    
+    Используется обработчиком update_statistics и потоком stream_statistics,
+    чтобы оба отдавали данные в одном формате.
+    
+    Args:
+        platforms_data (Dict[str, Dict[str, Any]]): Данные в формате /latest по платформам
+        
+    Returns:
+        Dict[str, Any]: Данные вида
+            {'success': True, 'linkedin': {'count': ..., 'timestamp': ..., 'status': 'ok'}, ...}.
+            Для недоступной платформы count и timestamp равны None.
+    """
+    # Формируем ответ
+    response_data = {
+        'success': True
+    }
+
+    # Добавляем данные по каждой платформе
+    for platform, data in platforms_data.items():
+        latest_data = data.get('latest_data', {})
+        status = data.get('status', STATUS_OK)
+        if status == STATUS_UNAVAILABLE:
+            response_data[platform] = {'count': None, 'timestamp': None, 'status': status}
+            continue
+        response_data[platform] = {
+            'count': latest_data.get('count', 0),
+            'timestamp': latest_data.get('timestamp', timezone.now().isoformat()),
+            'status': status,
+        }
+
+    return response_data
+
+def update_statistics(request):
+    """
+    Обработчик для обновления статистики через AJAX-запрос.
+    
+    Получает актуальные данные со всех платформ и возвращает их в формате JSON.
+    Используется для асинхронного обновления данных на странице.
+    Платформы, API которых не ответило за PAGE_DEADLINE, возвращаются со
+    статусом stale (последний сохраненный снимок) или unavailable.
+    Свежие данные из общего сегмента памяти отдаются как есть, без
+    разбора и повторной сериализации JSON. Ответ содержит ETag и
+    Last-Modified; если данные у клиента актуальны, возвращается 304 без
+    формирования тела.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        JsonResponse: Актуальные данные по всем платформам
         
     Example:
         Ответ содержит структуру вида:
         {
             'success': True,
-            'linkedin': {'count': 1234, 'timestamp': '2024-04-24T08:59:00Z'},
-            'youtube': {'count': 5678, 'timestamp': '2024-04-24T08:59:00Z'},
+            'linkedin': {'count': 1234, 'timestamp': '2024-04-24T08:59:00Z', 'status': 'ok'},
+            'youtube': {'count': 5678, 'timestamp': '2024-04-20T10:00:00Z', 'status': 'stale'},
             ...
         }
     """
     try:
+        shared = read_shared_latest()
+        if shared is not None:
+            return conditional_response(
+                request, shared.etag, shared.last_modified,
+                lambda: HttpResponse(shared.payload, content_type='application/json'),
+            )
+
         # Получаем данные для всех платформ
-        platforms_data = {
-            'linkedin': fetch_api_data(f"{API_BASE_URL}/linkedin/latest?profile_id=gamsakhurdiya"),
-            'youtube': fetch_api_data(f"{API_BASE_URL}/youtube/latest?channel_id=UCRhID0powzDpE4D2KuVKGHg"),
-            'medium': fetch_api_data(f"{API_BASE_URL}/medium/latest?username=Eleron"),
-            'instagram': fetch_api_data(f"{API_BASE_URL}/instagram/latest?username=nikog_bim")
-        }
+        platforms_data = load_latest_data()
 
-        # Формируем ответ
-        response_data = {
-            'success': True
-        }
+        etag, last_modified = statistics_validators(platforms_data)
+        return conditional_response(
+            request, etag, last_modified, lambda: JsonResponse(build_statistics_payload(platforms_data)),
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка при обновлении статистики: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+@async_cache_page(None)  # время жизни задает max-age ответа
+async def aget_daily_statistics(request, platform: str) -> Any:
+    """
+    Асинхронный вариант get_daily_statistics для запуска под ASGI.
+    
+    Args:
+        request: HTTP запрос
+        platform (str): Название платформы
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон страницы статистики
+    """
+    try:
+        validate_platform(platform)
+        
+        profile = await sync_to_async(get_primary_profile)(platform)
+        if profile is None:
+            raise ValidationError(f"Неизвестная платформа: {platform}")
+
+        return await sync_to_async(_render_daily_statistics)(request, profile)
+
+    except (ValidationError, ValueError) as e:
+        logger.error(f"Ошибка при получении статистики для {platform}: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': _('Ошибка при получении данных: {}').format(str(e))
+        })
+
+@gzip_page
+@async_cache_page(None)  # время жизни задает max-age ответа
+async def aget_daily_series(request, platform: str) -> HttpResponse:
+    """
+    Асинхронный вариант get_daily_series для запуска под ASGI.
+    
+    Пока идет запрос к API, поток не блокируется, поэтому один процесс
+    может одновременно обслуживать тысячи медленных запросов.
+    
+    Args:
+        request: HTTP запрос
+        platform (str): Название платформы
+        
+    Returns:
+        HttpResponse: JSON с ежедневной статистикой (см. get_daily_series)
+    """
+    try:
+        validate_platform(platform)
+        
+        profile = await sync_to_async(get_primary_profile)(platform)
+        if profile is None:
+            raise ValidationError(f"Неизвестная платформа: {platform}")
+
+        params = parse_series_params(request)
+        redirect = _canonical_series_redirect(request, params[1])
+        if redirect is not None:
+            return redirect
+        await aensure_daily_stats(profile)
+        return await sync_to_async(_daily_series_response)(profile, *params)
+
+    except (ValidationError, RequestException, Timeout, ValueError) as e:
+        return _series_error_response(platform, e)
+
+@async_cache_page(None)  # время жизни задает max-age ответа
+async def aget_real_time_statistics(request) -> Any:
+    """
+    Асинхронный вариант get_real_time_statistics для запуска под ASGI.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон с текущей статистикой
+    """
+    try:
+        # Получаем данные для всех платформ
+        platforms_data = await aload_latest_data()
+
+        return await sync_to_async(_render_real_time_statistics)(request, platforms_data)
+
+    except (RequestException, Timeout, ValueError) as e:
+        logger.error(f"Ошибка при получении статистики в реальном времени: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': f'Ошибка при получении данных: {str(e)}'
+        })
+
+@async_cache_page(None)  # время жизни задает max-age ответа
+async def aget_analytics(request) -> Any:
+    """
+    Асинхронный вариант get_analytics для запуска под ASGI.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        HttpResponse: Отрендеренный шаблон с аналитическими данными
+    """
+    try:
+        # Получаем данные для всех платформ
+        platforms_data = await aload_latest_data()
+
+        return await sync_to_async(_render_analytics)(request, platforms_data)
+
+    except (RequestException, Timeout, ValueError) as e:
+        logger.error(f"Ошибка при получении аналитики: {str(e)}")
+        return render(request, 'subs_manager/error.html', {
+            'message': f'Ошибка при получении данных: {str(e)}'
+        })
+
+async def aupdate_statistics(request):
+    """
+    Асинхронный вариант update_statistics для запуска под ASGI.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        JsonResponse: Актуальные данные по всем платформам
+    """
+    try:
+        shared = read_shared_latest()
+        if shared is not None:
+            return conditional_response(
+                request, shared.etag, shared.last_modified,
+                lambda: HttpResponse(shared.payload, content_type='application/json'),
+            )
 
-        # Добавляем данные по каждой платформе
-        for platform, data in platforms_data.items():
-            latest_data = data.get('latest_data', {})
-            response_data[platform] = {
-                'count': latest_data.get('count', 0),
-                'timestamp': latest_data.get('timestamp', timezone.now().isoformat())
-            }
+        # Получаем данные для всех платформ
+        platforms_data = await aload_latest_data()
 
-        return JsonResponse(response_data)
+        etag, last_modified = statistics_validators(platforms_data)
+        return conditional_response(
+            request, etag, last_modified, lambda: JsonResponse(build_statistics_payload(platforms_data)),
+        )
 
     except Exception as e:
         logger.error(f"Ошибка при обновлении статистики: {str(e)}")
@@ -436,3 +1749,291 @@ def update_statistics(request):
             'success': False,
             'error': str(e)
         }, status=500)
+
+@ops_endpoint
+def http_pool_stats(request):
+    """
+    Обработчик для просмотра статистики пула HTTP-соединений.
+    
+    Показывает, сколько соединений открыто к каждому хосту API и какая
+    доля запросов переиспользовала уже открытое соединение.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        JsonResponse: Статистика пула соединений текущего процесса
+    """
+    return JsonResponse(get_pool_stats())
+
+@ops_endpoint
+def circuit_status(request):
+    """
+    Обработчик для просмотра состояния выключателей конечных точек API.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        JsonResponse: Состояние выключателей вида
+            {'host/linkedin/latest': {'state': 'closed', 'failures': 0, 'retry_in': 0}, ...}
+    """
+    endpoints = sorted({
+        endpoint_for(url)
+        for profile in get_profiles()
+        for url in (profile.latest_url, profile.daily_stats_url)
+    })
+    return JsonResponse(get_circuit_states(endpoints))
+
+def parse_export_params(request) -> Tuple[str, List[Profile], Optional[date], Optional[date]]:
+    """
+    Читает параметры запроса export_statistics.
+    
+    Args:
+        request: HTTP запрос с параметрами format (csv или ndjson), platform,
+            profile_id, from и to (даты YYYY-MM-DD включительно)
+    
+    Returns:
+        Tuple[str, List[Profile], Optional[date], Optional[date]]:
+            (формат, выгружаемые профили, начало, конец диапазона)
+    
+    Raises:
+        ValidationError: при некорректной платформе, пустом или неизвестном профиле
+        ValueError: при некорректных параметрах
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ValueError(f"Неизвестный формат выгрузки: {export_format}")
+
+    profiles = get_profiles()
+    platform = request.GET.get('platform')
+    if platform:
+        validate_platform(platform)
+        profiles = [profile for profile in profiles if profile.platform == platform]
+    profile_id = request.GET.get('profile_id')
+    if profile_id is not None:
+        if not platform:
+            raise ValueError("Параметр profile_id указывается вместе с platform")
+        validate_profile_id(platform, profile_id)
+        profile = get_profile(platform, profile_id)
+        if profile is None:
+            raise ValidationError(f"Неизвестный профиль: {platform}/{profile_id}")
+        profiles = [profile]
+
+    start, end = _parse_date_param(request, 'from'), _parse_date_param(request, 'to')
+    if start is not None and end is not None and start > end:
+        raise ValueError(f"Начало диапазона позже конца: {start} > {end}")
+    return export_format, profiles, start, end
+
+def _export_rows(profile: Profile, start: Optional[date], end: Optional[date]):
+    """
+    Запрос строк ежедневной статистики профиля для выгрузки (дата, количество).
+    """
+    rows = DailyStat.objects.filter(platform=profile.platform, profile_id=profile.profile_id)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+    return rows.order_by('date').values_list('date', 'count')
+
+class _EchoBuffer:
+    """
+    Псевдофайл для csv.writer: строка не записывается, а возвращается.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+def _export_row_formatter(export_format: str):
+    """
+    Возвращает функцию, которая форматирует строку выгрузки в CSV или NDJSON.
+    """
+    if export_format == 'ndjson':
+        def format_row(profile: Profile, day: date, count: int) -> str:
+            return json.dumps({
+                'platform': profile.platform, 'profile_id': profile.profile_id,
+                'date': day.isoformat(), 'count': count,
+            }) + '\n'
+        return format_row
+
+    writer = csv.writer(_EchoBuffer())
+    def format_row(profile: Profile, day: date, count: int) -> str:
+        return writer.writerow((profile.platform, profile.profile_id, day.isoformat(), count))
+    return format_row
+
+def _export_header(export_format: str) -> str:
+    """
+    Заголовок выгрузки: строка с названиями колонок для CSV, для NDJSON - пусто.
+    """
+    return csv.writer(_EchoBuffer()).writerow(EXPORT_CSV_HEADER) if export_format == 'csv' else ''
+
+def _export_blocks(format_row, profile: Profile, start: Optional[date], end: Optional[date]) -> Iterator[str]:
+    """
+    Генератор блоков выгрузки одного профиля.
+    
+    Строки читаются из базы курсором по EXPORT_CHUNK_SIZE и отправляются
+    блоками того же размера, поэтому в памяти одновременно находится не
+    больше одного блока, сколько бы ни было строк.
+    """
+    block = []
+    for day, count in _export_rows(profile, start, end).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        block.append(format_row(profile, day, count))
+        if len(block) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+def _export_stream(export_format: str, profiles: List[Profile], start: Optional[date],
+                   end: Optional[date]) -> Iterator[str]:
+    """
+    Генератор выгрузки: профили синхронизируются и выгружаются по очереди.
+    """
+    format_row = _export_row_formatter(export_format)
+    yield _export_header(export_format)
+    for profile in profiles:
+        try:
+            ensure_daily_stats(profile)
+        except (RequestException, ValueError) as e:
+            # Сохраненных данных нет, а API недоступно: профиль пропускается
+            logger.warning(f"Профиль {profile.key} пропущен в выгрузке: {str(e)}")
+            continue
+        yield from _export_blocks(format_row, profile, start, end)
+
+async def _aexport_stream(export_format: str, profiles: List[Profile], start: Optional[date],
+                          end: Optional[date]) -> AsyncIterator[str]:
+    """
+    Асинхронный вариант _export_stream для ASGI: синхронный генератор
+    Django под ASGI сначала читает целиком, и память перестала бы быть
+    постоянной.
+    """
+    format_row = _export_row_formatter(export_format)
+    yield _export_header(export_format)
+    for profile in profiles:
+        try:
+            await aensure_daily_stats(profile)
+        except (RequestException, ValueError) as e:
+            logger.warning(f"Профиль {profile.key} пропущен в выгрузке: {str(e)}")
+            continue
+        # Курсор базы продвигается в одном и том же потоке для синхронного
+        # кода (как в QuerySet.aiterator)
+        blocks = _export_blocks(format_row, profile, start, end)
+        while (block := await sync_to_async(next)(blocks, None)) is not None:
+            yield block
+
+def export_statistics(request):
+    """
+    Выгрузка истории подписчиков в CSV или NDJSON.
+    
+    Выгружается ежедневная статистика из локального хранилища, уже
+    нормализованная при синхронизации (см. parse_daily_stats), по всем
+    активным профилям или только по выбранным. Ответ формируется
+    генератором и передается потоком, поэтому память не растет с длиной
+    истории и числом профилей. Устаревшие профили синхронизируются с API
+    по ходу выгрузки.
+    
+    Под ASGI используется асинхронный генератор, под WSGI - обычный
+    (как в stream_statistics).
+    
+    Args:
+        request: HTTP запрос с параметрами format, platform, profile_id,
+            from и to (см. parse_export_params)
+        
+    Returns:
+        StreamingHttpResponse: Поток строк вида
+            platform,profile_id,date,count
+            linkedin,gamsakhurdiya,2024-01-01,1234
+        JsonResponse: Ошибка с кодом 400 при некорректных параметрах
+        
+    Example:
+        /statistics/export/?format=ndjson&platform=youtube&from=2024-01-01
+    """
+    try:
+        export_format, profiles, start, end = parse_export_params(request)
+    except (ValidationError, ValueError) as e:
+        logger.error(f"Ошибка параметров выгрузки статистики: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    if isinstance(request, ASGIRequest):
+        rows = _aexport_stream(export_format, profiles, start, end)
+    else:
+        rows = _export_stream(export_format, profiles, start, end)
+    response = StreamingHttpResponse(rows, content_type=EXPORT_CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="subscribers.{export_format}"'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+@ops_endpoint
+def metrics(request):
+    """
+    Метрики процесса в текстовом формате Prometheus.
+    
+    Время запросов к API по конечным точкам, повторы и таймауты, попадания
+    в кэши по семействам ключей, время расчета прогноза и обработки
+    запросов по представлениям (см. metrics.py). Метрики хранятся в памяти
+    процесса: при нескольких воркерах каждый отдает свои.
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        HttpResponse: Метрики вида
+            subs_upstream_retries_total{endpoint="api:8090/linkedin/latest"} 2
+    """
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+def _format_sse(data: Dict[str, Any], event: str = 'stats') -> str:
+    """
+    Форматирует данные как одно событие Server-Sent Events.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Общий для процесса опрос последних данных для всех подключенных клиентов
+async def _load_statistics_payload() -> Dict[str, Any]:
+    return build_statistics_payload(await aload_latest_data())
+
+_statistics_broadcaster = Broadcaster(_load_statistics_payload)
+
+async def stream_statistics(request):
+    """
+    Поток Server-Sent Events с изменениями количества подписчиков.
+    
+    Все клиенты процесса получают данные из одного общего опроса
+    (см. Broadcaster), поэтому нагрузка на API не растет с числом открытых
+    страниц. Новое событие отправляется только при изменении данных, между
+    событиями передаются keep-alive комментарии.
+    
+    Под WSGI бесконечный поток занял бы рабочий поток целиком, поэтому там
+    отдается одно событие stats и событие mode с данными "single": страница
+    закрывает поток и переходит на опрос update_statistics, а не считает
+    каждое закрытие соединения ошибкой. Полноценный поток работает под ASGI
+    (Subs_counter_front/asgi.py).
+    
+    Args:
+        request: HTTP запрос
+        
+    Returns:
+        StreamingHttpResponse: Поток событий text/event-stream
+        
+    Example:
+        event: stats
+        data: {"success": true, "linkedin": {"count": 1234, "timestamp": "..."}, ...}
+    """
+    if not isinstance(request, ASGIRequest):
+        try:
+            payload = await _load_statistics_payload()
+            events = [f"retry: {STREAM_RETRY_MS}\n\n", _format_sse(payload)]
+        except Exception as e:
+            logger.error(f"Ошибка при получении данных для потока статистики: {str(e)}")
+            events = [f"retry: {STREAM_RETRY_MS}\n\n"]
+        events.append(f"event: mode\ndata: {STREAM_MODE_SINGLE}\n\n")
+    else:
+        async def stream():
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            async for payload in _statistics_broadcaster.subscribe():
+                yield ": keep-alive\n\n" if payload is None else _format_sse(payload)
+        events = stream()
+
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # отключаем буферизацию в nginx
+    return response
@@ -0,0 +1,174 @@
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections
+from django.middleware.cache import CacheMiddleware
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import translation
+from django.utils.cache import get_max_age
+
+from .profiles import get_primary_profiles
+
+# Настроим логгер для отслеживания ошибок и важных событий
+logger = logging.getLogger(__name__)
+
+# Адреса сайта, для которых прогревается кэш: ключ кэша страницы включает
+# схему, хост и порт (можно переопределить в settings.py)
+WARM_CACHE_ORIGINS = getattr(settings, 'WARM_CACHE_ORIGINS', ['http://localhost:8000'])
+# За сколько секунд до истечения кэша страниц запускать повторный прогрев
+WARM_CACHE_MARGIN = getattr(settings, 'WARM_CACHE_MARGIN', 60)
+WARM_CACHE_WORKERS = 8  # сколько страниц рендерится одновременно
+
+
+def get_warm_paths() -> List[str]:
+    """
+    Возвращает пути страниц, которые кэшируются через cache_page.
+
+    Returns:
+        List[str]: Главная, аналитика, страницы и данные ежедневной статистики основных профилей
+    """
+    paths = [reverse('home'), reverse('get_analytics')]
+    for platform in get_primary_profiles():
+        paths.append(reverse('get_daily_statistics', kwargs={'platform': platform}))
+        paths.append(reverse('get_daily_series', kwargs={'platform': platform}))
+    return paths
+
+
+def warm_page(origin: str, path: str, language: str) -> Dict[str, Any]:
+    """
+    Рендерит страницу и записывает ее в кэш страниц.
+
+    Представление вызывается без обертки cache_page, поэтому уже
+    закэшированная страница не отдается из кэша, а перерисовывается и
+    заменяется новой. Посетители до самой замены получают старую копию,
+    так что повторный прогрев перед истечением кэша не оставляет окна с
+    пустым кэшем. Запись выполняет тот же CacheMiddleware, что и cache_page,
+    с тем же ключом (адрес страницы и язык). Все прогреваемые представления
+    кэшируются через cache_page(None) и задают время жизни в max-age ответа,
+    поэтому прогретая страница живет столько же, сколько отрендеренная по
+    запросу посетителя.
+
+    Args:
+        origin (str): Адрес сайта вида https://example.com
+        path (str): Путь страницы
+        language (str): Код языка (ru, en)
+
+    Returns:
+        Dict[str, Any]: Результат вида
+            {'origin': ..., 'path': ..., 'language': ..., 'status': 200, 'cached': True,
+             'timeout': 900, 'seconds': 0.12}, где timeout - время жизни страницы в кэше
+    """
+    parts = urlsplit(origin)
+    started = time.monotonic()
+    result = {'origin': origin, 'path': path, 'language': language, 'status': None, 'cached': False, 'timeout': None}
+    try:
+        request = RequestFactory().get(
+            path, HTTP_HOST=parts.netloc, HTTP_ACCEPT_LANGUAGE=language, secure=parts.scheme == 'https',
+        )
+        match = resolve(path)
+        # Снимаем все обертки (cache_page, gzip_page): нужен сам рендер страницы
+        view = inspect.unwrap(match.func)
+        with translation.override(language):
+            request.LANGUAGE_CODE = language
+            if asyncio.iscoroutinefunction(view):
+                response = async_to_sync(view)(request, *match.args, **match.kwargs)
+            else:
+                response = view(request, *match.args, **match.kwargs)
+
+            # page_timeout=None: время жизни берется из max-age ответа, как у
+            # cache_page(None); без max-age (страница ошибки) - CACHE_MIDDLEWARE_SECONDS
+            middleware = CacheMiddleware(lambda request: response, page_timeout=None)
+            request._cache_update_cache = True
+            middleware.process_response(request, response)
+
+        result['status'] = response.status_code
+        result['cached'] = response.status_code == 200 and 'Expires' in response
+        if result['cached']:
+            max_age = get_max_age(response)
+            result['timeout'] = max_age if max_age is not None else settings.CACHE_MIDDLEWARE_SECONDS
+    except Exception as e:
+        logger.error(f"Ошибка при прогреве {origin}{path} ({language}): {str(e)}")
+        result['error'] = str(e)
+    finally:
+        # Потоки пула не управляются Django, поэтому закрываем соединение с БД сами
+        close_old_connections()
+    result['seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+
+def get_warm_jobs(origins: Optional[List[str]] = None,
+                  languages: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+    """
+    Возвращает все прогреваемые страницы.
+
+    Args:
+        origins (Optional[List[str]]): Адреса сайта (по умолчанию WARM_CACHE_ORIGINS)
+        languages (Optional[List[str]]): Коды языков (по умолчанию все из LANGUAGES)
+
+    Returns:
+        List[Tuple[str, str, str]]: Аргументы warm_page: (адрес сайта, путь, язык)
+    """
+    origins = origins or WARM_CACHE_ORIGINS
+    languages = languages or [code for code, _ in settings.LANGUAGES]
+    return [
+        (origin, path, language)
+        for origin in origins
+        for path in get_warm_paths()
+        for language in languages
+    ]
+
+
+def warm_pages(jobs: List[Tuple[str, str, str]], workers: int = WARM_CACHE_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Прогревает страницы jobs (см. get_warm_jobs) параллельно.
+
+    Returns:
+        List[Dict[str, Any]]: Результаты warm_page в порядке jobs
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda job: warm_page(*job), jobs))
+
+
+def next_warm_delay(result: Dict[str, Any]) -> float:
+    """
+    Через сколько секунд прогревать страницу повторно: за WARM_CACHE_MARGIN
+    секунд до истечения ее кэша (но не раньше половины срока, чтобы
+    ненадолго закэшированные страницы не прогревались непрерывно). Страница,
+    которая не закэширована, прогревается снова через WARM_CACHE_MARGIN.
+    """
+    timeout = result.get('timeout')
+    if not timeout:
+        return WARM_CACHE_MARGIN
+    return max(timeout - WARM_CACHE_MARGIN, timeout / 2)
+
+
+def warm_cache(origins: Optional[List[str]] = None, languages: Optional[List[str]] = None,
+               workers: int = WARM_CACHE_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Прогревает кэш всех страниц на всех языках параллельно.
+
+    После деплоя или перезапуска кэш страниц пуст, и первые посетители
+    ждут ответы API. Прогрев заранее рендерит страницы, и посетители сразу
+    получают их из кэша.
+
+    Args:
+        origins (Optional[List[str]]): Адреса сайта (по умолчанию WARM_CACHE_ORIGINS)
+        languages (Optional[List[str]]): Коды языков (по умолчанию все из LANGUAGES)
+        workers (int): Сколько страниц рендерится одновременно
+
+    Returns:
+        List[Dict[str, Any]]: Результаты warm_page по каждой странице
+
+    Example:
+        for result in warm_cache(['https://example.com'], ['ru']):
+            print(result['path'], result['seconds'])
+    """
+    return warm_pages(get_warm_jobs(origins, languages), workers)